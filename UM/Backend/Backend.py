@@ -4,16 +4,19 @@
 from enum import IntEnum
 
 from UM.Backend.SignalSocket import SignalSocket
+from UM.Backend.BackendLog import BackendLog
+from UM.Backend.SharedMeshMemory import SharedMeshMemory
 from UM.Preferences import Preferences
 from UM.Logger import Logger
 from UM.Signal import Signal, signalemitter
 from UM.Application import Application
 from UM.PluginObject import PluginObject
 from UM.Platform import Platform
+from UM.Resources import Resources
 
 import Arcus
 
-import struct
+import numpy
 import subprocess
 import threading
 import sys
@@ -40,7 +43,15 @@ class Backend(PluginObject):
         self._socket = None
         self._port = 49674
         self._process = None
-        self._backend_log = []
+        self._backend_log = BackendLog(spill_file_name = Resources.getStoragePath(Resources.Cache, "backend.log"))
+
+        Preferences.getInstance().addPreference("backend/shared_memory", False)
+        self._shared_mesh_memory = None
+        if Preferences.getInstance().getValue("backend/shared_memory"):
+            if SharedMeshMemory.isAvailable():
+                self._shared_mesh_memory = SharedMeshMemory()
+            else:
+                Logger.log("w", "Shared memory is not supported by this version of Python, sending meshes in messages.")
 
         Application.getInstance().callLater(self._createSocket)
 
@@ -58,7 +69,7 @@ class Backend(PluginObject):
                 self._createSocket()
                 return
 
-            self._backend_log = []
+            self._backend_log.clear()
             self._process = self._runEngineProcess(command)
             Logger.log("i", "Started engine process: %s" % (self.getEngineCommand()[0]))
             self._backend_log.append(bytes("Calling engine with: %s\n" % self.getEngineCommand(), "utf-8"))
@@ -74,36 +85,61 @@ class Backend(PluginObject):
     def close(self):
         if self._socket:
             self._socket.close()
+        self._backend_log.close()
+        if self._shared_mesh_memory:
+            self._shared_mesh_memory.releaseAll()
     
     ##  Get the logging messages of the backend connection.
-    #   \returns  
+    #
+    #   Only the most recent messages are kept. Use getBackendLog to follow
+    #   new messages as they come in.
+    #   \returns \type{list} A copy of the recent messages, as bytes.
     def getLog(self):
+        return self._backend_log.getLines()
+
+    ##  Get the log of the backend connection.
+    #   \returns \type{BackendLog}
+    def getBackendLog(self):
         return self._backend_log
 
+    ##  Get the shared memory to pass mesh data to a backend on the same machine.
+    #
+    #   Backends that use it send the handles of the segments instead of the
+    #   mesh data itself, and release the segments of a slice request when the
+    #   request is finished or cancelled. The segments of all requests are
+    #   released when the backend process quits.
+    #   \returns \type{SharedMeshMemory} The shared memory, or None if the
+    #   mesh data must be sent in messages.
+    def getSharedMeshMemory(self):
+        return self._shared_mesh_memory
+
     ##  \brief Convert byte array containing 3 floats per vertex
+    #
+    #   The result is a read-only view on the data rather than a copy, so it
+    #   can be passed to MeshBuilder.setVertices or MeshData directly.
+    #
+    #   \param data The bytes received from the backend.
+    #   \return \type{numpy.ndarray} An array of one row of 3 floats per
+    #   vertex, or None if the data does not consist of whole vertices.
     def convertBytesToVerticeList(self, data):
-        result = []
-        if not (len(data) % 12):
-            if data is not None:
-                for index in range(0, int(len(data) / 12)):  # For each 12 bits (3 floats)
-                    result.append(struct.unpack("fff", data[index * 12: index * 12 + 12]))
-                return result
-        else:
-            Logger.log("e", "Data length was incorrect for requested type")
-            return None
-    
+        return self._convertBytesToFloatArray(data, 3)
+
     ##  \brief Convert byte array containing 6 floats per vertex
-    def convertBytesToVerticeWithNormalsList(self,data):
-        result = []
-        if not (len(data) % 24):
-            if data is not None:
-                for index in range(0,int(len(data)/24)):  # For each 24 bits (6 floats)
-                    result.append(struct.unpack("ffffff", data[index * 24: index * 24 + 24]))
-                return result
-        else:
-            Logger.log("e", "Data length was incorrect for requested type")
+    #
+    #   Each vertex is its position followed by its normal. The results are
+    #   read-only views on the data rather than copies, so the positions can be
+    #   passed to MeshBuilder.setVertices and the normals to MeshData directly.
+    #
+    #   \param data The bytes received from the backend.
+    #   \return \type{tuple} An array of one row of 3 floats per vertex for the
+    #   positions and one for the normals, or None if the data does not
+    #   consist of whole vertices.
+    def convertBytesToVerticeWithNormalsList(self, data):
+        result = self._convertBytesToFloatArray(data, 6)
+        if result is None:
             return None
-    
+        return result[:, :3], result[:, 3:]
+
     ##  Get the command used to start the backend executable 
     def getEngineCommand(self):
         return [Preferences.getInstance().getValue("backend/location"), "--port", str(self._socket.getPort())]
@@ -119,10 +155,22 @@ class Backend(PluginObject):
             kwargs["creationflags"] = 0x00004000  # BELOW_NORMAL_PRIORITY_CLASS
         return subprocess.Popen(command_list, stdin = subprocess.DEVNULL, stdout = subprocess.PIPE, stderr = subprocess.PIPE, **kwargs)
 
+    ##  Get a view on bytes as an array of rows of floats.
+    def _convertBytesToFloatArray(self, data, columns):
+        if data is None or len(data) % (4 * columns):
+            Logger.log("e", "Data length was incorrect for requested type")
+            return None
+
+        result = numpy.frombuffer(data, dtype = numpy.float32).reshape(-1, columns)
+        result.flags.writeable = False # The data may still be used by the backend, and MeshData does not need to copy it.
+        return result
+
     def _storeOutputToLogThread(self, handle):
         while True:
             line = handle.readline()
             if line == b"":
+                if self._shared_mesh_memory:
+                    self._shared_mesh_memory.releaseAll() # The backend can no longer be using them.
                 self.backendQuit.emit()
                 break
             self._backend_log.append(line)
@@ -0,0 +1,145 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+from UM.Logger import Logger
+from UM.Signal import Signal, signalemitter
+
+import collections
+import os
+import threading
+
+##  The output of the backend process, limited in size.
+#
+#   The most recent lines are kept in memory, up to a maximum number of lines
+#   and bytes. Older lines are dropped, or moved to a log file if a file name is
+#   given. That file is rotated when it grows too large, so it is limited in
+#   size as well.
+#
+#   Lines can be added from any thread. Consumers that want to follow the
+#   output as it comes in can connect to lineAdded, rather than repeatedly
+#   getting all lines. They are called on the thread that added the line.
+@signalemitter
+class BackendLog:
+    ##  Create a new backend log.
+    #
+    #   \param max_lines \type{int} The maximum number of lines to keep in memory.
+    #   \param max_bytes \type{int} The maximum total length of the lines to keep
+    #   in memory. Longer lines are cut off at this length.
+    #   \param spill_file_name \type{str} The path of the file to move dropped
+    #   lines to, or None to forget them.
+    #   \param spill_file_size \type{int} The size in bytes at which the file
+    #   is rotated.
+    #   \param spill_file_count \type{int} The number of rotated files to keep
+    #   besides the current file.
+    def __init__(self, max_lines = 10000, max_bytes = 1024 * 1024, spill_file_name = None, spill_file_size = 10 * 1024 * 1024, spill_file_count = 2):
+        super().__init__()
+        self._max_lines = max_lines
+        self._max_bytes = max_bytes
+        self._spill_file_name = spill_file_name
+        self._spill_file_size = spill_file_size
+        self._spill_file_count = spill_file_count
+
+        self._lines = collections.deque()
+        self._byte_count = 0
+        self._spill_file = None
+        self._lock = threading.Lock()
+
+    ##  Emitted when a line is added to the log.
+    #
+    #   This is a direct signal, so the connected functions are called on the
+    #   thread that added the line, usually one that reads the output of the
+    #   backend. Nothing is posted to the event loop when nothing is connected.
+    #
+    #   \param line \type{bytes} The line that was added.
+    lineAdded = Signal(type = Signal.Direct)
+
+    ##  Add a line to the log.
+    #
+    #   \param line \type{bytes} The line to add.
+    def append(self, line):
+        line = line[:self._max_bytes]
+        with self._lock:
+            self._lines.append(line)
+            self._byte_count += len(line)
+
+            dropped_lines = []
+            while len(self._lines) > self._max_lines or self._byte_count > self._max_bytes:
+                dropped_line = self._lines.popleft()
+                self._byte_count -= len(dropped_line)
+                dropped_lines.append(dropped_line)
+            self._spill(dropped_lines)
+
+        self.lineAdded.emit(line)
+
+    ##  Remove all lines from memory.
+    #
+    #   The lines are moved to the log file, if there is one.
+    def clear(self):
+        with self._lock:
+            self._spill(self._lines)
+            self._lines.clear()
+            self._byte_count = 0
+
+    ##  Get the lines in memory, oldest first.
+    #
+    #   \return \type{list} A copy of the lines, as bytes.
+    def getLines(self):
+        with self._lock:
+            return list(self._lines)
+
+    ##  Get the number of lines in memory.
+    def getLineCount(self):
+        return len(self._lines)
+
+    ##  Get the total length of the lines in memory.
+    def getByteCount(self):
+        return self._byte_count
+
+    ##  Get the path of the file that dropped lines are moved to, if any.
+    def getSpillFileName(self):
+        return self._spill_file_name
+
+    ##  Close the log file.
+    #
+    #   The file is opened again when more lines are dropped.
+    def close(self):
+        with self._lock:
+            if self._spill_file:
+                self._spill_file.close()
+                self._spill_file = None
+
+    # protected:
+
+    # Write lines to the log file, rotating it if it grew too large.
+    #
+    # Must be called with the lock held.
+    def _spill(self, lines):
+        if not lines or not self._spill_file_name:
+            return
+
+        try:
+            if not self._spill_file:
+                self._spill_file = open(self._spill_file_name, "ab")
+            self._spill_file.writelines(lines)
+            if self._spill_file.tell() >= self._spill_file_size:
+                self._rotate()
+        except OSError as e:
+            Logger.log("w", "Unable to write backend log to %s: %s", self._spill_file_name, str(e))
+            self._spill_file_name = None
+            self._spill_file = None
+
+    # Move the log file to the first backup, moving all older backups up.
+    #
+    # Must be called with the lock held.
+    def _rotate(self):
+        self._spill_file.close()
+        self._spill_file = None
+        if self._spill_file_count < 1:
+            os.remove(self._spill_file_name)
+            return
+
+        for index in range(self._spill_file_count - 1, 0, -1):
+            older_name = "{0}.{1}".format(self._spill_file_name, index)
+            if os.path.exists(older_name):
+                os.replace(older_name, "{0}.{1}".format(self._spill_file_name, index + 1))
+        os.replace(self._spill_file_name, self._spill_file_name + ".1")
@@ -0,0 +1,148 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+from UM.Logger import Logger
+
+import itertools
+import os
+import threading
+import numpy
+
+try:
+    from multiprocessing import shared_memory
+    from multiprocessing import resource_tracker
+except ImportError: # Shared memory is only available since Python 3.8.
+    shared_memory = None
+
+##  Named shared memory segments holding the mesh data of slice requests.
+#
+#   Sending large meshes to a backend on the same machine in messages means
+#   encoding and copying them on both sides. Instead, the arrays of a mesh can
+#   be copied once into shared memory segments, and only their handles sent.
+#   A handle is a dictionary of the name of the segment and the type and shape
+#   of the array, which the backend can use to map the segment directly.
+#
+#   Segments belong to a slice request. They stay alive until the request is
+#   released, when the frontend no longer needs them and the backend is done
+#   with the request. Segments created by the backend, for instance for layer
+#   data, can be attached to a request as well, so they are released with it.
+class SharedMeshMemory:
+    ##  Create a new set of shared memory segments.
+    #
+    #   \param prefix \type{str} The start of the names of the segments.
+    def __init__(self, prefix = "um"):
+        super().__init__()
+        self._prefix = "{0}{1}_".format(prefix, os.getpid())
+        self._counter = itertools.count()
+        self._segments = {} # Request ID -> list of SharedMemory.
+        self._lock = threading.Lock()
+
+    ##  Check whether shared memory is supported by this Python version.
+    @classmethod
+    def isAvailable(cls):
+        return shared_memory is not None
+
+    ##  Copy an array into a new segment of a slice request.
+    #
+    #   \param request_id The slice request that the segment belongs to.
+    #   \param array \type{numpy.ndarray} The array to share.
+    #   \return \type{dict} The handle of the segment.
+    def shareArray(self, request_id, array):
+        array = numpy.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(name = self._prefix + str(next(self._counter)), create = True, size = max(array.nbytes, 1))
+        try:
+            numpy.ndarray(array.shape, dtype = array.dtype, buffer = segment.buf)[...] = array
+        except Exception:
+            self._releaseSegment(segment)
+            raise
+
+        with self._lock:
+            self._segments.setdefault(request_id, []).append(segment)
+        return {"name": segment.name, "dtype": array.dtype.str, "shape": list(array.shape)}
+
+    ##  Copy the vertices and indices of a mesh into segments of a slice request.
+    #
+    #   \param request_id The slice request that the segments belong to.
+    #   \param mesh_data \type{MeshData} The mesh to share.
+    #   \return \type{dict} The handles of the vertices and, if the mesh has
+    #   them, the indices, along with the number of vertices and faces.
+    def shareMeshData(self, request_id, mesh_data):
+        handles = {
+            "vertices": self.shareArray(request_id, mesh_data.getVertices()),
+            "indices": None,
+            "vertex_count": mesh_data.getVertexCount(),
+            "face_count": mesh_data.getFaceCount()
+        }
+        if mesh_data.hasIndices():
+            handles["indices"] = self.shareArray(request_id, mesh_data.getIndices())
+        return handles
+
+    ##  Map a segment that was created by another process and add it to a slice request.
+    #
+    #   The segment is removed when the request is released, so the process
+    #   that created it should not remove it itself.
+    #
+    #   \param request_id The slice request that the segment belongs to.
+    #   \param handle \type{dict} The handle of the segment.
+    #   \return \type{numpy.ndarray} A view on the segment, valid until the
+    #   request is released.
+    def attachArray(self, request_id, handle):
+        array, segment = attachSharedArray(handle, take_ownership = True)
+        with self._lock:
+            self._segments.setdefault(request_id, []).append(segment)
+        return array
+
+    ##  Get the slice requests that still have segments.
+    def getRequestIds(self):
+        with self._lock:
+            return list(self._segments.keys())
+
+    ##  Remove the segments of a slice request.
+    #
+    #   Arrays that were attached to the request may no longer be used.
+    def releaseRequest(self, request_id):
+        with self._lock:
+            segments = self._segments.pop(request_id, [])
+        for segment in segments:
+            self._releaseSegment(segment)
+
+    ##  Remove the segments of all slice requests.
+    def releaseAll(self):
+        with self._lock:
+            segments = list(itertools.chain.from_iterable(self._segments.values()))
+            self._segments.clear()
+        for segment in segments:
+            self._releaseSegment(segment)
+
+    # protected:
+
+    # Unmap a segment and remove it.
+    def _releaseSegment(self, segment):
+        try:
+            segment.close()
+        except BufferError: # An array that was attached is still in use, so the mapping stays until it is gone.
+            Logger.log("w", "Shared memory segment %s is still in use.", segment.name)
+        try:
+            segment.unlink()
+        except FileNotFoundError: # The other process removed it already.
+            pass
+
+
+##  Map a shared memory segment as an array.
+#
+#   This is what a backend on the same machine does with the handles it
+#   receives. Unless it takes ownership, the segment is not removed when the
+#   process exits, since the process that created it is responsible for that.
+#
+#   \param handle \type{dict} The handle of the segment, as created by
+#   SharedMeshMemory.shareArray.
+#   \param take_ownership \type{bool} Whether this process removes the segment.
+#   \return \type{tuple} A view on the segment as array, and the segment,
+#   which must be kept as long as the array is used.
+def attachSharedArray(handle, take_ownership = False):
+    segment = shared_memory.SharedMemory(name = handle["name"])
+    if os.name == "posix" and not take_ownership:
+        # The resource tracker would remove the segment when this process exits, although it does not own it.
+        resource_tracker.unregister(segment._name, "shared_memory")
+    array = numpy.ndarray(handle["shape"], dtype = numpy.dtype(handle["dtype"]), buffer = segment.buf)
+    return array, segment
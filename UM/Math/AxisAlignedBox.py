@@ -4,6 +4,7 @@
 from UM.Math.Vector import Vector
 from UM.Math.Float import Float
 
+import math
 import numpy
 
 ## Axis aligned bounding box.
@@ -112,31 +113,74 @@ class AxisAlignedBox:
                    Float.fuzzyCompare(self._min.y, self._max.y) or
                    Float.fuzzyCompare(self._min.z, self._max.z))
 
+    ##  Get the bounds of the box as array.
+    #
+    #   \return \type{numpy.ndarray} A (2, 3) array of the minimum and maximum
+    #   of the box, as used by intersectRays().
+    def getBounds(self):
+        return numpy.array([[self._min.x, self._min.y, self._min.z], [self._max.x, self._max.y, self._max.z]], dtype = numpy.float64)
+
     ##  Intersect the bounding box with a ray 
     #   \param ray \type{Ray}
+    #   \return A tuple of the distances along the ray at which it enters and
+    #   leaves the box, or False if the ray misses the box.
     #   \sa Ray
     def intersectsRay(self, ray):
-        inv = ray.inverseDirection
-
-        t = numpy.empty((2,3), dtype=numpy.float32)
-        t[0, 0] = inv.x * (self._min.x - ray.origin.x)
-        t[0, 1] = inv.y * (self._min.y - ray.origin.y)
-        t[0, 2] = inv.z * (self._min.z - ray.origin.z)
-        t[1, 0] = inv.x * (self._max.x - ray.origin.x)
-        t[1, 1] = inv.y * (self._max.y - ray.origin.y)
-        t[1, 2] = inv.z * (self._max.z - ray.origin.z)
-
-        tmin = numpy.min(t, axis=0)
-        tmax = numpy.max(t, axis=0)
-
-        largest_min = numpy.max(tmin)
-        smallest_max = numpy.min(tmax)
+        inverse = ray.inverseDirection
+        origin = ray.origin
+
+        largest_min = -math.inf
+        smallest_max = math.inf
+        for minimum, maximum, start, factor in ((self._min.x, self._max.x, origin.x, inverse.x),
+                                                (self._min.y, self._max.y, origin.y, inverse.y),
+                                                (self._min.z, self._max.z, origin.z, inverse.z)):
+            near = factor * (minimum - start)
+            far = factor * (maximum - start)
+            if near != near or far != far: # NaN, when the ray lies in the plane of a side of the box.
+                return False
+            if near > far:
+                near, far = far, near
+            largest_min = max(largest_min, near)
+            smallest_max = min(smallest_max, far)
 
         if smallest_max > largest_min:
             return (largest_min, smallest_max)
         else:
             return False
 
+    ##  Intersect any number of rays with any number of boxes at once.
+    #
+    #   This performs the same test as intersectsRay(), but for all
+    #   combinations of rays and boxes in one vectorised pass.
+    #
+    #   \param origins \type{numpy.ndarray} The origin of a ray as array of
+    #   3 coordinates, or the origins of M rays as (M, 3) array.
+    #   \param directions \type{numpy.ndarray} The direction of the ray, or
+    #   the directions of the rays in the same shape as the origins.
+    #   \param bounds \type{numpy.ndarray} The bounds of N boxes, as (N, 2, 3)
+    #   array of the minimum and maximum of each box.
+    #   \return A tuple of three arrays of shape (N, ) for a single ray, or of
+    #   shape (M, N) for multiple rays: whether each ray hits each box, and the
+    #   distances along the ray at which it enters and leaves the box.
+    @staticmethod
+    def intersectRays(origins, directions, bounds):
+        origins = numpy.asarray(origins, dtype = numpy.float64)
+        directions = numpy.asarray(directions, dtype = numpy.float64)
+        bounds = numpy.asarray(bounds, dtype = numpy.float64)
+        single = origins.ndim == 1
+
+        origins = numpy.atleast_2d(origins)[:, numpy.newaxis, numpy.newaxis, :]
+        directions = numpy.atleast_2d(directions)[:, numpy.newaxis, numpy.newaxis, :]
+        with numpy.errstate(divide = "ignore", invalid = "ignore"):
+            distances = (bounds[numpy.newaxis] - origins) * (1.0 / directions) # (M, N, 2, 3)
+            largest_min = numpy.max(numpy.min(distances, axis = 2), axis = 2)
+            smallest_max = numpy.min(numpy.max(distances, axis = 2), axis = 2)
+            hits = smallest_max > largest_min
+
+        if single:
+            return hits[0], largest_min[0], smallest_max[0]
+        return hits, largest_min, smallest_max
+
     ##  Check to see if this box intersects another box.
     #
     #   \param box \type{AxisAlignedBox} The box to check for intersection.
@@ -2,7 +2,6 @@
 # Uranium is released under the terms of the AGPLv3 or higher.
 
 import numpy
-import time
 
 from UM.Math.Float import Float #For fuzzy comparison of edge cases.
 from UM.Math.LineSegment import LineSegment #For line-line intersections for computing polygon intersections.
@@ -18,6 +17,44 @@ except ImportError:
     has_scipy = False
 
 
+##  Rotate the rows of an array, such that the row at index shift becomes the first.
+#
+#   This does the same as numpy.roll(array, -shift, axis = 0), but is a lot
+#   faster for the small arrays of polygons.
+def _rotate(array, shift):
+    return numpy.concatenate((array[shift:], array[:shift]))
+
+##  Get the vectors from each point of an outline to the next, leaving out those of duplicate points.
+def _getEdges(points):
+    edges = _rotate(points, 1) - points
+    return edges[(edges != 0).any(axis = 1)]
+
+##  Find all pairs of axis aligned boxes that overlap, using sweep and prune along the X axis.
+#
+#   \param minimums An array of the minimum X and Y of each box.
+#   \param maximums An array of the maximum X and Y of each box.
+#   \return An array of pairs of box indices, the lowest index first.
+def _findOverlappingBoxes(minimums, maximums):
+    order = numpy.argsort(minimums[:, 0], kind = "mergesort")
+    sorted_starts = minimums[order, 0]
+
+    # Every box overlaps along the X axis with the boxes that start after it, up to where it ends.
+    ends = numpy.searchsorted(sorted_starts, maximums[order, 0], side = "right")
+    counts = numpy.maximum(ends - numpy.arange(len(order)) - 1, 0)
+    first = numpy.repeat(numpy.arange(len(order)), counts)
+    offsets = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    second = first + 1 + offsets
+    first = order[first]
+    second = order[second]
+
+    overlapping = numpy.logical_and(minimums[first, 1] <= maximums[second, 1], minimums[second, 1] <= maximums[first, 1])
+    pairs = numpy.stack((first[overlapping], second[overlapping]), axis = 1)
+    return numpy.sort(pairs, axis = 1)
+
+# The number of projections that Polygon.findIntersections() computes at once, to limit memory use.
+# The projections of a pair of polygons with P points on all their axes have 2 * P * P elements per polygon.
+_intersection_batch_elements = 2 ** 22
+
 ##  A class representing an immutable arbitrary 2-dimensional polygon.
 class Polygon:
     def __init__(self, points = None):
@@ -92,10 +129,10 @@ class Polygon:
     ##  Computes the intersection of the convex hulls of this and another
     #   polygon.
     #
-    #   This is an implementation of O'Rourke's "Chase" algorithm. For a more
-    #   detailed description of why the algorithm works the way it does, please
-    #   consult the book "Computational Geometry in C", second edition, chapter
-    #   7.6.
+    #   This is an implementation of Sutherland-Hodgman clipping. The convex
+    #   hull of this polygon is clipped by the half-plane of each edge of the
+    #   convex hull of the other polygon in turn. Each clipping step handles
+    #   all vertices at once.
     #
     #   \param other The other polygon to intersect convex hulls with.
     #   \return The intersection of the two polygons' convex hulls.
@@ -106,106 +143,35 @@ class Polygon:
         if len(me._points) <= 2 or len(him._points) <= 2: #If either polygon has no surface area, then the intersection is empty.
             return Polygon()
 
-        index_me = 0 #The current vertex index.
-        index_him = 0
-        advances_me = 0 #How often we've advanced.
-        advances_him = 0
-        who_is_inside = "unknown" #Which of the two polygons is currently on the inside.
-        directions_me = numpy.subtract(numpy.roll(me._points, -1, axis = 0), me._points) #Pre-compute the difference between consecutive points to get a direction for each point.
-        directions_him = numpy.subtract(numpy.roll(him._points, -1, axis = 0), him._points)
-        result = []
+        points = numpy.array(me._points, numpy.float64)
+        clip_points = numpy.array(him._points, numpy.float64)
+        clip_directions = _rotate(clip_points, 1) - clip_points
 
-        #Iterate through both polygons to find intersections and inside vertices until we've made a loop through both polygons.
-        while advances_me <= len(me._points) or advances_him <= len(him._points):
-            vertex_me = me._points[index_me]
-            vertex_him = him._points[index_him]
-            if advances_me > len(me._points) * 2 or advances_him > len(him._points) * 2: #Also, if we've looped twice through either polygon, the boundaries of the polygons don't intersect.
-                if len(result) > 2:
-                    return Polygon(points = result)
-                if me.isInside(vertex_him): #Other polygon is inside this one.
-                    return him
-                if him.isInside(vertex_me): #This polygon is inside the other.
-                    return me
-                #Polygons are disjunct.
-                return Polygon()
+        #The inside of the other hull is on the left of its edges if it is counter-clockwise, or on the right if it is clockwise.
+        orientation = numpy.sign((clip_points[:, 0] * clip_directions[:, 1] - clip_directions[:, 0] * clip_points[:, 1]).sum())
 
-            me_start = Vector2(data = vertex_me)
-            me_end = Vector2(data = vertex_me + directions_me[index_me])
-            him_start = Vector2(data = vertex_him)
-            him_end = Vector2(data = vertex_him + directions_him[index_him])
-
-            me_in_him_halfplane = (me_end - him_start).cross(him_end - him_start) #Cross gives positive if him_end is to the left of me_end (as seen from him_start).
-            him_in_me_halfplane = (him_end - me_start).cross(me_end - me_start) #Arr, I's got him in me halfplane, cap'n.
-            intersection = LineSegment(me_start, me_end).intersection(LineSegment(him_start, him_end))
-
-            if intersection:
-                result.append(intersection.getData()) #The intersection is always in the hull.
-                if me_in_him_halfplane > 0: #At the intersection, who was inside changes.
-                    who_is_inside = "me"
-                elif him_in_me_halfplane > 0:
-                    who_is_inside = "him"
-                else:
-                    pass #Otherwise, whoever is inside remains the same (or unknown).
-                advances_me += 1
-                index_me = advances_me % len(me._points)
-                advances_him += 1
-                index_him = advances_him % len(him._points)
+        for start, direction in zip(clip_points, clip_directions):
+            #The distance of each vertex to the edge, scaled by the length of the edge. Positive on the inside.
+            distances = orientation * (direction[0] * (points[:, 1] - start[1]) - direction[1] * (points[:, 0] - start[0]))
+            inside = distances >= 0
+            if inside.all():
                 continue
-
-            cross = (Vector2(data = directions_me[index_me]).cross(Vector2(data = directions_him[index_him])))
-
-            #Edge case: Two exactly opposite edges facing away from each other.
-            if Float.fuzzyCompare(cross, 0) and me_in_him_halfplane <= 0 and him_in_me_halfplane <= 0:
-                # The polygons must be disjunct then.
+            if not inside.any(): #Completely outside this half-plane, so the polygons are disjunct.
                 return Polygon()
 
-            #Edge case: Two colinear edges.
-            if Float.fuzzyCompare(cross, 0) and me_in_him_halfplane <= 0:
-                advances_me += 1
-                index_me = advances_me % len(me._points)
-                continue
-            if Float.fuzzyCompare(cross, 0) and him_in_me_halfplane <= 0:
-                advances_him += 1
-                index_him = advances_him % len(him._points)
-                continue
+            #Keep each vertex that is inside, followed by the intersection of its outgoing edge if that crosses the half-plane.
+            next_points = _rotate(points, 1)
+            next_distances = _rotate(distances, 1)
+            crossing = inside != _rotate(inside, 1)
+            with numpy.errstate(divide = "ignore", invalid = "ignore"):
+                fractions = distances / (distances - next_distances)
+            intersections = points + fractions[:, numpy.newaxis] * (next_points - points)
 
-            #Edge case: Two edges overlap.
-            if Float.fuzzyCompare(cross, 0):
-                #Just advance the outside.
-                if who_is_inside == "me":
-                    advances_him += 1
-                    index_him = advances_him % len(him._points)
-                else: #him or unknown. If it's unknown, it doesn't matter which one is advanced, as long as it's the same polygon being advanced every time (me in this case).
-                    advances_me += 1
-                    index_me = advances_me % len(me._points)
-                continue
+            points = numpy.stack((points, intersections), axis = 1).reshape((-1, 2))[numpy.stack((inside, crossing), axis = 1).reshape(-1)]
 
-            #Generic case: Advance whichever polygon is on the outside.
-            if cross >= 0: #This polygon is going faster towards the inside.
-                if him_in_me_halfplane > 0:
-                    advances_me += 1
-                    index_me = advances_me % len(me._points)
-                    if who_is_inside == "him":
-                        result.append(vertex_him)
-                else:
-                    advances_him += 1
-                    index_him = advances_him % len(him._points)
-                    if who_is_inside == "me":
-                        result.append(vertex_me)
-            else: #The other polygon is going faster towards the inside.
-                if me_in_him_halfplane > 0:
-                    advances_him += 1
-                    index_him = advances_him % len(him._points)
-                    if who_is_inside == "me":
-                        result.append(vertex_me)
-                else:
-                    advances_me += 1
-                    index_me = advances_me % len(me._points)
-                    if who_is_inside == "him":
-                        result.append(vertex_him)
-        if (result[0] == result[-1]).all(): #If the last two edges are parallel, the first vertex will have been added again. So if it is the same as the last element, remove it.
-            result = result[:-1] #This also handles the case where the intersection is only one point.
-        return Polygon(points = result)
+        #Vertices on the border of the other hull are followed by their intersection with it, which is the same vertex.
+        points = points[(points != _rotate(points, 1)).any(axis = 1)]
+        return Polygon(points = points)
 
     ##  Check to see whether this polygon intersects with another polygon.
     #
@@ -264,6 +230,96 @@ class Polygon:
         else:
             return None
 
+    ##  Find all pairs of polygons that intersect each other.
+    #
+    #   This gives the same results as calling intersectsPolygon() for every
+    #   pair of polygons, but is much faster for many polygons. First the pairs
+    #   of which the bounding boxes overlap are found by sorting the boxes along
+    #   the X axis. Then the separating axis test of intersectsPolygon() is
+    #   performed on all those pairs at once.
+    #
+    #   \param polygons \type{list} The polygons to check against each other.
+    #   \return \type{list} A list of (index, other index, (x, y)) tuples, one
+    #   for each pair of intersecting polygons, sorted by index. The first index
+    #   is always the lowest. The vector is the result of intersectsPolygon()
+    #   of the first polygon with the second.
+    @staticmethod
+    def findIntersections(polygons):
+        indices = [index for index, polygon in enumerate(polygons) if polygon.isValid()]
+        if len(indices) < 2:
+            return []
+
+        # Pad all polygons to the same number of points by repeating their last point. This does not change their
+        # projection, and the edges between the repeated points have no direction so they are not used as axis.
+        point_counts = numpy.array([len(polygons[index]._points) for index in indices])
+        point_count = point_counts.max()
+        points = numpy.empty((len(indices), point_count, 2), numpy.float64)
+        for row, index in enumerate(indices):
+            polygon_points = polygons[index]._points
+            points[row, :len(polygon_points)] = polygon_points
+            points[row, len(polygon_points):] = polygon_points[-1]
+
+        # Like intersectsPolygon(), use the normal of the edge that ends at each point.
+        edges = points - numpy.roll(points, 1, axis = 1)
+        lengths = numpy.sqrt((edges * edges).sum(axis = 2))
+        normals_valid = lengths > 0
+        normals = numpy.zeros_like(edges)
+        normals[normals_valid, 0] = edges[normals_valid, 1] / lengths[normals_valid]
+        normals[normals_valid, 1] = -edges[normals_valid, 0] / lengths[normals_valid]
+
+        pairs = _findOverlappingBoxes(points.min(axis = 1), points.max(axis = 1))
+
+        # Test pairs of polygons with the same largest number of points together. Then the points of both can be cut
+        # off at that number, and a single detailed polygon does not make the test of every other pair expensive.
+        pair_point_counts = numpy.maximum(point_counts[pairs[:, 0]], point_counts[pairs[:, 1]])
+        batches = []
+        for pair_point_count in numpy.unique(pair_point_counts):
+            group = pairs[pair_point_counts == pair_point_count]
+            batch_size = max(1, _intersection_batch_elements // (2 * int(pair_point_count) ** 2))
+            batches.extend((group[start:start + batch_size], int(pair_point_count)) for start in range(0, len(group), batch_size))
+
+        result = []
+        for batch, batch_point_count in batches:
+            first = batch[:, 0]
+            second = batch[:, 1]
+            first_points = points[first, :batch_point_count]
+            second_points = points[second, :batch_point_count]
+
+            axes = numpy.concatenate((normals[first, :batch_point_count], normals[second, :batch_point_count]), axis = 1)
+            axes_valid = numpy.concatenate((normals_valid[first, :batch_point_count], normals_valid[second, :batch_point_count]), axis = 1)
+
+            # Project on a part of the axes at a time, in case even a single pair is too large to project at once.
+            axis_count = max(1, _intersection_batch_elements // (len(batch) * batch_point_count))
+            first_min = numpy.empty(axes_valid.shape)
+            first_max = numpy.empty(axes_valid.shape)
+            second_min = numpy.empty(axes_valid.shape)
+            second_max = numpy.empty(axes_valid.shape)
+            for axis_start in range(0, axes.shape[1], axis_count):
+                axis_slice = slice(axis_start, axis_start + axis_count)
+                projections = numpy.matmul(axes[:, axis_slice], first_points.transpose(0, 2, 1))
+                first_min[:, axis_slice] = projections.min(axis = 2)
+                first_max[:, axis_slice] = projections.max(axis = 2)
+                projections = numpy.matmul(axes[:, axis_slice], second_points.transpose(0, 2, 1))
+                second_min[:, axis_slice] = projections.min(axis = 2)
+                second_max[:, axis_slice] = projections.max(axis = 2)
+                del projections
+
+            separated = numpy.logical_and(numpy.logical_or(first_min > second_max, second_min > first_max), axes_valid).any(axis = 1)
+            sizes = numpy.minimum(first_max, second_max) - numpy.maximum(first_min, second_min)
+            sizes[numpy.logical_not(axes_valid)] = numpy.inf
+
+            rows = numpy.nonzero(numpy.logical_and(numpy.logical_not(separated), axes_valid.any(axis = 1)))[0]
+            best = sizes[rows].argmin(axis = 1) # The first of the smallest overlaps, like intersectsPolygon().
+            sizes = sizes[rows, best]
+            sizes[first_min[rows, best] < second_min[rows, best]] *= -1
+            vectors = axes[rows, best] * sizes[:, numpy.newaxis]
+
+            for row, vector in zip(rows, vectors):
+                result.append((indices[first[row]], indices[second[row]], (vector[0], vector[1])))
+
+        result.sort(key = lambda item: (item[0], item[1]))
+        return result
+
     ##  Calculate the convex hull around the set of points of this polygon.
     #
     #   \return \type{Polygon} The convex hull around the points of this polygon.
@@ -313,28 +369,32 @@ class Polygon:
 
     ##  Perform a Minkowski sum of this polygon with another polygon.
     #
+    #   If both polygons are convex, the result is the outline of the sum. It
+    #   is computed in linear time by merging the edges of both polygons in
+    #   order of their angle. Otherwise the result contains the sums of all
+    #   pairs of points of both polygons.
+    #
     #   \param other The polygon to perform a Minkowski sum with.
     #   \return \type{Polygon} The Minkowski sum of this polygon with other.
     def getMinkowskiSum(self, other):
-        points = numpy.zeros((len(self._points) * len(other._points), 2))
-        for n in range(0, len(self._points)):
-            for m in range(0, len(other._points)):
-                points[n * len(other._points) + m] = self._points[n] + other._points[m]
+        if self._isConvex() and other._isConvex():
+            return self._getConvexMinkowskiSum(other)
 
-                time.sleep(0.00001)
-
-        return Polygon(points)
+        points = numpy.array(self._points, numpy.float64)[:, numpy.newaxis, :] + numpy.array(other._points, numpy.float64)[numpy.newaxis, :, :]
+        return Polygon(points.reshape((-1, 2)))
 
     ##  Create a Minkowski hull from this polygon and another polygon.
     #
     #   The Minkowski hull is the convex hull around the Minkowski sum of this
-    #   polygon with other.
+    #   polygon with other. This is the same as the Minkowski sum of the convex
+    #   hulls of both polygons, so the hulls are summed instead of all points.
     #
     #   \param other \type{Polygon} The Polygon to do a Minkowski addition with.
     #   \return The convex hull around the Minkowski sum of this Polygon with other
     def getMinkowskiHull(self, other):
-        sum = self.getMinkowskiSum(other)
-        return sum.getConvexHull()
+        me = self if self._isConvex() else self.getConvexHull()
+        him = other if other._isConvex() else other.getConvexHull()
+        return me._getConvexMinkowskiSum(him)
 
     ##  Whether the specified point is inside this polygon.
     #
@@ -349,6 +409,84 @@ class Polygon:
                 return False
         return True
 
+    ##  Check whether this polygon is convex.
+    #
+    #   Polygons with fewer than three points are considered convex, as are
+    #   polygons with collinear or duplicate points, as long as all corners
+    #   turn the same way and the outline goes around only once.
+    def _isConvex(self):
+        if self._points is None or len(self._points) < 3:
+            return True
+
+        edges = _getEdges(self._points)
+        if len(edges) < 3:
+            return True
+
+        next_edges = _rotate(edges, 1)
+        cross = edges[:, 0] * next_edges[:, 1] - edges[:, 1] * next_edges[:, 0]
+        if (cross > 0).any() and (cross < 0).any():
+            return False
+
+        # All corners turn the same way, but a star shape would go around more than once.
+        turns = numpy.arctan2(cross, (edges * next_edges).sum(axis = 1))
+        return abs(turns.sum()) < 3 * numpy.pi
+
+    ##  Compute the Minkowski sum of this polygon with another polygon, if both are convex.
+    #
+    #   The edges of both polygons are sorted by angle, starting from their
+    #   lowest point. The outline of the sum consists of all these edges, in
+    #   order of their angle, starting at the sum of the lowest points.
+    #
+    #   \param other \type{Polygon} The convex polygon to add to this convex polygon.
+    #   \return \type{Polygon} The convex outline of the sum, in the same
+    #   (clockwise) order as getConvexHull() returns.
+    def _getConvexMinkowskiSum(self, other):
+        if self._points is None or other._points is None or len(self._points) == 0 or len(other._points) == 0:
+            return Polygon(numpy.zeros((0, 2), numpy.float64))
+
+        start_me, edges_me, angles_me = self._getSortedEdges()
+        start_him, edges_him, angles_him = other._getSortedEdges()
+
+        # Both lists of edges are already sorted, so a stable sort just merges them.
+        order = numpy.argsort(numpy.concatenate((angles_me, angles_him)), kind = "mergesort")
+        edges = numpy.concatenate((edges_me, edges_him))[order]
+
+        if len(edges) == 0: # Both polygons are a single point.
+            return Polygon(numpy.array([start_me + start_him]))
+
+        # Remove the corners between edges with the same direction.
+        previous_edges = _rotate(edges, -1)
+        cross = previous_edges[:, 0] * edges[:, 1] - previous_edges[:, 1] * edges[:, 0]
+        dot = (previous_edges * edges).sum(axis = 1)
+        lengths = numpy.sqrt((edges * edges).sum(axis = 1))
+        corners = numpy.logical_or(numpy.abs(cross) > 1e-9 * lengths * _rotate(lengths, -1), dot < 0)
+
+        points = start_me + start_him + numpy.concatenate((numpy.zeros((1, 2)), numpy.cumsum(edges[:-1], axis = 0)))
+        points = points[corners]
+        if len(points) == 0: # All edges have the same direction, which cannot happen for closed outlines.
+            points = numpy.array([start_me + start_him])
+
+        return Polygon(numpy.flipud(points))
+
+    ##  Get the edges of this convex polygon in counter-clockwise order, starting at its lowest point.
+    #
+    #   \return A tuple of the lowest point, the edges starting from that point
+    #   and the angle of each edge between 0 and 2 pi.
+    def _getSortedEdges(self):
+        points = numpy.array(self._points, numpy.float64)
+
+        # The signed area is negative for clockwise polygons.
+        next_points = _rotate(points, 1)
+        if (points[:, 0] * next_points[:, 1] - next_points[:, 0] * points[:, 1]).sum() < 0:
+            points = numpy.flipud(points)
+
+        lowest = numpy.lexsort((points[:, 0], points[:, 1]))[0] # Lowest Y, then lowest X.
+        points = _rotate(points, lowest)
+
+        edges = _getEdges(points)
+        angles = numpy.mod(numpy.arctan2(edges[:, 1], edges[:, 0]), 2 * numpy.pi)
+        return points[0], edges, angles
+
     def _isRightTurn(self, p, q, r):
         sum1 = q[0] * r[1] + p[0] * q[1] + r[0] * p[1]
         sum2 = q[0] * p[1] + r[0] * q[1] + p[0] * r[1]
@@ -2,7 +2,6 @@
 # Uranium is released under the terms of the AGPLv3 or higher.
 
 import numpy
-import numpy.linalg
 import math
 import copy
 
@@ -10,99 +9,111 @@ from UM.Math.Vector import Vector
 from UM.Math.Float import Float
 from UM.Math.Matrix import Matrix
 
-##  Unit Quaternion class based on numpy arrays.
+##  Unit Quaternion class.
 #
 #   This class represents a Unit quaternion that can be used for rotations.
+#   Like Vector, the components are stored as plain floats.
 #
 #   \note The operations that modify this quaternion will ensure the length
 #         of the quaternion remains 1. This is done to make this class simpler
 #         to use.
 #
 class Quaternion(object):
+    __slots__ = ("_x", "_y", "_z", "_w")
+
     EPS = numpy.finfo(float).eps * 4.0
 
     def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
-        # Components are stored as XYZW
-        self._data = numpy.array([x, y, z, w], dtype=numpy.float32)
+        self._x = float(x)
+        self._y = float(y)
+        self._z = float(z)
+        self._w = float(w)
 
+    ##  Get numpy array with the data
+    #   \returns numpy array of length 4 holding the components, as XYZW.
     def getData(self):
-        return self._data
+        return numpy.array([self._x, self._y, self._z, self._w], dtype=numpy.float32)
 
     @property
     def x(self):
-        return self._data[0]
+        return self._x
 
     @property
     def y(self):
-        return self._data[1]
+        return self._y
 
     @property
     def z(self):
-        return self._data[2]
+        return self._z
 
     @property
     def w(self):
-        return self._data[3]
+        return self._w
 
     ##  Set quaternion by providing rotation about an axis.
     #
     #   \param angle \type{float} Angle in radians
     #   \param axis \type{Vector} Axis of rotation
     def setByAngleAxis(self, angle, axis):
-        a = axis.normalized().getData()
-        halfAngle = angle / 2.0
-        self._data[3] = math.cos(halfAngle)
-        self._data[0:3] = a * math.sin(halfAngle)
+        a = axis.normalized()
+        sin_half_angle = math.sin(angle / 2.0)
+        self._x = a.x * sin_half_angle
+        self._y = a.y * sin_half_angle
+        self._z = a.z * sin_half_angle
+        self._w = math.cos(angle / 2.0)
         self.normalize()
 
     def __mul__(self, other):
-        result = copy.deepcopy(self)
+        result = copy.copy(self)
         result *= other
         return result
 
     def __imul__(self, other):
         if type(other) is Quaternion:
-            v1 = Vector(other.x, other.y, other.z)
-            v2 = Vector(self.x, self.y, self.z)
-
-            w = other.w * self.w - v1.dot(v2)
-            v = v2 * other.w + v1 * self.w + v2.cross(v1)
+            x1, y1, z1, w1 = other._x, other._y, other._z, other._w
+            x2, y2, z2, w2 = self._x, self._y, self._z, self._w
 
-            self._data[0] = v.x
-            self._data[1] = v.y
-            self._data[2] = v.z
-            self._data[3] = w
+            self._x = x2 * w1 + x1 * w2 + y2 * z1 - z2 * y1
+            self._y = y2 * w1 + y1 * w2 + z2 * x1 - x2 * z1
+            self._z = z2 * w1 + z1 * w2 + x2 * y1 - y2 * x1
+            self._w = w1 * w2 - (x1 * x2 + y1 * y2 + z1 * z2)
         elif type(other) is float or type(other) is int:
-            self._data *= other
+            self._x *= other
+            self._y *= other
+            self._z *= other
+            self._w *= other
         else:
             raise NotImplementedError()
 
         return self
 
     def __add__(self, other):
-        result = copy.deepcopy(self)
+        result = copy.copy(self)
         result += other
         return result
 
     def __iadd__(self, other):
         if type(other) is Quaternion:
-            self._data[0] += other._data[0]
-            self._data[1] += other._data[1]
-            self._data[2] += other._data[2]
-            self._data[3] += other._data[3]
+            self._x += other._x
+            self._y += other._y
+            self._z += other._z
+            self._w += other._w
         else:
             raise NotImplementedError()
 
         return self
 
     def __truediv__(self, other):
-        result = copy.deepcopy(self)
+        result = copy.copy(self)
         result /= other
         return result
 
     def __itruediv__(self, other):
         if type(other) is float or type(other) is int:
-            self._data /= other
+            self._x /= other
+            self._y /= other
+            self._z /= other
+            self._w /= other
         else:
             raise NotImplementedError()
 
@@ -112,72 +123,77 @@ class Quaternion(object):
         return Float.fuzzyCompare(self.x, other.x, 1e-6) and Float.fuzzyCompare(self.y, other.y, 1e-6) and Float.fuzzyCompare(self.z, other.z, 1e-6) and Float.fuzzyCompare(self.w, other.w, 1e-6)
 
     def __neg__(self):
-        q = copy.deepcopy(self)
-        q._data = -q._data
-        return q
+        return Quaternion(-self._x, -self._y, -self._z, -self._w)
 
     def getInverse(self):
-        result = copy.deepcopy(self)
+        result = copy.copy(self)
         result.invert()
         return result
 
     def invert(self):
-        self._data[0:3] = -self._data[0:3]
+        self._x = -self._x
+        self._y = -self._y
+        self._z = -self._z
         return self
 
     def rotate(self, vector):
-        vMult = 2.0 * (self.x * vector.x + self.y * vector.y + self.z * vector.z)
-        crossMult = 2.0 * self.w
-        pMult = crossMult * self.w - 1.0
+        vMult = 2.0 * (self._x * vector.x + self._y * vector.y + self._z * vector.z)
+        crossMult = 2.0 * self._w
+        pMult = crossMult * self._w - 1.0
 
-        return Vector( pMult * vector.x + vMult * self.x + crossMult * (self.y * vector.z - self.z * vector.y),
-                       pMult * vector.y + vMult * self.y + crossMult * (self.z * vector.x - self.x * vector.z),
-                       pMult * vector.z + vMult * self.z + crossMult * (self.x * vector.y - self.y * vector.x) )
+        return Vector( pMult * vector.x + vMult * self._x + crossMult * (self._y * vector.z - self._z * vector.y),
+                       pMult * vector.y + vMult * self._y + crossMult * (self._z * vector.x - self._x * vector.z),
+                       pMult * vector.z + vMult * self._z + crossMult * (self._x * vector.y - self._y * vector.x) )
 
     def dot(self, other):
-        return numpy.dot(self._data, other._data)
+        return self._x * other._x + self._y * other._y + self._z * other._z + self._w * other._w
 
     def length(self):
-        return numpy.linalg.norm(self._data)
+        return math.sqrt(self.dot(self))
 
     def normalize(self):
-        self._data /= numpy.linalg.norm(self._data)
+        length = self.length()
+        self._x /= length
+        self._y /= length
+        self._z /= length
+        self._w /= length
 
     ## Set quaternion by providing a homogenous (4x4) rotation matrix.
     # \param matrix 4x4 Matrix object
     # \param is_precise
     def setByMatrix(self, matrix, is_precise = False):
-        trace = matrix.at(0, 0) + matrix.at(1, 1) + matrix.at(2, 2)
+        m = matrix.getData().tolist()
+        trace = m[0][0] + m[1][1] + m[2][2]
         if trace > 0.0:
-            self._data[0] = matrix.at(2, 1) - matrix.at(1, 2)
-            self._data[1] = matrix.at(0, 2) - matrix.at(2, 0)
-            self._data[2] = matrix.at(1, 0) - matrix.at(0, 1)
-            self._data[3] = trace + 1
+            self._x = m[2][1] - m[1][2]
+            self._y = m[0][2] - m[2][0]
+            self._z = m[1][0] - m[0][1]
+            self._w = trace + 1
         else:
             i = 0
-            if matrix.at(1, 1) > matrix.at(0, 0):
+            if m[1][1] > m[0][0]:
                 i = 1
 
-            if matrix.at(2, 2) > matrix.at(i, i):
+            if m[2][2] > m[i][i]:
                 i = 2
 
             # Yes, this is repeated code. Writing it out however makes the code way
             # more readable than any magical index shifting.
             if i == 0:
-                self._data[0] = matrix.at(0, 0) - matrix.at(1, 1) - matrix.at(2, 2) + 1.0
-                self._data[1] = matrix.at(0, 1) + matrix.at(1, 0)
-                self._data[2] = matrix.at(0, 2) + matrix.at(2, 0)
-                self._data[3] = matrix.at(2, 1) - matrix.at(1, 2)
+                self._x = m[0][0] - m[1][1] - m[2][2] + 1.0
+                self._y = m[0][1] + m[1][0]
+                self._z = m[0][2] + m[2][0]
+                self._w = m[2][1] - m[1][2]
             elif i == 1:
-                self._data[0] = matrix.at(0, 1) + matrix.at(1, 0)
-                self._data[1] = matrix.at(1, 1) - matrix.at(0, 0) - matrix.at(2, 2) + 1.0
-                self._data[2] = matrix.at(1, 2) + matrix.at(2, 1)
-                self._data[3] = matrix.at(0, 2) - matrix.at(2, 0)
+                self._x = m[0][1] + m[1][0]
+                self._y = m[1][1] - m[0][0] - m[2][2] + 1.0
+                self._z = m[1][2] + m[2][1]
+                self._w = m[0][2] - m[2][0]
             else:
-                self._data[0] = matrix.at(0, 2) + matrix.at(2, 0)
-                self._data[1] = matrix.at(2, 1) + matrix.at(1, 2)
-                self._data[1] = matrix.at(2, 2) - matrix.at(0, 0) - matrix.at(1, 1) + 1.0
-                self._data[3] = matrix.at(1, 0) - matrix.at(0, 1)
+                self._x = m[0][2] + m[2][0]
+                self._y = m[2][1] + m[1][2]
+                self._z = m[2][2] - m[0][0] - m[1][1] + 1.0
+                self._w = m[1][0] - m[0][1]
 
         self.normalize()
 
@@ -246,7 +262,7 @@ class Quaternion(object):
             if Float.fuzzyCompare(axis.length(), 0.0):
                 axis = Vector.Unit_Y.cross(v1)
 
-            axis.normalize()
+            axis = axis.normalized()
             q = Quaternion()
             q.setByAngleAxis(math.pi, axis)
         else:
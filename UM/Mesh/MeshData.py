@@ -3,10 +3,13 @@
 
 from UM.Math.Vector import Vector
 from UM.Math.AxisAlignedBox import AxisAlignedBox
+from UM.Math.Polygon import Polygon
 from UM.Logger import Logger
 from UM.Math import NumPyUtil
 
 from enum import Enum
+import itertools
+import math
 import threading
 import numpy
 import numpy.linalg
@@ -16,6 +19,9 @@ from time import time
 numpy.seterr(all="ignore") # Ignore warnings (dev by zero)
 
 MAXIMUM_HULL_VERTICES_COUNT = 1024   # Maximum number of vertices to have in the convex hull.
+MAXIMUM_CACHED_ORIENTATIONS = 16     # Maximum number of orientations to keep the extents and footprint of.
+MAXIMUM_MONOTONE_CHAIN_POINTS = 10000 # Maximum number of points to find the 2D hull of in Python.
+HULL_FILTER_TOLERANCE = 1e-3         # Vertices closer than this to the surface of the filtering polytope are kept.
 
 class MeshType(Enum):
     faces = 1 # Start at one, as 0 is false (so if this is used in a if statement, it's always true)
@@ -49,8 +55,10 @@ class MeshData:
         # original center position
         self._center_position = center_position
         self._convex_hull = None    # type: scipy.spatial.qhull.ConvexHull
+        self._convex_hull_computed = False
         self._convex_hull_vertices = None
         self._convex_hull_lock = threading.Lock()
+        self._orientation_cache = {} # (kind, orientation matrix bytes) -> extents or footprint in that orientation, without translation.
 
     ## Create a new MeshData with specified changes
     #   \return \type{MeshData}
@@ -138,23 +146,44 @@ class MeshData:
 
     ##  Get the extents of this mesh.
     #
+    #   Without a matrix, the extents are taken from the vertices directly, so
+    #   the convex hull is not computed. The extents are cached for each
+    #   orientation, so moving a mesh does not compute them again.
+    #
     #   \param matrix The transformation matrix from model to world coordinates.
     def getExtents(self, matrix = None):
         if self._vertices is None:
             return None
 
-        data = numpy.pad(self.getConvexHullVertices(), ((0, 0), (0, 1)), "constant", constant_values=(0.0, 1.0))
+        if matrix is None:
+            min, max = self._getCachedInOrientation("extents", numpy.identity(3), self._computeExtents)
+        else:
+            data = matrix.getData()
+            min, max = self._getCachedInOrientation("extents", data[:3, :3], self._computeExtents)
+            min = min + data[:3, 3]
+            max = max + data[:3, 3]
 
-        if matrix is not None:
-            transposed = matrix.getTransposed().getData()
-            data = data.dot(transposed)
-            data += transposed[:, 3]
-            data = data[:, 0:3]
+        return AxisAlignedBox(minimum=Vector(min[0], min[1], min[2]), maximum=Vector(max[0], max[1], max[2]))
+
+    ##  Get the outline of this mesh, projected on the X/Z plane.
+    #
+    #   This is the convex hull of the mesh as seen from above, as the
+    #   footprint of the mesh on the build plate. Only a 2D hull is computed
+    #   from the vertices of the 3D convex hull. The outline is cached for each
+    #   orientation, so moving a mesh does not compute it again.
+    #
+    #   \param matrix The transformation matrix from model to world coordinates.
+    #   \return \type{Polygon} The outline, in the same order as
+    #   Polygon.getConvexHull() returns, or None if the mesh has no vertices.
+    def getConvexHullFootprint(self, matrix = None):
+        if self._vertices is None:
+            return None
 
-        min = data.min(axis=0)
-        max = data.max(axis=0)
+        if matrix is None:
+            return Polygon(self._getCachedInOrientation("footprint", numpy.identity(3), self._computeFootprint))
 
-        return AxisAlignedBox(minimum=Vector(min[0], min[1], min[2]), maximum=Vector(max[0], max[1], max[2]))
+        data = matrix.getData()
+        return Polygon(self._getCachedInOrientation("footprint", data[:3, :3], self._computeFootprint) + data[[0, 2], 3])
 
     ##  Get all vertices of this mesh as a bytearray
     #
@@ -206,19 +235,24 @@ class MeshData:
 
     ##  Gets the Convex Hull of this mesh
     #
-    #    \return \type{scipy.spatial.qhull.ConvexHull}
+    #    \return \type{scipy.spatial.qhull.ConvexHull} The convex hull, or None
+    #    if the mesh is flat or has too few vertices.
     def getConvexHull(self):
         with self._convex_hull_lock:
-            if self._convex_hull is None:
+            if not self._convex_hull_computed:
                 self._computeConvexHull()
+                self._convex_hull_computed = True
             return self._convex_hull
 
     ##  Gets the convex hull points
     #
-    #   \return \type{numpy.ndarray} the vertices which describe the convex hull
+    #   \return \type{numpy.ndarray} the vertices which describe the convex hull,
+    #   or None if the mesh has no convex hull.
     def getConvexHullVertices(self):
         if self._convex_hull_vertices is None:
             convex_hull = self.getConvexHull()
+            if convex_hull is None:
+                return None
             self._convex_hull_vertices = numpy.take(convex_hull.points, convex_hull.vertices, axis=0)
         return self._convex_hull_vertices
 
@@ -232,6 +266,38 @@ class MeshData:
         else:
             return None
 
+    # Get a result that only depends on the orientation of the mesh, computing it if it is not cached.
+    def _getCachedInOrientation(self, kind, orientation, compute):
+        key = (kind, numpy.asarray(orientation, numpy.float64).tobytes())
+        try:
+            return self._orientation_cache[key]
+        except KeyError:
+            pass
+
+        result = compute(orientation)
+        if len(self._orientation_cache) >= MAXIMUM_CACHED_ORIENTATIONS:
+            self._orientation_cache.pop(next(iter(self._orientation_cache)), None) # Forget the oldest orientation.
+        self._orientation_cache[key] = result
+        return result
+
+    # Get the vertices that the extents and footprint of the mesh can be found from.
+    def _getOutlineVertices(self):
+        vertices = self.getConvexHullVertices()
+        if vertices is None: # The mesh is flat, so all its vertices are needed.
+            vertices = self._vertices
+        return vertices
+
+    def _computeExtents(self, orientation):
+        if numpy.array_equal(orientation, numpy.identity(3)):
+            vertices = self._vertices # The extents of the vertices are the extents of their hull, without computing it.
+        else:
+            vertices = self._getOutlineVertices().dot(numpy.transpose(orientation))
+        return vertices.min(axis = 0).astype(numpy.float64), vertices.max(axis = 0).astype(numpy.float64)
+
+    def _computeFootprint(self, orientation):
+        projected = self._getOutlineVertices().dot(numpy.transpose(orientation[[0, 2]]))
+        return convexHull2D(projected)
+
     def toString(self):
         return "MeshData(_vertices=" + str(self._vertices) + ", _normals=" + str(self._normals) + ", _indices=" + \
                str(self._indices) + ", _colors=" + str(self._colors) + ", _uvs=" + str(self._uvs) +") "
@@ -297,6 +363,89 @@ def uniqueVertices(vertices):
     _, idx = numpy.unique(vertex_byte_view, return_index=True)
     return vertices[idx]  # Select the unique rows by index.
 
+##  Round an array of vertices off to the nearest multiple of unit and extract the unique vertices
+#
+#   This has the same result as uniqueVertices(roundVertexArray(vertices, unit)),
+#   but finds the unique vertices by sorting one integer per vertex rather
+#   than the bytes of each vertex, which is a lot faster.
+#
+#   \param vertices \type{numpy.ndarray} the source array of vertices
+#   \param unit \type{float} the unit to scale the vertices to
+#   \return \type{numpy.ndarray} the array of unique rounded vertices
+def uniqueRoundedVertices(vertices, unit):
+    grid = (vertices / unit).round(0)
+    if len(grid) == 0:
+        return grid * unit
+    offset = grid.min(axis = 0)
+    grid -= offset
+    if not grid.max() < 2 ** 21: # The grid coordinates of a vertex don't fit in one 64-bit integer.
+        return uniqueVertices(roundVertexArray(vertices, unit))
+
+    grid = grid.astype(numpy.int64)
+    keys = numpy.unique((grid[:, 0] << 42) | (grid[:, 1] << 21) | grid[:, 2])
+    grid = numpy.stack((keys >> 42, (keys >> 21) & (2 ** 21 - 1), keys & (2 ** 21 - 1)), axis = 1)
+    return (grid.astype(vertices.dtype) + offset) * unit
+
+##  Merge the vertices of triangles that have the same position
+#
+#   The positions are compared in single precision, by sorting their bits.
+#   Vertices that are not used by any triangle are left out, as are triangles
+#   that lose their area since two of their corners merged.
+#
+#   \param vertices \type{numpy.ndarray} the source array of vertices
+#   \param indices \type{numpy.ndarray} the indices of the vertices of each triangle
+#   \return \type{tuple} the array of merged vertices, as single precision
+#   floats, and the array of the indices of the merged vertices of each triangle
+def weldVertices(vertices, indices):
+    used = vertices[indices.ravel()].astype(numpy.float32) + numpy.float32(0) # Also turns -0 into 0.
+
+    # Sort the positions by their bits, such that equal positions end up next to each other.
+    bits = used.view(numpy.uint32).astype(numpy.uint64)
+    order = numpy.lexsort((bits[:, 2], (bits[:, 0] << numpy.uint64(32)) | bits[:, 1]))
+    sorted_bits = bits[order]
+    is_new = numpy.ones(len(order), dtype = numpy.bool_)
+    is_new[1:] = (sorted_bits[1:] != sorted_bits[:-1]).any(axis = 1)
+
+    welded_indices = numpy.empty(len(order), dtype = numpy.int64)
+    welded_indices[order] = numpy.cumsum(is_new) - 1
+    welded_indices = welded_indices.reshape(-1, 3)
+    has_area = (welded_indices[:, 0] != welded_indices[:, 1]) & (welded_indices[:, 1] != welded_indices[:, 2]) & (welded_indices[:, 2] != welded_indices[:, 0])
+    return used[order[is_new]], welded_indices[has_area]
+
+_HULL_FILTER_DIRECTIONS = numpy.array([direction for direction in itertools.product((-1, 0, 1), repeat = 3) if any(direction)], numpy.float64)
+
+##  Remove the vertices that certainly lie inside the convex hull of an array of vertices
+#
+#   The vertices that lie furthest along a number of fixed directions span a
+#   polytope within the convex hull. Vertices inside that polytope can not be
+#   on the convex hull, so they can be left out before computing it.
+#
+#   \param vertices \type{numpy.ndarray} the source array of vertices
+#   \return \type{numpy.ndarray} the vertices that may lie on the convex hull
+def removeInteriorVertices(vertices):
+    coordinates = numpy.ascontiguousarray(numpy.transpose(vertices))
+    extremes = numpy.unique(_HULL_FILTER_DIRECTIONS.astype(coordinates.dtype).dot(coordinates).argmax(axis = 1))
+    if len(extremes) < 4:
+        return vertices
+    try:
+        polytope = scipy.spatial.ConvexHull(vertices[extremes])
+    except scipy.spatial.QhullError: # The extreme vertices lie in one plane, so nothing lies inside them.
+        return vertices
+
+    normals = polytope.equations[:, :3].astype(coordinates.dtype)
+    offsets = polytope.equations[:, 3:].astype(coordinates.dtype) + HULL_FILTER_TOLERANCE
+
+    # Most vertices of meshes that are nearly convex lie on the surface, so check whether filtering is worth it.
+    sample = coordinates[:, ::max(1, len(vertices) // 4096)]
+    if numpy.mean((normals.dot(sample) + offsets).max(axis = 0) <= 0) < 0.1:
+        return vertices
+
+    outside = numpy.empty(len(vertices), dtype = numpy.bool_)
+    for start in range(0, len(vertices), 65536): # In blocks, to keep the distances to all faces small.
+        block = slice(start, start + 65536)
+        outside[block] = (normals.dot(coordinates[:, block]) + offsets).max(axis = 0) > 0
+    return vertices[outside]
+
 ##  Compute an approximation of the convex hull of an array of vertices
 #
 #   \param vertices \type{numpy.ndarray} the source array of vertices
@@ -304,33 +453,108 @@ def uniqueVertices(vertices):
 #   \return \type{scipy.spatial.qhull.ConvexHull} the convex hull or None if the input was degenerate
 def approximateConvexHull(vertex_data, target_count):
     start_time = time()
+    input_count = len(vertex_data)
 
     input_max = target_count * 50   # Maximum number of vertices we want to feed to the convex hull algorithm.
     unit_size = 0.125               # Initial rounding interval. i.e. round to 0.125.
 
+    # Leave out the vertices that can't be on the hull before rounding off the others.
+    if len(vertex_data) > target_count:
+        vertex_data = removeInteriorVertices(vertex_data)
+
     # Round off vertices and extract the uniques until the number of vertices is below the input_max.
     while len(vertex_data) > input_max:
-        vertex_data = uniqueVertices(roundVertexArray(vertex_data, unit_size))
+        vertex_data = uniqueRoundedVertices(vertex_data, unit_size)
         unit_size *= 2
 
     if len(vertex_data) < 4:
         return None
 
-    # Take the convex hull and keep on rounding it off until the number of vertices is below the target_count.
-    hull_result = scipy.spatial.ConvexHull(vertex_data)
-    vertex_data = numpy.take(hull_result.points, hull_result.vertices, axis=0)
-
-    while len(vertex_data) > target_count:
-        vertex_data = uniqueVertices(roundVertexArray(vertex_data, unit_size))
+    try:
+        # Take the convex hull and keep on rounding it off until the number of vertices is below the target_count.
         hull_result = scipy.spatial.ConvexHull(vertex_data)
         vertex_data = numpy.take(hull_result.points, hull_result.vertices, axis=0)
-        unit_size *= 2
+
+        while len(vertex_data) > target_count:
+            vertex_data = uniqueRoundedVertices(vertex_data, unit_size)
+            hull_result = scipy.spatial.ConvexHull(vertex_data)
+            vertex_data = numpy.take(hull_result.points, hull_result.vertices, axis=0)
+            unit_size *= 2
+    except scipy.spatial.QhullError: # All vertices lie in one plane.
+        return None
 
     end_time = time()
     Logger.log("d", "approximateConvexHull(target_count=%s) Calculating 3D convex hull took %s seconds. %s input vertices. %s output vertices.",
-               target_count, end_time - start_time, len(vertex_data), len(hull_result.vertices))
+               target_count, end_time - start_time, input_count, len(hull_result.vertices))
     return hull_result
 
+##  Group the triangles of a convex hull into the flat faces they form
+#
+#   \param hull \type{scipy.spatial.qhull.ConvexHull} the convex hull of a mesh
+#   \return \type{tuple} the outward normals of the faces, which are not
+#   normalised, and the areas of the faces, in the same order
+def convexHullFaces(hull):
+    corners = hull.points[hull.simplices]
+    triangle_areas = numpy.linalg.norm(numpy.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis = 1) / 2
+
+    # Triangles of the same face share their plane, up to rounding errors.
+    _, face_indices = numpy.unique(numpy.round(hull.equations, 3), axis = 0, return_inverse = True)
+    face_indices = face_indices.reshape(-1)
+    face_areas = numpy.bincount(face_indices, weights = triangle_areas)
+    triangle_counts = numpy.bincount(face_indices)
+    face_normals = numpy.stack([numpy.bincount(face_indices, weights = hull.equations[:, axis]) for axis in range(3)], axis = 1) / triangle_counts[:, numpy.newaxis]
+    return face_normals, face_areas
+
+_FOOTPRINT_FILTER_DIRECTIONS = numpy.array([[math.cos(angle), math.sin(angle)] for angle in numpy.linspace(0, 2 * math.pi, 16, endpoint = False)])
+
+##  Compute the convex hull of an array of 2D points
+#
+#   The points that lie furthest along a number of fixed directions span a
+#   polygon within the hull, so the points inside that polygon are left out
+#   first. The hull of the remaining points is found with Andrew's monotone
+#   chain algorithm.
+#
+#   \param points \type{numpy.ndarray} the source array of 2D points
+#   \return \type{numpy.ndarray} the points of the hull, in the same
+#   (clockwise) order as Polygon.getConvexHull() returns
+def convexHull2D(points):
+    points = numpy.asarray(points, numpy.float64)
+
+    # Going around the directions, the extreme points are found in counter-clockwise order.
+    extremes = points.dot(_FOOTPRINT_FILTER_DIRECTIONS.T).argmax(axis = 0)
+    extremes = extremes[extremes != numpy.roll(extremes, 1)]
+    if len(extremes) >= 3:
+        corners = points[extremes]
+        edges = numpy.roll(corners, -1, axis = 0) - corners
+        inside = numpy.ones(len(points), dtype = numpy.bool_)
+        for corner, edge in zip(corners, edges):
+            inside &= edge[0] * (points[:, 1] - corner[1]) - edge[1] * (points[:, 0] - corner[0]) > 1e-9
+        points = points[~inside]
+
+    points = points[numpy.lexsort((points[:, 1], points[:, 0]))]
+    points = points[numpy.concatenate(([True], (numpy.diff(points, axis = 0) != 0).any(axis = 1)))]
+    if len(points) < 3:
+        return points
+    if len(points) > MAXIMUM_MONOTONE_CHAIN_POINTS: # So many points are left that most are on the hull, which qhull finds faster.
+        try:
+            return numpy.flipud(points[scipy.spatial.ConvexHull(points).vertices])
+        except scipy.spatial.QhullError: # All points lie on one line.
+            pass
+
+    sorted_points = points.tolist()
+    lower = _monotoneChain(sorted_points)
+    upper = _monotoneChain(reversed(sorted_points))
+    return numpy.array((lower[:-1] + upper[:-1])[::-1]) # The chains run counter-clockwise.
+
+# Get the half of a convex hull that runs counter-clockwise from the first to the last of a sequence of sorted points.
+def _monotoneChain(points):
+    chain = []
+    for x, y in points:
+        while len(chain) >= 2 and (chain[-1][0] - chain[-2][0]) * (y - chain[-2][1]) - (chain[-1][1] - chain[-2][1]) * (x - chain[-2][0]) <= 0:
+            chain.pop()
+        chain.append((x, y))
+    return chain
+
 ##  Calculate the normals of this mesh, assuming it was created by using addFace (eg; the verts are connected)
 #
 #   \param vertices \type{narray} list of vertices as a 1D list of float triples
@@ -7,17 +7,23 @@ from UM.Scene.SceneNode import SceneNode
 from UM.Math.Vector import Vector
 from UM.Math.Quaternion import Quaternion
 
+from UM.Mesh.MeshData import convexHullFaces, transformVertices
 from UM.Signal import Signal
 
 import math
-import time
 import numpy
+import scipy.spatial
 
 ##  Operation that lays a mesh flat on the scene.
 class LayFlatOperation(Operation.Operation):
     ##  Signal that indicates that the progress meter has changed.
     progress = Signal()
 
+    ##  The ways in which the operation can find the side to lay the mesh on.
+    class Method:
+        LowestVertices = 0 # Rotate the lowest vertices to the same height, in two steps.
+        LargestFace = 1 # Lay the mesh on the face of its convex hull with the largest area.
+
     ##  Creates the operation.
     #
     #   An optional orientation may be added if the answer of this lay flat
@@ -26,12 +32,12 @@ class LayFlatOperation(Operation.Operation):
     #
     #   \param node The scene node to apply the operation on.
     #   \param orientation A pre-calculated result orientation.
-    def __init__(self, node, orientation = None):
+    #   \param method The way to find the side to lay the mesh on, one of
+    #   LayFlatOperation.Method.
+    def __init__(self, node, orientation = None, method = Method.LowestVertices):
         super().__init__()
         self._node = node #Node the operation is applied on.
-
-        self._progress_emit_time = None #Time when the progress signal was most recently emitted.
-        self._progress = 0 #Current progress. Expressed in number of vertices it has processed (ranging from 0 to n).
+        self._method = method
 
         self._old_orientation = node.getOrientation() #Orientation before laying it flat.
         if orientation:
@@ -41,42 +47,51 @@ class LayFlatOperation(Operation.Operation):
 
     ##  Computes some orientation to hopefully lay the object flat.
     #
+    #   Only the vertices of the convex hull of the mesh are considered, since
+    #   the mesh can only rest on those. The progress signal is emitted once
+    #   when the operation is done.
+    def process(self):
+        if self._method == self.Method.LargestFace:
+            self._layOnLargestFace()
+        else:
+            self._layOnLowestVertices()
+        self.progress.emit(1)
+
+    ##  Lays the mesh on the largest face of its convex hull.
+    #
+    #   The triangles of the convex hull that lie in the same plane together
+    #   form one face, so the mesh ends up resting on a real flat side.
+    def _layOnLargestFace(self):
+        vertices = self._getHullVertices()
+        if vertices is None or len(vertices) < 4:
+            return
+        try:
+            hull = scipy.spatial.ConvexHull(vertices)
+        except scipy.spatial.QhullError: #The mesh is flat already.
+            return
+
+        face_normals, face_areas = convexHullFaces(hull)
+        normal = face_normals[numpy.argmax(face_areas)] #Points outwards, so away from the build plate once laid flat.
+        normal /= numpy.linalg.norm(normal)
+        rotation = Quaternion.rotationTo(Vector(float(normal[0]), float(normal[1]), float(normal[2])), Vector(0, -1, 0))
+        self._node.rotate(rotation, SceneNode.TransformSpace.Parent)
+
+        self._new_orientation = self._node.getOrientation() #Save the resulting orientation.
+
+    ##  Rotates the mesh such that its lowest vertices get the same height.
+    #
     #   No promises! This algorithm finds the lowest three vertices and lays
     #   them flat. This is a rather naive heuristic, but fast and practical.
-    def process(self):
+    def _layOnLowestVertices(self):
         # Based on https://github.com/daid/Cura/blob/SteamEngine/Cura/util/printableObject.py#L207
         # Note: Y & Z axis are swapped
 
-        #Transform mesh first to get the current positions of the vertices.
-        transformed_vertices = None
-        if not self._node.callDecoration("isGroup"):
-            transformed_vertices = self._node.getMeshDataTransformed().getVertices()
-        else:
-            #For groups, get the vertices of all children and process them as a single mesh
-            for child in self._node.getChildren():
-                if transformed_vertices is None:
-                    transformed_vertices = child.getMeshDataTransformed().getVertices()
-                else:
-                    transformed_vertices = numpy.concatenate((transformed_vertices, child.getMeshDataTransformed().getVertices()), axis = 0)
-
-        min_y_vertex = transformed_vertices[transformed_vertices.argmin(0)[1]]
-        dot_min = 1.0 #Minimum y-component of direction vector.
-        dot_v = None
-
         #Find the second-lowest vertex.
-        for v in transformed_vertices:
-            diff = v - min_y_vertex #From this vertex to the lowest vertex.
-            length = math.sqrt(diff[0] * diff[0] + diff[1] * diff[1] + diff[2] * diff[2])
-            if length < 5: #Ignore lines smaller than half a centimetre. It's unreliable at such small distances.
-                continue
-            dot = (diff[1] / length) #Y-component of direction vector.
-            if dot_min > dot:
-                dot_min = dot
-                dot_v = diff
-            self._emitProgress(1)
-
+        vertices = self._getHullVertices()
+        if vertices is None:
+            return
+        dot_v, dot_min = self._findSecondLowestVertex(vertices, [0, 1, 2])
         if dot_v is None: #Couldn't find any vertex further than 5mm from the lowest vertex.
-            self._emitProgress(len(transformed_vertices))
             return
 
         #Rotate the mesh such that the second-lowest vertex is just as low as the lowest vertex.
@@ -85,33 +100,8 @@ class LayFlatOperation(Operation.Operation):
         rad = -math.asin(dot_min)
         self._node.rotate(Quaternion.fromAngleAxis(rad, Vector.Unit_Z), SceneNode.TransformSpace.Parent)
 
-        #Apply the transformation so we get new vertex coordinates.
-        transformed_vertices = None
-        if not self._node.callDecoration("isGroup"):
-            transformed_vertices = self._node.getMeshDataTransformed().getVertices()
-        else:
-            #For groups, get the vertices of all children and process them as a single mesh
-            for child in self._node.getChildren():
-                if transformed_vertices is None:
-                    transformed_vertices = child.getMeshDataTransformed().getVertices()
-                else:
-                    transformed_vertices = numpy.concatenate((transformed_vertices, child.getMeshDataTransformed().getVertices()), axis = 0)
-        min_y_vertex = transformed_vertices[transformed_vertices.argmin(0)[1]]
-        dot_min = 1.0
-        dot_v = None
-
-        #Find the second-lowest vertex again.
-        for v in transformed_vertices:
-            diff = v - min_y_vertex #From this vertex to the lowest vertex.
-            length = math.sqrt(diff[2] * diff[2] + diff[1] * diff[1])
-            if length < 5: #Ignore lines smaller than half a centimetre. It's unreliable at such small distances.
-                continue
-            dot = (diff[1] / length) #Y-component of direction vector.
-            if dot_min > dot:
-                dot_min = dot
-                dot_v = diff
-            self._emitProgress(1)
-
+        #Find the second-lowest vertex again, in the new vertex coordinates.
+        dot_v, dot_min = self._findSecondLowestVertex(self._getHullVertices(), [1, 2])
         if dot_v is None: #Couldn't find any vertex further than 5mm from the lowest vertex.
             self._node.setOrientation(self._old_orientation)
             return
@@ -125,22 +115,54 @@ class LayFlatOperation(Operation.Operation):
 
         self._new_orientation = self._node.getOrientation() #Save the resulting orientation.
 
-    ##  Increments the progress.
+    ##  Finds the vertex that lies at the steepest downward angle from the
+    #   lowest vertex.
     #
-    #   This lets the progress bar update to give the user an impression of how
-    #   long he still has to wait.
+    #   \param vertices The vertices to search through.
+    #   \param axes The axes along which the distance to the lowest vertex is
+    #   measured.
+    #   \return A tuple of the direction from the lowest vertex to that vertex
+    #   and the Y-component of that direction normalised, or (None, None) if
+    #   no vertex is far enough from the lowest vertex.
+    def _findSecondLowestVertex(self, vertices, axes):
+        diffs = vertices - vertices[vertices[:, 1].argmin()] #From each vertex to the lowest vertex.
+        lengths = numpy.sqrt(numpy.sum(diffs[:, axes] ** 2, axis = 1))
+        diffs = diffs[lengths >= 5] #Ignore lines smaller than half a centimetre. It's unreliable at such small distances.
+        if len(diffs) == 0:
+            return None, None
+        dots = diffs[:, 1] / lengths[lengths >= 5] #Y-component of direction vector.
+
+        index = dots.argmin()
+        if dots[index] >= 1.0: #All vertices are straight above the lowest vertex.
+            return None, None
+        return diffs[index], float(dots[index])
+
+    ##  Gets the vertices of the convex hull of the mesh, in world coordinates.
     #
-    #   \param progress The amount of progress made since the last emission.
-    def _emitProgress(self, progress):
-        # Rate-limited progress notification
-        # This is done to prevent the UI from being flooded with progress signals.
-        self._progress += progress
-
-        new_time = time.monotonic()
-        if not self._progress_emit_time or new_time - self._progress_emit_time > 0.5: #Must be longer than half a second ago.
-            self.progress.emit(self._progress)
-            self._progress_emit_time = new_time
-            self._progress = 0
+    #   For groups, the vertices of the convex hulls of all children are
+    #   processed as a single mesh. Meshes that are too small to have a convex
+    #   hull contribute all their vertices.
+    #
+    #   \return An array of vertices, or None if the node has no mesh.
+    def _getHullVertices(self):
+        if self._node.callDecoration("isGroup"):
+            nodes = self._node.getChildren()
+        else:
+            nodes = [self._node]
+
+        vertices = []
+        for node in nodes:
+            mesh_data = node.getMeshData()
+            if mesh_data is None or mesh_data.getVertices() is None:
+                continue
+            if mesh_data.getConvexHull() is not None:
+                vertices.append(mesh_data.getConvexHullTransformedVertices(node.getWorldTransformation()))
+            else:
+                vertices.append(transformVertices(mesh_data.getVertices(), node.getWorldTransformation()))
+
+        if not vertices:
+            return None
+        return numpy.concatenate(vertices, axis = 0)
 
     ##  Undoes this lay flat operation.
     def undo(self):
@@ -173,7 +195,7 @@ class LayFlatOperation(Operation.Operation):
         if other._new_orientation is None or self._new_orientation is None: #Both must have been valid operations (completed computation).
             return False
 
-        op = LayFlatOperation(self._node, self._new_orientation) #Use the same new orientation as this one.
+        op = LayFlatOperation(self._node, self._new_orientation, self._method) #Use the same new orientation as this one.
         op._old_orientation = other._old_orientation #But use the old orientation of the other one.
         return op
 
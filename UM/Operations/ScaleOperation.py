@@ -46,8 +46,9 @@ class ScaleOperation(Operation.Operation):
         elif self._relative_scale: #Scale relatively to the current scale.
             scale_factor = Vector()
             ## Ensure that the direction is correctly applied (it can be flipped due to mirror)
-            if self._scale.z == self._scale.y and self._scale.y == self._scale.x:
-                ratio = (1 / (self._node.getScale().x + self._node.getScale().y + self._node.getScale().z)) * 3
+            scale_sum = self._node.getScale().x + self._node.getScale().y + self._node.getScale().z
+            if self._scale.z == self._scale.y and self._scale.y == self._scale.x and scale_sum != 0:
+                ratio = (1 / scale_sum) * 3
                 ratio_vector = ratio * self._node.getScale()
                 self._scale *= ratio_vector
             if self._node.getScale().x > 0:
@@ -65,11 +66,11 @@ class ScaleOperation(Operation.Operation):
 
             current_scale = self._node.getScale()
 
-            if scale_factor.x != 0:
+            if scale_factor.x != 0 and current_scale.x != 0: #A scale of 0 can't be scaled relatively.
                 scale_factor = scale_factor.set(x=scale_factor.x / current_scale.x)
-            if scale_factor.y != 0:
+            if scale_factor.y != 0 and current_scale.y != 0: #A scale of 0 can't be scaled relatively.
                 scale_factor = scale_factor.set(y=scale_factor.y / current_scale.y)
-            if scale_factor.z != 0:
+            if scale_factor.z != 0 and current_scale.z != 0: #A scale of 0 can't be scaled relatively.
                 scale_factor = scale_factor.set(z=scale_factor.z / current_scale.z)
 
             self._node.setPosition(-self._scale_around_point) #If scaling around a point, shift that point to the axis origin first and shift it back after performing the transformation.
@@ -0,0 +1,223 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+
+from UM.Job import Job
+from UM.Logger import Logger
+from UM.Math.Polygon import Polygon
+from UM.Math.Vector import Vector
+from UM.Operations.GroupedOperation import GroupedOperation
+from UM.Operations.TranslateOperation import TranslateOperation
+from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
+
+##  A job that places scene nodes on the build plate such that they do not overlap.
+#
+#   The footprints of the nodes are rasterised onto a grid of cells covering
+#   the build plate. A cell is occupied if a footprint, grown by half the
+#   spacing, touches the cell at all, so nodes that are placed in free cells
+#   can never overlap. The nodes are placed one by one, the largest first,
+#   packed from a corner of the build plate such that the placed nodes stay
+#   within as small a square as possible. All free positions of a node are
+#   found at once by correlating its raster with the occupied cells through a
+#   fast Fourier transform. When all nodes are placed, they are moved together
+#   to the centre of the build plate, if that does not make them overlap any
+#   fixed area.
+#
+#   The result of the job is a GroupedOperation that moves all placed nodes,
+#   or None if the job was cancelled. The operation is not pushed by the job,
+#   since the scene should only be changed from the main thread.
+class ArrangeJob(Job):
+    ##  Creates a new arrange job.
+    #
+    #   \param nodes \type{list} The scene nodes to arrange.
+    #   \param build_plate \type{Polygon} The convex outline of the build
+    #   plate, in the X and Z coordinates of the world.
+    #   \param fixed_polygons \type{list} Polygons, in the same coordinates,
+    #   of the areas where no node may be placed, such as the footprints of
+    #   nodes that are not arranged.
+    #   \param spacing \type{float} The minimum distance between two nodes.
+    #   \param resolution \type{float} The size of the cells of the grid.
+    def __init__(self, nodes, build_plate, fixed_polygons = None, spacing = 2.0, resolution = 1.0):
+        super().__init__()
+        self._nodes = nodes
+        self._build_plate = build_plate
+        self._fixed_polygons = fixed_polygons if fixed_polygons is not None else []
+        self._spacing = spacing
+        self._resolution = resolution
+        self._cancelled = False
+        self._unplaced_nodes = []
+
+    ##  Stop arranging.
+    #
+    #   This also stops the job if it is already running, in which case it
+    #   finishes without result.
+    def cancel(self):
+        self._cancelled = True
+        super().cancel()
+
+    ##  Check whether the job was cancelled.
+    def isCancelled(self):
+        return self._cancelled
+
+    ##  Get the nodes that did not fit on the build plate.
+    #
+    #   These nodes are not moved by the resulting operation.
+    def getUnplacedNodes(self):
+        return self._unplaced_nodes
+
+    def run(self):
+        plate_points = self._build_plate.getPoints()
+        origin = plate_points.min(axis = 0)
+        shape = numpy.ceil((plate_points.max(axis = 0) - origin) / self._resolution).astype(numpy.int64)
+        shape = (int(shape[1]), int(shape[0])) # Rows along the Z axis, columns along the X axis.
+
+        fixed = ~self._getCellsOnPlate(origin, shape)
+        for polygon in self._fixed_polygons:
+            mask, (row, column) = self._rasterise(polygon, origin)
+            self._addToGrid(fixed, mask, row, column)
+        occupied = fixed.copy()
+
+        footprints = []
+        for node in self._nodes:
+            footprint = self._getFootprint(node)
+            if footprint is None:
+                Logger.log("w", "Cannot arrange node %s since it has no footprint.", node.getName())
+                continue
+            footprints.append((node, footprint))
+        footprints.sort(key = lambda item: -self._getArea(item[1].getPoints()))
+
+        placed = [] # Tuples of a node and the amount of cells to move it by.
+        self._unplaced_nodes = []
+        for index, (node, footprint) in enumerate(footprints):
+            if self._cancelled:
+                return
+
+            mask, (row, column) = self._rasterise(footprint, origin)
+            position = self._findPosition(occupied, mask)
+            if position is None:
+                self._unplaced_nodes.append(node)
+                continue
+
+            self._addToGrid(occupied, mask, position[0], position[1])
+            placed.append((node, numpy.array(position) - (row, column)))
+
+            self.progress.emit(self, 100 * (index + 1) // len(footprints))
+            Job.yieldThread()
+
+        offset = self._getCentringOffset(fixed, occupied & ~fixed)
+        operation = GroupedOperation()
+        for node, cells in placed:
+            translation = (cells + offset) * self._resolution
+            operation.addOperation(TranslateOperation(node, Vector(float(translation[1]), 0, float(translation[0]))))
+        self.setResult(operation)
+
+    # protected:
+
+    # Get the outline of a node and its children, projected on the build plate.
+    def _getFootprint(self, node):
+        footprint = node.callDecoration("getConvexHull")
+        if isinstance(footprint, Polygon) and footprint.isValid():
+            return footprint
+
+        points = []
+        for descendant in DepthFirstIterator(node):
+            mesh_data = descendant.getMeshData()
+            if mesh_data is None or mesh_data.getVertices() is None:
+                continue
+            points.append(mesh_data.getConvexHullFootprint(descendant.getWorldTransformation()).getPoints())
+
+        if not points:
+            return None
+        if len(points) == 1:
+            return Polygon(points[0])
+        return Polygon(numpy.concatenate(points)).getConvexHull()
+
+    # Get the cells that lie entirely within the build plate.
+    def _getCellsOnPlate(self, origin, shape):
+        rows = origin[1] + numpy.arange(shape[0] + 1) * self._resolution
+        columns = origin[0] + numpy.arange(shape[1] + 1) * self._resolution
+        corners = self._isInside(self._build_plate.getConvexHull().getPoints(), columns, rows)
+        return corners[:-1, :-1] & corners[1:, :-1] & corners[:-1, 1:] & corners[1:, 1:]
+
+    # Get the cells that a polygon touches, including the spacing around it.
+    #
+    # The cells are returned as a mask of the box of cells around the polygon,
+    # along with the row and column of the first cell of that box in the grid.
+    def _rasterise(self, polygon, origin):
+        # A cell is touched by the polygon if its centre lies in the polygon grown by half a cell.
+        margin = (self._resolution + self._spacing) / 2
+        square = Polygon(numpy.array([[-margin, -margin], [-margin, margin], [margin, margin], [margin, -margin]], numpy.float32))
+        points = polygon.getMinkowskiHull(square).getPoints()
+
+        first = numpy.floor((points.min(axis = 0) - origin) / self._resolution).astype(numpy.int64)
+        last = numpy.ceil((points.max(axis = 0) - origin) / self._resolution).astype(numpy.int64)
+        rows = origin[1] + (numpy.arange(first[1], last[1]) + 0.5) * self._resolution
+        columns = origin[0] + (numpy.arange(first[0], last[0]) + 0.5) * self._resolution
+        return self._isInside(points, columns, rows), (int(first[1]), int(first[0]))
+
+    # Find where a mask can be added to the grid without touching occupied cells.
+    #
+    # \return The row and column of the first cell of the mask in the grid, or
+    # None if the mask does not fit anywhere.
+    def _findPosition(self, occupied, mask):
+        rows = occupied.shape[0] - mask.shape[0] + 1
+        columns = occupied.shape[1] - mask.shape[1] + 1
+        if rows <= 0 or columns <= 0:
+            return None
+
+        # The correlation counts the occupied cells under the mask for every position at once.
+        # Positions that would wrap around the grid are beyond the valid range and are left out.
+        correlation = numpy.fft.irfft2(numpy.fft.rfft2(occupied, occupied.shape) * numpy.conj(numpy.fft.rfft2(mask, occupied.shape)), occupied.shape)
+        free = correlation[:rows, :columns] < 0.5
+        if not free.any():
+            return None
+
+        # Prefer the position that keeps the placed nodes within the smallest square from the corner.
+        extents = numpy.maximum(numpy.arange(rows)[:, numpy.newaxis] + mask.shape[0], numpy.arange(columns) + mask.shape[1])
+        costs = numpy.where(free, extents, numpy.iinfo(extents.dtype).max)
+        return numpy.unravel_index(numpy.argmin(costs), costs.shape)
+
+    # Get the amount of cells by which the placed nodes can be moved together to the centre of the grid.
+    #
+    # \return The amount of rows and columns to move by, or zeroes if the
+    # placed nodes would overlap the fixed cells in the centre.
+    def _getCentringOffset(self, fixed, placed):
+        rows = numpy.flatnonzero(placed.any(axis = 1))
+        columns = numpy.flatnonzero(placed.any(axis = 0))
+        if len(rows) == 0:
+            return numpy.zeros(2, numpy.int64)
+
+        offset = numpy.array([(placed.shape[0] - rows[-1] - 1 - rows[0]) // 2, (placed.shape[1] - columns[-1] - 1 - columns[0]) // 2])
+        box = placed[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1]
+        target = fixed[rows[0] + offset[0]:rows[-1] + 1 + offset[0], columns[0] + offset[1]:columns[-1] + 1 + offset[1]]
+        if (box & target).any():
+            return numpy.zeros(2, numpy.int64)
+        return offset
+
+    # Mark the cells of a mask as occupied, leaving out any part that lies outside the grid.
+    def _addToGrid(self, occupied, mask, row, column):
+        top = max(row, 0)
+        left = max(column, 0)
+        bottom = min(row + mask.shape[0], occupied.shape[0])
+        right = min(column + mask.shape[1], occupied.shape[1])
+        if top < bottom and left < right:
+            occupied[top:bottom, left:right] |= mask[top - row:bottom - row, left - column:right - column]
+
+    # Test for a grid of points whether they lie within a convex polygon.
+    #
+    # \return A boolean array with a row for each Y coordinate and a column for
+    # each X coordinate.
+    def _isInside(self, points, columns, rows):
+        edges = numpy.roll(points, -1, axis = 0) - points
+        orientation = numpy.sign(numpy.sum(points[:, 0] * edges[:, 1] - points[:, 1] * edges[:, 0]))
+
+        inside = numpy.ones((len(rows), len(columns)), dtype = numpy.bool_)
+        for point, edge in zip(points, edges):
+            # The sign of the cross product with the edge tells the side of the edge the point is on.
+            cross = edge[0] * (rows[:, numpy.newaxis] - point[1]) - edge[1] * (columns - point[0])
+            inside &= orientation * cross >= -1e-9
+        return inside
+
+    def _getArea(self, points):
+        return abs(numpy.sum(points[:, 0] * numpy.roll(points[:, 1], -1) - points[:, 1] * numpy.roll(points[:, 0], -1))) / 2
@@ -0,0 +1,210 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import math
+
+import numpy
+import scipy.spatial
+
+from UM.Job import Job
+from UM.Logger import Logger
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import convexHullFaces, transformVertices
+from UM.Operations.SetTransformOperation import SetTransformOperation
+from UM.Scene.Iterator.DepthFirstIterator import DepthFirstIterator
+
+##  A job that finds the orientation in which a scene node prints best.
+#
+#   The candidate orientations are described by the direction in the mesh that
+#   would point down. They are taken from the normals of the largest faces of
+#   the convex hull of the node, on which it could rest, and from directions
+#   evenly spread over a sphere. Each candidate is scored for the area of the
+#   faces that would hang over and need support, the area of the faces that
+#   would rest on the build plate and the height of the node. Only the
+#   direction that points up matters for these scores, so all candidates are
+#   scored at once with a product of the face normals and centres with the
+#   up directions, taken over blocks of faces to limit the memory use.
+#
+#   The result of the job is a SetTransformOperation that rotates the node to
+#   the best orientation, or None if the job was cancelled or the node has no
+#   faces. The operation is not pushed by the job, since the scene should only
+#   be changed from the main thread.
+class AutoOrientJob(Job):
+    ##  Creates a new auto orient job.
+    #
+    #   The scores are fractions of the total area of the faces and of the
+    #   largest extent of the node, weighed by the given weights. The
+    #   orientation with the lowest sum of weighed overhang area and height,
+    #   minus the weighed contact area, wins.
+    #
+    #   \param node \type{SceneNode} The scene node to orient.
+    #   \param overhang_angle \type{float} The angle in radians below the
+    #   horizontal from which downward facing faces need support.
+    #   \param sample_count \type{int} The amount of directions on a sphere to
+    #   try, besides the normals of the convex hull.
+    #   \param overhang_weight \type{float} The weight of the overhang area.
+    #   \param contact_weight \type{float} The weight of the contact area.
+    #   \param height_weight \type{float} The weight of the build height.
+    def __init__(self, node, overhang_angle = math.radians(45), sample_count = 128, overhang_weight = 1.0, contact_weight = 0.5, height_weight = 0.25):
+        super().__init__()
+        self._node = node
+        self._overhang_angle = overhang_angle
+        self._sample_count = sample_count
+        self._overhang_weight = overhang_weight
+        self._contact_weight = contact_weight
+        self._height_weight = height_weight
+        self._cancelled = False
+        self._scores = None
+
+    ##  The number of faces to score at once.
+    #
+    #   The scores of a block of faces for all candidates should fit in the
+    #   processor cache.
+    BlockSize = 2048
+
+    ##  The maximum number of faces of the convex hull to try to rest the node on.
+    MaximumHullFaces = 64
+
+    ##  The distance in millimetres above the build plate within which faces touch it.
+    ContactDistance = 0.1
+
+    ##  Stop orienting.
+    #
+    #   This also stops the job if it is already running, in which case it
+    #   finishes without result.
+    def cancel(self):
+        self._cancelled = True
+        super().cancel()
+
+    ##  Check whether the job was cancelled.
+    def isCancelled(self):
+        return self._cancelled
+
+    ##  Get the candidate orientations and their scores.
+    #
+    #   \return A tuple of an array of the directions that would point down
+    #   and an array of the score of each direction, lower being better, or
+    #   None if the job did not finish.
+    def getScores(self):
+        return self._scores
+
+    def run(self):
+        vertices, triangles = self._getTriangles()
+        if triangles is None:
+            Logger.log("w", "Cannot orient node %s since it has no faces.", self._node.getName())
+            return
+
+        normals = numpy.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        areas = numpy.linalg.norm(normals, axis = 1)
+        normals /= numpy.maximum(areas, 1e-12)[:, numpy.newaxis]
+        areas /= 2
+        centres = triangles.mean(axis = 1)
+        del triangles
+
+        downs = self._getCandidates(vertices)
+        ups = -downs
+
+        # Single precision halves the work of the products, and is more than precise enough for millimetres.
+        normals = normals.astype(numpy.float32)
+        centres = centres.astype(numpy.float32)
+        block_areas = areas.astype(numpy.float32)
+        block_ups = ups.T.astype(numpy.float32)
+
+        # The height of the node is found from its convex hull, which is much smaller than the mesh.
+        heights = numpy.dot(vertices, ups.T)
+        bottoms = heights.min(axis = 0)
+        extents = heights.max(axis = 0) - bottoms
+
+        overhang_areas = numpy.zeros(len(ups))
+        contact_areas = numpy.zeros(len(ups))
+        overhang_limit = -math.sin(self._overhang_angle)
+        contact_limit = -math.cos(math.radians(1)) # Faces touching the build plate must be nearly flat.
+        contact_heights = (bottoms + self.ContactDistance).astype(numpy.float32)
+        progress = 0
+        for start in range(0, len(areas), self.BlockSize):
+            if self._cancelled:
+                return
+
+            block = slice(start, start + self.BlockSize)
+            up_components = numpy.dot(normals[block], block_ups) # Cosine of the angle with the up direction of each candidate.
+            touching = numpy.dot(centres[block], block_ups) < contact_heights
+            overhang_areas += numpy.dot(block_areas[block], ((up_components < overhang_limit) & ~touching).astype(numpy.float32))
+            contact_areas += numpy.dot(block_areas[block], ((up_components < contact_limit) & touching).astype(numpy.float32))
+
+            new_progress = 100 * min(start + self.BlockSize, len(areas)) // len(areas)
+            if new_progress != progress:
+                progress = new_progress
+                self.progress.emit(self, progress)
+                Job.yieldThread()
+
+        total_area = max(areas.sum(), 1e-12)
+        scores = self._overhang_weight * overhang_areas / total_area \
+            - self._contact_weight * contact_areas / total_area \
+            + self._height_weight * extents / max(extents.max(), 1e-12)
+        self._scores = (downs, scores)
+
+        down = downs[numpy.argmin(scores)]
+        rotation = Quaternion.rotationTo(Vector(float(down[0]), float(down[1]), float(down[2])), Vector(0, -1, 0))
+        parent = self._node.getParent()
+        if parent:
+            # The rotation is found in world coordinates, but the orientation of the node is relative to its parent.
+            parent_orientation = parent.getWorldOrientation()
+            rotation = parent_orientation.getInverse() * rotation * parent_orientation
+        self.setResult(SetTransformOperation(self._node, orientation = rotation * self._node.getOrientation()))
+
+    # protected:
+
+    # Get the triangles of the node and its descendants in world coordinates.
+    #
+    # \return A tuple of an array of the vertices of the convex hull of the
+    # triangles and an array of the triangles, as three vertices each, or a
+    # tuple of None if the node has no faces.
+    def _getTriangles(self):
+        hull_vertices = []
+        triangles = []
+        for node in DepthFirstIterator(self._node):
+            mesh_data = node.getMeshData()
+            if mesh_data is None or mesh_data.getVertices() is None:
+                continue
+
+            vertices = transformVertices(mesh_data.getVertices(), node.getWorldTransformation())
+            if mesh_data.hasIndices():
+                triangles.append(vertices[mesh_data.getIndices()])
+            else:
+                triangles.append(vertices[:len(vertices) // 3 * 3].reshape(-1, 3, 3))
+
+            if mesh_data.getConvexHull() is not None:
+                hull_vertices.append(mesh_data.getConvexHullTransformedVertices(node.getWorldTransformation()))
+            else:
+                hull_vertices.append(vertices)
+
+        if not triangles or sum(len(node_triangles) for node_triangles in triangles) == 0:
+            return None, None
+        return numpy.concatenate(hull_vertices), numpy.concatenate(triangles)
+
+    # Get the directions in the mesh that can be turned to point down.
+    #
+    # These are the outward normals of the largest faces of the convex hull,
+    # followed by directions spread evenly over a sphere with a Fibonacci
+    # lattice, and the current down direction.
+    def _getCandidates(self, vertices):
+        candidates = [numpy.array([[0.0, -1.0, 0.0]])]
+
+        try:
+            hull = scipy.spatial.ConvexHull(vertices)
+        except (scipy.spatial.QhullError, ValueError): # The mesh is flat, so it has no faces to rest on.
+            hull = None
+        if hull is not None:
+            face_normals, face_areas = convexHullFaces(hull)
+            candidates.append(face_normals[numpy.argsort(-face_areas)[:self.MaximumHullFaces]])
+
+        if self._sample_count > 0:
+            indices = numpy.arange(self._sample_count) + 0.5
+            heights = 1 - 2 * indices / self._sample_count
+            radii = numpy.sqrt(1 - heights ** 2)
+            angles = math.pi * (1 + math.sqrt(5)) * indices
+            candidates.append(numpy.stack((radii * numpy.cos(angles), heights, radii * numpy.sin(angles)), axis = 1))
+
+        candidates = numpy.concatenate(candidates)
+        return candidates / numpy.linalg.norm(candidates, axis = 1)[:, numpy.newaxis]
@@ -28,6 +28,10 @@ class Camera(SceneNode.SceneNode):
         self._window_width = 0
         self._window_height = 0
 
+        # Cached results of inverting the projection and world transformation, until either changes.
+        self._unprojection = None
+        self._view_matrix = None
+
         self.setCalculateBoundingBox(False)
 
     ##  Get the projection matrix of this camera.
@@ -58,6 +62,13 @@ class Camera(SceneNode.SceneNode):
     #   \param matrix The projection matrix to use for this camera.
     def setProjectionMatrix(self, matrix):
         self._projection_matrix = matrix
+        self._unprojection = None
+
+    ##  Get the view matrix of this camera, the inverse of its world transformation.
+    def getViewMatrix(self):
+        if self._view_matrix is None:
+            self._view_matrix = self.getWorldTransformation().getInverse()
+        return copy.deepcopy(self._view_matrix)
 
     def isPerspective(self):
         return self._perspective
@@ -82,18 +93,14 @@ class Camera(SceneNode.SceneNode):
         view_x = (window_x / self._viewport_width) * 2 - 1
         view_y = (window_y / self._viewport_height) * 2 - 1
 
-        inverted_projection = numpy.linalg.inv(self._projection_matrix.getData().copy())
-        transformation = self.getWorldTransformation().getData()
-
-        near = numpy.array([view_x, -view_y, -1.0, 1.0], dtype = numpy.float32)
-        near = numpy.dot(inverted_projection, near)
-        near = numpy.dot(transformation, near)
-        near = near[0:3] / near[3]
+        if self._unprojection is None:
+            # From the view plane to world coordinates: the inverse projection followed by the world transformation.
+            inverted_projection = numpy.linalg.inv(self._projection_matrix.getData().astype(numpy.float64))
+            self._unprojection = numpy.dot(self.getWorldTransformation().getData().astype(numpy.float64), inverted_projection)
 
-        far = numpy.array([view_x, -view_y, 1.0, 1.0], dtype = numpy.float32)
-        far = numpy.dot(inverted_projection, far)
-        far = numpy.dot(transformation, far)
-        far = far[0:3] / far[3]
+        points = numpy.dot(self._unprojection, numpy.array([[view_x, view_x], [-view_y, -view_y], [-1.0, 1.0], [1.0, 1.0]]))
+        near = points[0:3, 0] / points[3, 0]
+        far = points[0:3, 1] / points[3, 1]
 
         dir = far - near
         dir /= numpy.linalg.norm(dir)
@@ -103,9 +110,23 @@ class Camera(SceneNode.SceneNode):
     ##  Project a 3D position onto the 2D view plane.
     def project(self, position):
         projection = self._projection_matrix
-        view = self.getWorldTransformation().getInverse()
+        if self._view_matrix is None:
+            self._view_matrix = self.getWorldTransformation().getInverse()
 
-        position = position.preMultiply(view)
+        position = position.preMultiply(self._view_matrix)
         position = position.preMultiply(projection)
 
-        return position.x / position.z / 2.0, position.y / position.z / 2.0
+        # Positions in the plane of the camera end up infinitely far away, as when the components were numpy floats.
+        with numpy.errstate(divide = "ignore", invalid = "ignore"):
+            depth = numpy.float64(position.z)
+            return position.x / depth / 2.0, position.y / depth / 2.0
+
+    def _transformChanged(self):
+        self._unprojection = None
+        self._view_matrix = None
+        super()._transformChanged()
+
+    def _setTransformations(self, *args, **kwargs):
+        self._unprojection = None
+        self._view_matrix = None
+        super()._setTransformations(*args, **kwargs)
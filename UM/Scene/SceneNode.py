@@ -622,6 +622,24 @@ class SceneNode():
 
         world_scale, world_shear, world_euler_angles, world_translation = self._world_transformation.decompose()
 
+    ##  Set the transformations of this node along with their components, as computed by a TransformStore.
+    #
+    #   Unlike setTransformation(), this does not update the children, since
+    #   the store computes their transformations as well.
+    def _setTransformations(self, transformation, world_transformation, position, scale, shear, orientation, world_position, world_scale, world_orientation):
+        self._transformation = transformation
+        self._world_transformation = world_transformation
+        self._position = position
+        self._scale = scale
+        self._shear = shear
+        self._orientation = orientation
+        self._derived_position = world_position
+        self._derived_scale = world_scale
+        self._derived_orientation = world_orientation
+
+        self._resetAABB()
+        self.transformationChanged.emit(self)
+
     def _resetAABB(self):
         if not self._calculate_aabb:
             return
@@ -0,0 +1,302 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+
+from UM.Math.Matrix import Matrix
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Scene.SceneNode import SceneNode
+
+##  Keeps the transformations of all nodes of a scene tree in contiguous arrays.
+#
+#   Changing the transformation of a scene node multiplies, inverts and
+#   decomposes its matrices one node at a time, and does so again for each of
+#   its descendants. When many nodes are changed at once, this store can be
+#   used instead. It holds the local and world transformations of all nodes
+#   of a subtree as (N, 4, 4) arrays, changes them with batched operations,
+#   and recomputes the world transformations of the changed subtrees one depth
+#   level at a time. apply() then writes the results back to the scene nodes.
+#
+#   The store takes a snapshot of the transformations when it is created. Any
+#   change to the nodes made directly afterwards is overwritten by apply(), so
+#   create a new store or call reload() after such changes.
+class TransformStore:
+    ##  Creates a store for a scene node and all of its descendants.
+    #
+    #   \param root \type{SceneNode} The top node of the subtree to store.
+    def __init__(self, root):
+        self._root = root
+
+        self._nodes = []
+        self._indices = {} # id() of a node -> the index of the node in the arrays.
+        self._parents = None # The index of the parent of each node, or -1 for the root.
+        self._levels = [] # The indices of the nodes at each depth of the tree.
+        self._local = None
+        self._world = None
+        self._dirty = None # Whether the local transformation of each node changed.
+        self._changed = None # Whether the world transformation of each node changed since the last apply().
+
+        self.reload()
+
+    ##  Take a new snapshot of the nodes and their transformations.
+    def reload(self):
+        self._nodes = []
+        self._indices = {}
+        parents = []
+        self._levels = []
+
+        level = [self._root]
+        while level:
+            indices = []
+            next_level = []
+            for node in level:
+                indices.append(len(self._nodes))
+                parents.append(self._indices.get(id(node.getParent()), -1) if node is not self._root else -1)
+                self._indices[id(node)] = len(self._nodes)
+                self._nodes.append(node)
+                next_level.extend(node.getChildren())
+            self._levels.append(numpy.array(indices, dtype = numpy.int64))
+            level = next_level
+        self._parents = numpy.array(parents, dtype = numpy.int64)
+
+        self._local = numpy.array([node._transformation._data for node in self._nodes], dtype = numpy.float64)
+        self._world = numpy.array([node._world_transformation._data for node in self._nodes], dtype = numpy.float64)
+        self._dirty = numpy.zeros(len(self._nodes), dtype = numpy.bool_)
+        self._changed = numpy.zeros(len(self._nodes), dtype = numpy.bool_)
+
+    ##  Get the nodes in the store, in the order of the arrays.
+    #
+    #   Parents always come before their children.
+    def getNodes(self):
+        return self._nodes
+
+    ##  Get the index of a node in the arrays.
+    def indexOf(self, node):
+        return self._indices[id(node)]
+
+    ##  Get the local transformations of all nodes.
+    #
+    #   \return \type{numpy.ndarray} An (N, 4, 4) array. It must not be modified.
+    def getLocalTransformations(self):
+        return self._local
+
+    ##  Get the world transformations of all nodes.
+    #
+    #   \return \type{numpy.ndarray} An (N, 4, 4) array. It must not be modified.
+    def getWorldTransformations(self):
+        self.update()
+        return self._world
+
+    ##  Replace the local transformations of a number of nodes.
+    #
+    #   \param nodes \type{list} The nodes to change.
+    #   \param transformations \type{numpy.ndarray} A (4, 4) array for all
+    #   nodes, or an (N, 4, 4) array with one for each node.
+    def setLocalTransformations(self, nodes, transformations):
+        indices = self._getIndices(nodes)
+        self._local[indices] = transformations
+        self._dirty[indices] = True
+
+    ##  Translate a number of nodes.
+    #
+    #   \param nodes \type{list} The nodes to translate.
+    #   \param translations \type{Vector} The translation of all nodes, or an
+    #   (N, 3) array with the translation of each node.
+    #   \param transform_space The space relative to which to translate. Can be
+    #   any one of the constants in SceneNode::TransformSpace.
+    def translate(self, nodes, translations, transform_space = SceneNode.TransformSpace.Local):
+        matrices = numpy.tile(numpy.identity(4), (len(nodes), 1, 1))
+        matrices[:, :3, 3] = self._toArray(translations)
+        self._transform(nodes, matrices, transform_space)
+
+    ##  Rotate a number of nodes.
+    #
+    #   \param nodes \type{list} The nodes to rotate.
+    #   \param rotations \type{Quaternion} The rotation of all nodes, or an
+    #   (N, 4) array with the XYZW components of the rotation of each node.
+    #   \param transform_space The space relative to which to rotate. Can be
+    #   any one of the constants in SceneNode::TransformSpace.
+    def rotate(self, nodes, rotations, transform_space = SceneNode.TransformSpace.Local):
+        if isinstance(rotations, Quaternion):
+            rotations = numpy.array([rotations.x, rotations.y, rotations.z, rotations.w])
+        rotations = numpy.broadcast_to(numpy.asarray(rotations, dtype = numpy.float64), (len(nodes), 4))
+        self._transform(nodes, _rotationMatrices(rotations), transform_space)
+
+    ##  Scale a number of nodes.
+    #
+    #   \param nodes \type{list} The nodes to scale.
+    #   \param scales \type{Vector} The scale of all nodes, or an (N, 3) array
+    #   with the scale of each node.
+    #   \param transform_space The space relative to which to scale. Can be any
+    #   one of the constants in SceneNode::TransformSpace.
+    def scale(self, nodes, scales, transform_space = SceneNode.TransformSpace.Local):
+        matrices = numpy.tile(numpy.identity(4), (len(nodes), 1, 1))
+        diagonal = numpy.arange(3)
+        matrices[:, diagonal, diagonal] = self._toArray(scales)
+        self._transform(nodes, matrices, transform_space)
+
+    ##  Recompute the world transformations of the nodes of which the local
+    #   transformation, or that of an ancestor, changed.
+    def update(self):
+        if not self._dirty.any():
+            return
+
+        dirty = self._dirty
+        for depth, level in enumerate(self._levels):
+            if depth == 0:
+                if not dirty[level].any():
+                    continue
+                parent = self._root.getParent()
+                parent_world = parent._world_transformation._data if parent else numpy.identity(4)
+                self._world[level] = numpy.matmul(parent_world, self._local[level])
+                continue
+
+            parents = self._parents[level]
+            dirty[level] |= dirty[parents]
+            changed = level[dirty[level]]
+            if len(changed):
+                self._world[changed] = numpy.matmul(self._world[self._parents[changed]], self._local[changed])
+
+        self._changed |= dirty
+        self._dirty = numpy.zeros(len(self._nodes), dtype = numpy.bool_)
+
+    ##  Write the changed transformations back to the scene nodes.
+    #
+    #   The position, orientation and scale of the nodes are decomposed from
+    #   the matrices for all changed nodes at once. The nodes then signal that
+    #   their transformation changed, parents before children.
+    def apply(self):
+        self.update()
+        changed = numpy.flatnonzero(self._changed)
+        if len(changed) == 0:
+            return
+
+        local = _decompose(self._local[changed])
+        world = _decompose(self._world[changed])
+        local_rows = [component.tolist() for component in local]
+        world_rows = [component.tolist() for component in world]
+
+        for row, index in enumerate(changed.tolist()):
+            position, scale, shear, orientation = (component[row] for component in local_rows)
+            world_position, world_scale, world_shear, world_orientation = (component[row] for component in world_rows)
+            self._nodes[index]._setTransformations(
+                Matrix(self._local[index]), Matrix(self._world[index]),
+                Vector(*position), Vector(*scale), Vector(*shear), Quaternion(*orientation),
+                Vector(*world_position), Vector(*world_scale), Quaternion(*world_orientation))
+
+        self._changed[:] = False
+
+    # protected:
+
+    def _getIndices(self, nodes):
+        return numpy.array([self._indices[id(node)] for node in nodes], dtype = numpy.int64)
+
+    def _toArray(self, vectors):
+        if isinstance(vectors, Vector):
+            return vectors.getData()
+        return numpy.asarray(vectors, dtype = numpy.float64)
+
+    # Apply transformation matrices to nodes the same way as SceneNode does.
+    def _transform(self, nodes, matrices, transform_space):
+        enabled = numpy.array([node._enabled for node in nodes], dtype = numpy.bool_) # Like SceneNode, only check the node itself.
+        indices = self._getIndices(nodes)[enabled]
+        matrices = matrices[enabled]
+        if transform_space == SceneNode.TransformSpace.Local:
+            self._local[indices] = numpy.matmul(self._local[indices], matrices)
+        elif transform_space == SceneNode.TransformSpace.Parent:
+            self._local[indices] = numpy.matmul(matrices, self._local[indices])
+        elif transform_space == SceneNode.TransformSpace.World:
+            self.update()
+            world = self._world[indices]
+            self._local[indices] = numpy.matmul(numpy.matmul(numpy.matmul(self._local[indices], numpy.linalg.inv(world)), matrices), world)
+        self._dirty[indices] = True
+
+##  Create rotation matrices from quaternions.
+#
+#   This does the same as Quaternion.toMatrix() for an array of quaternions.
+#
+#   \param quaternions An (N, 4) array of XYZW components.
+#   \return An (N, 4, 4) array of matrices.
+def _rotationMatrices(quaternions):
+    x, y, z, w = quaternions.T
+    s = 2.0 / numpy.sum(quaternions ** 2, axis = 1)
+    xs, ys, zs = s * x, s * y, s * z
+    wx, wy, wz = w * xs, w * ys, w * zs
+    xx, xy, xz = x * xs, x * ys, x * zs
+    yy, yz, zz = y * ys, y * zs, z * zs
+
+    matrices = numpy.zeros((len(quaternions), 4, 4))
+    matrices[:, 0, 0] = 1.0 - (yy + zz)
+    matrices[:, 0, 1] = xy - wz
+    matrices[:, 0, 2] = xz + wy
+    matrices[:, 1, 0] = xy + wz
+    matrices[:, 1, 1] = 1.0 - (xx + zz)
+    matrices[:, 1, 2] = yz - wx
+    matrices[:, 2, 0] = xz - wy
+    matrices[:, 2, 1] = yz + wx
+    matrices[:, 2, 2] = 1.0 - (xx + yy)
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+##  Decompose transformation matrices into their components.
+#
+#   This does the same as Matrix.decompose() for an array of matrices, except
+#   that the orientation is returned as quaternion, like SceneNode stores it.
+#
+#   \param matrices An (N, 4, 4) array of transformation matrices.
+#   \return A tuple of (N, 3) arrays of the translations, scales and shears,
+#   and an (N, 4) array of the XYZW components of the orientations.
+def _decompose(matrices):
+    matrices = matrices / matrices[:, 3:, 3:]
+    translations = matrices[:, :3, 3]
+
+    # Orthonormalise the columns with Gram-Schmidt, keeping the shear between them.
+    rows = numpy.transpose(matrices[:, :3, :3], (0, 2, 1)).copy()
+    scales = numpy.empty((len(matrices), 3))
+    shears = numpy.empty((len(matrices), 3))
+    with numpy.errstate(invalid = "ignore", divide = "ignore"):
+        scales[:, 0] = numpy.linalg.norm(rows[:, 0], axis = 1)
+        rows[:, 0] /= scales[:, 0, numpy.newaxis]
+        shears[:, 0] = numpy.sum(rows[:, 0] * rows[:, 1], axis = 1)
+        rows[:, 1] -= rows[:, 0] * shears[:, 0, numpy.newaxis]
+        scales[:, 1] = numpy.linalg.norm(rows[:, 1], axis = 1)
+        rows[:, 1] /= scales[:, 1, numpy.newaxis]
+        shears[:, 0] /= scales[:, 1]
+        shears[:, 1] = numpy.sum(rows[:, 0] * rows[:, 2], axis = 1)
+        rows[:, 2] -= rows[:, 0] * shears[:, 1, numpy.newaxis]
+        shears[:, 2] = numpy.sum(rows[:, 1] * rows[:, 2], axis = 1)
+        rows[:, 2] -= rows[:, 1] * shears[:, 2, numpy.newaxis]
+        scales[:, 2] = numpy.linalg.norm(rows[:, 2], axis = 1)
+        rows[:, 2] /= scales[:, 2, numpy.newaxis]
+        shears[:, 1:] /= scales[:, 2, numpy.newaxis]
+
+    mirrored = numpy.sum(rows[:, 0] * numpy.cross(rows[:, 1], rows[:, 2]), axis = 1) < 0
+    scales[mirrored] *= -1
+    rows[mirrored] *= -1
+
+    return translations, scales, shears, _quaternions(numpy.transpose(rows, (0, 2, 1)))
+
+##  Get the quaternions of rotation matrices.
+#
+#   This does the same as Quaternion.setByMatrix() for an array of matrices,
+#   including the choice between equivalent quaternions.
+#
+#   \param rotations An (N, 3, 3) array of rotation matrices.
+#   \return An (N, 4) array of XYZW components.
+def _quaternions(rotations):
+    m = rotations
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    largest = numpy.where(m[:, 1, 1] > m[:, 0, 0], 1, 0)
+    largest = numpy.where(m[:, 2, 2] > m[numpy.arange(len(m)), largest, largest], 2, largest)
+
+    candidates = numpy.array([
+        [m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1], trace + 1],
+        [m[:, 0, 0] - m[:, 1, 1] - m[:, 2, 2] + 1.0, m[:, 0, 1] + m[:, 1, 0], m[:, 0, 2] + m[:, 2, 0], m[:, 2, 1] - m[:, 1, 2]],
+        [m[:, 0, 1] + m[:, 1, 0], m[:, 1, 1] - m[:, 0, 0] - m[:, 2, 2] + 1.0, m[:, 1, 2] + m[:, 2, 1], m[:, 0, 2] - m[:, 2, 0]],
+        [m[:, 0, 2] + m[:, 2, 0], m[:, 2, 1] + m[:, 1, 2], m[:, 2, 2] - m[:, 0, 0] - m[:, 1, 1] + 1.0, m[:, 1, 0] - m[:, 0, 1]]
+    ]) # (case, component, matrix)
+
+    cases = numpy.where(trace > 0.0, 0, largest + 1)
+    quaternions = candidates[cases, :, numpy.arange(len(m))]
+    return quaternions / numpy.linalg.norm(quaternions, axis = 1)[:, numpy.newaxis]
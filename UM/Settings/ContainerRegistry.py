@@ -1,8 +1,18 @@
 # Copyright (c) 2016 Ultimaker B.V.
 # Uranium is released under the terms of the AGPLv3 or higher.
 
+import collections
+import concurrent.futures #For reading container files in parallel.
+import hashlib #For checking whether files used by cached definitions changed.
+import itertools
+import importlib.util #For the version of the Python bytecode in the definition cache.
+import json #For the journal of saved containers.
 import os
 import re #For finding containers with asterisks in the constraints.
+import shutil #For removing the old definition cache.
+import sys
+import tempfile
+import time
 import urllib #For ensuring container file names are proper file names
 import pickle #For serializing/deserializing Python classes to binary files
 
@@ -16,6 +26,8 @@ from UM.Signal import Signal, signalemitter
 from . import DefinitionContainer
 from . import InstanceContainer
 from . import ContainerStack
+from . import SettingDefinition
+from . import SettingFunction
 
 ##  Central class to manage all Setting containers.
 #
@@ -46,9 +58,20 @@ class ContainerRegistry:
 
         self._emptyInstanceContainer = _EmptyInstanceContainer("empty")
 
-        self._containers = [ self._emptyInstanceContainer ]
+        self._containers = []
 
-        self._id_container_cache = {}
+        self._id_container_cache = {} # Maps container IDs to lists of containers with that ID.
+        self._type_container_cache = {} # Maps container classes to lists of containers of exactly that class.
+        self._property_container_cache = {} # Maps filter keys to dictionaries that map string values to lists of containers.
+        self._indexed_values = {} # Maps the id() of containers to the string values under which they are in the property caches.
+        self._addition_numbers = {} # Maps the id() of containers to the order in which they were added.
+        self._addition_counter = itertools.count()
+        self._change_listeners = {} # Maps the id() of containers to the function connected to their change signals.
+        self._pattern_cache = collections.OrderedDict() # Compiled regular expressions for wildcard filter values, least recently used first.
+
+        self._save_statistics = {}
+
+        self._addToCaches(self._emptyInstanceContainer)
 
         self._resource_types = [Resources.DefinitionContainers]
 
@@ -92,65 +115,53 @@ class ContainerRegistry:
     #   keys and values that need to match the metadata of the container. An
     #   asterisk can be used to denote a wildcard.
     #
+    #   Searches are done using lookup tables of the containers' ID, type, name,
+    #   definition and metadata. Changes to the name and metadata of a container
+    #   are only picked up if the container emits its nameChanged,
+    #   metaDataChanged or containersChanged signal for them.
+    #
     #   \return A list of containers matching the search criteria, or an empty
     #   list if nothing was found.
     def findContainers(self, container_type = None, **kwargs):
-        containers = []
+        candidates = None
+        filters = []
+        for key, value in kwargs.items():
+            if not isinstance(value, str): # Value is not a string, so compare it directly.
+                filters.append((key, value, None))
+                continue
 
-        if len(kwargs) == 1 and "id" in kwargs:
-            # If we are just searching for a single container by ID, look it up from the container cache
-            container = self._id_container_cache.get(kwargs.get("id"))
-            if container:
-                return [ container ]
+            # String values can be looked up from the caches. Use the smallest list of containers we can find.
+            cache = self._id_container_cache if key == "id" else self._getPropertyCache(key)
+            if "*" in value:
+                pattern = self._getFilterPattern(value)
+                filters.append((key, value, pattern))
+                matches = self._mergeMatches([containers for cache_value, containers in cache.items() if pattern.match(str(cache_value))])
+            else:
+                filters.append((key, value, None))
+                matches = cache.get(value, [])
+
+            if candidates is None or len(matches) < len(candidates):
+                candidates = matches
+
+        if candidates is None:
+            candidates = self._getContainersOfType(container_type)
 
-        for container in self._containers:
+        containers = []
+        for container in candidates:
             if container_type and not isinstance(container, container_type):
                 continue
 
-            matches_container = True
-            for key, value in kwargs.items():
-                try:
-                    value = re.escape(value) #Escape for regex patterns.
-                    value = "^" + value.replace("\\*", ".*") + "$" #Instead of (now escaped) asterisks, match on any string. Also add anchors for a complete match.
-                    value_pattern = re.compile(value)
-                    if key == "id":
-                        if not value_pattern.match(container.getId()):
-                            matches_container = False
-                        continue
-                    if key == "name":
-                        if not value_pattern.match(container.getName()):
-                            matches_container = False
-                        continue
-                    if key == "definition":
-                        try:
-                            if not value_pattern.match(container.getDefinition().getId()):
-                                matches_container = False
-                            continue
-                        except AttributeError:  # Only instanceContainers have a get definition. We can ignore all others.
-                            pass
-                    if not value_pattern.match(str(container.getMetaDataEntry(key))):
-                        matches_container = False
-                except TypeError: #Value was not a string.
-                    if key == "id":
-                        if value != container.getId():
-                            matches_container = False
-                        continue
-                    if key == "name":
-                        if container.getName() != value:
-                            matches_container = False
-                        continue
-                    if key == "definition":
-                        try:
-                            if value != container.getDefinition().getId():
-                                matches_container = False
-                            continue
-                        except AttributeError:
-                            pass
-                    if value != container.getMetaDataEntry(key):
-                        matches_container = False
-                    continue
-
-            if matches_container:
+            for key, value, pattern in filters:
+                container_value = self._getFilterValue(container, key)
+                if pattern:
+                    if not pattern.match(str(container_value)):
+                        break
+                elif isinstance(value, str):
+                    if str(container_value) != value:
+                        break
+                elif value != container_value:
+                    break
+            else:
                 containers.append(container)
 
         return containers
@@ -176,6 +187,8 @@ class ContainerRegistry:
     #   \note This method does not clear the internal list of containers. This means that any containers
     #   that were already added when the first call to this method happened will not be re-added.
     def load(self):
+        self._finishSaveBatch()
+
         files = []
         for resource_type in self._resource_types:
             resources = Resources.getAllResourcesOfType(resource_type)
@@ -212,28 +225,99 @@ class ContainerRegistry:
         # Sort the list of files by type_priority so we can ensure correct loading order.
         files = sorted(files, key = lambda i: i[0])
 
-        for _, container_id, file_path, read_only, container_type in files:
-            if container_id in self._id_container_cache:
-                continue
-
-            try:
+        # Reading files and cached definitions from disk does not depend on other containers, so do that on a
+        # pool of threads. Deserializing has to happen in order on this thread, since instances and stacks
+        # look up the containers they depend on.
+        start_time = time.time()
+        cached_definitions, cache_manifest = self._loadDefinitionCache()
+        load_times = collections.OrderedDict([("DefinitionCache", (len(cached_definitions), time.time() - start_time))])
+
+        # Maps the ID of each definition to the file it is loaded from, including definitions that were already
+        # loaded by an earlier call, so those stay in the cache.
+        definition_files = {}
+        cache_changed = False # Whether any definition was loaded from its file rather than from the cache.
+        with concurrent.futures.ThreadPoolExecutor(max_workers = os.cpu_count() or 1) as executor:
+            futures = []
+            for _, container_id, file_path, read_only, container_type in files:
+                futures.append(executor.submit(self._readContainerFile, container_id, file_path, container_type, cached_definitions, cache_manifest))
+
+            for (_, container_id, file_path, read_only, container_type), future in zip(files, futures):
+                start_time = time.time()
+                container = self._loadContainer(container_id, file_path, read_only, container_type, future)
                 if issubclass(container_type, DefinitionContainer.DefinitionContainer):
-                    definition = self._loadCachedDefinition(container_id, file_path)
-                    if definition:
-                        self.addContainer(definition)
-                        continue
+                    definition_files.setdefault(container_id, file_path)
+                    if container is not None and container is not cached_definitions.get(container_id):
+                        cache_changed = True
 
-                new_container = container_type(container_id)
-                with open(file_path, encoding = "utf-8") as f:
-                    new_container.deserialize(f.read())
-                new_container.setReadOnly(read_only)
+                type_name = container_type.__name__
+                count, load_time = load_times.get(type_name, (0, 0.0))
+                load_times[type_name] = (count + 1, load_time + time.time() - start_time)
 
-                if issubclass(container_type, DefinitionContainer.DefinitionContainer):
-                    self._saveCachedDefinition(new_container)
+        # The resolved parents of definitions are not needed anymore once everything is loaded.
+        DefinitionContainer.DefinitionContainer.clearInheritanceCache()
 
-                self.addContainer(new_container)
-            except Exception as e:
-                Logger.logException("e", "Could not deserialize container %s", container_id)
+        if cache_changed:
+            self._saveDefinitionCache(definition_files, cache_manifest)
+
+        for type_name, (count, load_time) in load_times.items():
+            Logger.log("d", "Loading %d containers of type %s took %.3f seconds", count, type_name, load_time)
+
+    # Read the data needed to create a container from disk.
+    #
+    # This is called on a worker thread by load(). The file is parsed here as well, if the container type supports
+    # that, so only the part of deserializing that depends on other containers is left for the main thread.
+    #
+    # \return A tuple of a cached DefinitionContainer, if a valid one was found, and the data to deserialize the
+    # container from. That is the result of parseSerialized() of the container type, or the contents of the file if
+    # the type cannot be deserialized from parsed data.
+    def _readContainerFile(self, container_id, file_path, container_type, cached_definitions, cache_manifest):
+        if issubclass(container_type, DefinitionContainer.DefinitionContainer) and container_id in cached_definitions:
+            if self._isDefinitionCacheValid(cache_manifest.get(container_id), file_path):
+                return cached_definitions[container_id], None
+            Logger.log("d", "Definition file %s or one of its parents changed, ignoring cached version", file_path)
+
+        with open(file_path, encoding = "utf-8") as f:
+            serialized = f.read()
+
+        if self._canDeserializeParsed(container_type):
+            return None, container_type.parseSerialized(serialized)
+        return None, serialized
+
+    # Create a container from the data read by _readContainerFile() and add it to the registry.
+    #
+    # \return The container that was added, or None if no container was added.
+    def _loadContainer(self, container_id, file_path, read_only, container_type, future):
+        if self._id_container_cache.get(container_id):
+            return None
+
+        try:
+            definition, data = future.result()
+            if definition:
+                self.addContainer(definition)
+                return definition
+
+            new_container = container_type(container_id)
+            if self._canDeserializeParsed(container_type):
+                new_container.deserializeParsed(data)
+            else:
+                new_container.deserialize(data)
+            new_container.setReadOnly(read_only)
+
+            self.addContainer(new_container)
+            return new_container
+        except Exception as e:
+            Logger.logException("e", "Could not deserialize container %s", container_id)
+            return None
+
+    # Check whether a container type can be deserialized in two steps, parseSerialized() and deserializeParsed().
+    #
+    # Types that reimplement deserialize() without reimplementing deserializeParsed() are deserialized with
+    # deserialize(), so the reimplementation is not skipped.
+    def _canDeserializeParsed(self, container_type):
+        for base in container_type.__mro__:
+            if "deserialize" in base.__dict__:
+                return "deserializeParsed" in base.__dict__ and hasattr(container_type, "parseSerialized")
+        return False
 
     def addContainer(self, container):
         containers = self.findContainers(container_type = container.__class__, id = container.getId())
@@ -241,8 +325,8 @@ class ContainerRegistry:
             Logger.log("w", "Container of type %s and id %s already added", repr(container.__class__), container.getId())
             return
 
-        self._containers.append(container)
-        self._id_container_cache[container.getId()] = container
+        self._addToCaches(container)
+        self._connectContainerSignals(container)
         self.containerAdded.emit(container)
 
     def removeContainer(self, container_id):
@@ -250,8 +334,8 @@ class ContainerRegistry:
         if containers:
             container = containers[0]
 
-            self._containers.remove(container)
-            del self._id_container_cache[container.getId()]
+            self._removeFromCaches(container)
+            self._disconnectContainerSignals(container)
             self._deleteFiles(container)
             self.containerRemoved.emit(container)
 
@@ -260,58 +344,69 @@ class ContainerRegistry:
         else:
             Logger.log("w", "Could not remove container with id %s, as no container with that ID is known")
 
+    ##  Save all containers that changed since they were loaded or last saved.
+    #
+    #   The changed containers are serialized and written to temporary files on a
+    #   pool of threads. Once all of them are flushed to disk, they replace the
+    #   existing files as one batch. The batch is recorded in a journal first, so
+    #   if the application stops while the files are being replaced, load() will
+    #   finish the batch.
+    #
+    #   \return \type{dict} Statistics of this call, see getSaveStatistics().
     def saveAll(self):
+        start_time = time.time()
+        statistics = { "saved": 0, "unchanged": 0, "failed": 0, "bytes": 0, "time": 0.0 }
 
-        for instance in self.findInstanceContainers():
-            if not instance.isDirty():
-                continue
+        containers = []
+        for container in self.findContainers(None):
+            if not isinstance(container, tuple(self.__save_locations)):
+                continue # Not a type of container that we know how to save.
 
-            try:
-                data = instance.serialize()
-            except NotImplementedError:
-                # Serializing is not supported so skip this container
-                continue
-            except Exception:
-                Logger.logException("e", "An exception occurred trying to serialize container %s", instance.getId())
+            if not container.isDirty():
+                statistics["unchanged"] += 1
                 continue
 
-            file_name = urllib.parse.quote_plus(instance.getId()) + ".inst.cfg"
-            path = Resources.getStoragePath(Resources.InstanceContainers, file_name)
-            with SaveFile(path, "wt", -1, "utf-8") as f:
-                f.write(data)
+            path = self._getSavePath(container)
+            if path:
+                containers.append((container, path))
 
-        for stack in self.findContainerStacks():
-            if not stack.isDirty():
-                continue
+        batch = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers = os.cpu_count() or 1) as executor:
+            futures = [executor.submit(self._writeContainerTempFile, container, path) for container, path in containers]
+            for (container, path), future in zip(containers, futures):
+                try:
+                    result = future.result()
+                except Exception:
+                    Logger.logException("e", "An exception occurred trying to save container %s", container.getId())
+                    statistics["failed"] += 1
+                    continue
 
-            try:
-                data = stack.serialize()
-            except NotImplementedError:
-                # Serializing is not supported so skip this container
-                continue
-            except Exception:
-                Logger.logException("e", "An exception occurred trying to serialize container %s", stack.getId())
-                continue
+                if result is None:
+                    # Serializing is not supported so skip this container
+                    continue
 
-            file_name = urllib.parse.quote_plus(stack.getId()) + ".stack.cfg"
-            path = Resources.getStoragePath(Resources.ContainerStacks, file_name)
-            with SaveFile(path, "wt", -1, "utf-8") as f:
-                f.write(data)
+                temp_path, size = result
+                batch.append((container, temp_path, path))
+                statistics["bytes"] += size
 
-        for definition in self.findDefinitionContainers():
-            try:
-                data = definition.serialize()
-            except NotImplementedError:
-                # Serializing is not supported so skip this container
-                continue
-            except Exception:
-                Logger.logException("e", "An exception occurred trying to serialize container %s", instance.getId())
-                continue
+        for container in self._commitSaveBatch(batch):
+            container.setDirty(False)
+            statistics["saved"] += 1
+        statistics["failed"] += len(batch) - statistics["saved"]
 
-            file_name = urllib.parse.quote_plus(definition.getId()) + ".def.cfg"
-            path = Resources.getStoragePath(Resources.DefinitionContainers, file_name)
-            with SaveFile(path, "wt", -1, "utf-8") as f:
-                f.write(data)
+        statistics["time"] = time.time() - start_time
+        self._save_statistics = statistics
+        Logger.log("d", "Saved %d containers (%d bytes) in %.3f seconds, %d unchanged and %d failed", statistics["saved"], statistics["bytes"], statistics["time"], statistics["unchanged"], statistics["failed"])
+        return statistics
+
+    ##  Get the statistics of the last call to saveAll().
+    #
+    #   \return \type{dict} A dictionary with the number of containers that were
+    #   "saved", that were skipped because they were "unchanged" and that
+    #   "failed" to save, the number of "bytes" that were written and the "time"
+    #   in seconds the call took.
+    def getSaveStatistics(self):
+        return self._save_statistics
 
     ##  Creates a new unique name for a container that doesn't exist yet.
     #
@@ -336,6 +431,164 @@ class ContainerRegistry:
             unique_name = "%s #%d" % (name, i) #Fill name like this: "Extruder #2".
         return unique_name
 
+    # Add a container to the list of containers and to all lookup caches.
+    def _addToCaches(self, container):
+        self._containers.append(container)
+        self._id_container_cache.setdefault(container.getId(), []).append(container)
+        self._type_container_cache.setdefault(container.__class__, []).append(container)
+        self._addition_numbers[id(container)] = next(self._addition_counter)
+
+        indexed_values = {}
+        for key, cache in self._property_container_cache.items():
+            indexed_values[key] = str(self._getFilterValue(container, key))
+            cache.setdefault(indexed_values[key], []).append(container)
+        self._indexed_values[id(container)] = indexed_values
+
+    # Remove a container from the list of containers and from all lookup caches.
+    def _removeFromCaches(self, container):
+        self._containers.remove(container)
+        self._removeFromCache(self._id_container_cache, container.getId(), container)
+        self._removeFromCache(self._type_container_cache, container.__class__, container)
+
+        # The name or metadata of the container may have changed since it was indexed, so it is removed
+        # under the values it was indexed with.
+        for key, value in self._indexed_values.pop(id(container)).items():
+            self._removeFromCache(self._property_container_cache[key], value, container)
+        del self._addition_numbers[id(container)]
+
+    # Move a container to the entries of its current values in the property caches.
+    def _updatePropertyCaches(self, container):
+        indexed_values = self._indexed_values.get(id(container))
+        if indexed_values is None: # The container was removed already.
+            return
+
+        for key, cache in self._property_container_cache.items():
+            value = str(self._getFilterValue(container, key))
+            if value == indexed_values[key]:
+                continue
+
+            self._removeFromCache(cache, indexed_values[key], container)
+            indexed_values[key] = value
+
+            # Keep the containers of each value in the order in which they were added.
+            containers = cache.setdefault(value, [])
+            addition_number = self._addition_numbers[id(container)]
+            index = len(containers)
+            while index > 0 and self._addition_numbers[id(containers[index - 1])] > addition_number:
+                index -= 1
+            containers.insert(index, container)
+
+    def _removeFromCache(self, cache, key, container):
+        containers = cache.get(key)
+        if not containers:
+            return
+
+        containers.remove(container)
+        if not containers:
+            del cache[key]
+
+    # Get the cache for a filter key other than ID, building it when it is requested for the first time.
+    #
+    # These caches map the string representation of a value to the list of containers with that value.
+    # Since name, definition and metadata can change after a container was added, a container is moved
+    # to its new values when it signals that it changed.
+    def _getPropertyCache(self, key):
+        cache = self._property_container_cache.get(key)
+        if cache is None:
+            cache = {}
+            for container in self._containers:
+                value = str(self._getFilterValue(container, key))
+                cache.setdefault(value, []).append(container)
+                self._indexed_values[id(container)][key] = value
+            self._property_container_cache[key] = cache
+        return cache
+
+    # Combine several lists of containers into one list, in the order in which the containers were added.
+    def _mergeMatches(self, matches):
+        if not matches:
+            return []
+        if len(matches) == 1:
+            return matches[0]
+
+        matched_ids = set()
+        for containers in matches:
+            matched_ids.update(id(container) for container in containers)
+        return [container for container in self._containers if id(container) in matched_ids]
+
+    # Get all containers that are an instance of container_type, in the order in which they were added.
+    def _getContainersOfType(self, container_type):
+        if not container_type:
+            return self._containers
+
+        matching_types = [t for t in self._type_container_cache if issubclass(t, container_type)]
+        if not matching_types:
+            return []
+        if len(matching_types) == 1:
+            return self._type_container_cache[matching_types[0]]
+
+        # Containers of several types match, so fall back to the full list to keep the order intact.
+        return self._containers
+
+    # Get the value of a container that a filter key is matched against.
+    def _getFilterValue(self, container, key):
+        if key == "id":
+            return container.getId()
+        if key == "name":
+            return container.getName()
+        if key == "definition":
+            try:
+                return container.getDefinition().getId()
+            except AttributeError: # Only InstanceContainers have a definition. Others are matched on their metadata.
+                pass
+        return container.getMetaDataEntry(key)
+
+    # Get a compiled regular expression for a filter value containing asterisks.
+    def _getFilterPattern(self, value):
+        pattern = self._pattern_cache.get(value)
+        if pattern is None:
+            pattern = re.escape(value) #Escape for regex patterns.
+            pattern = "^" + pattern.replace("\\*", ".*") + "$" #Instead of (now escaped) asterisks, match on any string. Also add anchors for a complete match.
+            pattern = re.compile(pattern)
+            self._pattern_cache[value] = pattern
+            if len(self._pattern_cache) > self.PatternCacheSize:
+                self._pattern_cache.popitem(last = False)
+        else:
+            self._pattern_cache.move_to_end(value)
+        return pattern
+
+    # Connect to the signals of a container that tell that its name, metadata or containers changed.
+    #
+    # These signals do not tell which container emitted them, so each container gets its own listener.
+    # Signals only keep a weak reference to the listener, so it is stored until the container is removed.
+    def _connectContainerSignals(self, container):
+        on_changed = lambda *args, **kwargs: self._onContainerChanged(container)
+        self._change_listeners[id(container)] = on_changed
+        for signal_name in ("nameChanged", "metaDataChanged", "containersChanged"):
+            signal = getattr(container, signal_name, None)
+            if isinstance(signal, Signal):
+                signal.connect(on_changed)
+
+    def _disconnectContainerSignals(self, container):
+        on_changed = self._change_listeners.pop(id(container), None)
+        if on_changed is None:
+            return
+        for signal_name in ("nameChanged", "metaDataChanged", "containersChanged"):
+            signal = getattr(container, signal_name, None)
+            if isinstance(signal, Signal):
+                signal.disconnect(on_changed)
+
+    # Called when the name, metadata or containers of a container changed.
+    #
+    # The container is moved to its new values in the caches for name, definition and metadata. Stacks
+    # get the metadata of their containers, so the values of the stacks may have changed as well.
+    def _onContainerChanged(self, container):
+        self._updatePropertyCaches(container)
+        for container_type, containers in list(self._type_container_cache.items()):
+            if issubclass(container_type, ContainerStack.ContainerStack):
+                for stack in list(containers):
+                    if stack is not container:
+                        self._updatePropertyCaches(stack)
+
     # Remove all files related to a container located in a storage path
     #
     # Since we cannot assume we can write to any other path, we can only support removing from
@@ -361,45 +614,273 @@ class ContainerRegistry:
                 except Exception:
                     continue
 
-    # Load a binary cached version of a DefinitionContainer
-    def _loadCachedDefinition(self, definition_id, path):
+    # Get the path to save a container to, or None if the container cannot be saved.
+    def _getSavePath(self, container):
+        for container_type, (resource_type, suffix) in self.__save_locations.items():
+            if isinstance(container, container_type):
+                break
+        else:
+            return None
+
         try:
-            cache_path = Resources.getPath(Resources.Cache, "definitions", definition_id)
+            return Resources.getStoragePath(resource_type, urllib.parse.quote_plus(container.getId()) + suffix)
+        except UnsupportedStorageTypeError:
+            Logger.log("w", "Unable to save container %s, there is no storage location for it", container.getId())
+            return None
 
-            cache_mtime = os.path.getmtime(cache_path)
-            definition_mtime = os.path.getmtime(path)
+    # Serialize a container and write it to a temporary file next to the file it should be saved to.
+    #
+    # This is called on a worker thread by saveAll(). The temporary file is flushed to disk before returning.
+    #
+    # \return A tuple of the path of the temporary file and its size, or None if the container does not support
+    # serializing.
+    def _writeContainerTempFile(self, container, path):
+        try:
+            data = container.serialize()
+        except NotImplementedError:
+            return None
 
-            if definition_mtime > cache_mtime:
-                # The definition is newer than the cached version, so ignore the cached version.
-                Logger.log("d", "Definition file %s is newer than cache, ignoring cached version", path)
-                return None
+        # The name of the temporary file starts with the name of the file to replace and has a suffix of its own, so
+        # it is recognisable and can be removed by _finishSaveBatch() if the application stops before it is used.
+        with tempfile.NamedTemporaryFile("wt", encoding = "utf-8", dir = os.path.dirname(path), prefix = os.path.basename(path) + ".", suffix = self.SaveTempFileSuffix, delete = False) as f:
+            try:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                return f.name, os.fstat(f.fileno()).st_size
+            except Exception:
+                f.close()
+                os.remove(f.name)
+                raise
 
-            definition = None
-            with open(cache_path, "rb") as f:
-                definition = pickle.load(f)
+    # Replace the files of a batch of containers with the temporary files written by _writeContainerTempFile().
+    #
+    # The list of files to replace is written to a journal before any of them is replaced, so an interrupted
+    # batch can be finished by _finishSaveBatch().
+    #
+    # \param batch A list of (container, temporary file, file to replace) tuples.
+    # \return A list of the containers of which the file was replaced.
+    def _commitSaveBatch(self, batch):
+        if not batch:
+            return []
+
+        journal_path = Resources.getStoragePath(Resources.Resources, self.SaveJournalFileName)
+        try:
+            with SaveFile(journal_path, "wt", -1, "utf-8") as f:
+                json.dump([(temp_path, path) for _, temp_path, path in batch], f)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            Logger.logException("e", "Could not write journal %s, no containers were saved", journal_path)
+            for _, temp_path, _ in batch:
+                self._removeFile(temp_path)
+            return []
+
+        saved = []
+        for container, temp_path, path in batch:
+            try:
+                os.replace(temp_path, path)
+                saved.append(container)
+            except OSError:
+                Logger.logException("e", "Could not replace file %s of container %s", path, container.getId())
+                self._removeFile(temp_path)
 
-            for file_path in definition.getInheritedFiles():
-                if os.path.getmtime(file_path) > cache_mtime:
-                    Logger.log("d", "Definition file %s is newer than cache, ignoring cached version", file_path)
-                    return None
+        self._syncDirectories({ os.path.dirname(path) for _, _, path in batch })
+        self._removeFile(journal_path)
+        return saved
 
-            return definition
+    # Finish a batch of saved containers that was interrupted, by replacing the files that were not replaced yet.
+    #
+    # Temporary files that are left behind by a save that was interrupted before its journal was written are removed.
+    def _finishSaveBatch(self):
+        try:
+            journal_path = Resources.getPath(Resources.Resources, self.SaveJournalFileName)
         except FileNotFoundError:
-            return None
+            journal_path = None
+
+        if journal_path:
+            try:
+                with open(journal_path, encoding = "utf-8") as f:
+                    batch = json.load(f)
+
+                for temp_path, path in batch:
+                    if os.path.exists(temp_path):
+                        os.replace(temp_path, path)
+                Logger.log("i", "Finished saving %d containers from interrupted save %s", len(batch), journal_path)
+            except Exception:
+                Logger.logException("e", "Could not finish interrupted save %s", journal_path)
+
+            self._removeFile(journal_path)
+
+        self._removeSaveTempFiles()
+
+    # Remove the temporary files written by _writeContainerTempFile() from the directories containers are saved to.
+    def _removeSaveTempFiles(self):
+        for resource_type, _ in self.__save_locations.values():
+            try:
+                directory = Resources.getStoragePathForType(resource_type)
+                file_names = os.listdir(directory)
+            except (UnsupportedStorageTypeError, OSError):
+                continue
+
+            for file_name in file_names:
+                if file_name.endswith(self.SaveTempFileSuffix):
+                    Logger.log("w", "Removing temporary file %s of an interrupted save", file_name)
+                    self._removeFile(os.path.join(directory, file_name))
+
+    # Flush changes to the entries of directories to disk.
+    def _syncDirectories(self, directories):
+        if sys.platform == "win32":
+            return # Directories cannot be opened on Windows, replacing files is flushed by the file system itself.
+
+        for directory in directories:
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError:
+                Logger.log("w", "Could not flush directory %s to disk", directory)
+
+    def _removeFile(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # Load the cache of all DefinitionContainers.
+    #
+    # The cache is a single file that contains two pickles. The first is a header with the version of the
+    # cache, the version of Python that wrote it, a manifest of the files each definition was created from
+    # and the compiled code of their setting functions. The second contains the definitions themselves.
+    # Since the compiled code is loaded into the SettingFunction cache first, unpickling the definitions
+    # does not need to compile their functions again.
+    #
+    # \return A tuple of a dictionary of cached definitions by ID and the manifest for these definitions.
+    def _loadDefinitionCache(self):
+        try:
+            cache_path = Resources.getPath(Resources.Cache, self.DefinitionCacheFileName)
+        except FileNotFoundError:
+            return {}, {}
+
+        try:
+            with open(cache_path, "rb") as f:
+                header = pickle.load(f)
+                if header.get("version") != self.DefinitionCacheVersion or header.get("python") != importlib.util.MAGIC_NUMBER:
+                    Logger.log("d", "Definition cache %s was written by a different version, ignoring it", cache_path)
+                    return {}, {}
+
+                SettingFunction.loadCompiledCode(header["code"])
+                definitions = pickle.load(f)
+
+            return definitions, header["manifest"]
         except Exception as e:
-            # We could not load a cached version for some reason. Ignore it.
-            Logger.logException("d", "Could not load cached definition for %s", path)
-            return None
+            # We could not load the cache for some reason. Ignore it.
+            Logger.logException("d", "Could not load definition cache %s", cache_path)
+            return {}, {}
+
+    # Store the cache of all DefinitionContainers.
+    #
+    # \param definition_files A dictionary with the ID of every definition to store and the file it was loaded from.
+    # \param old_manifest The manifest of the previous cache. Entries in it that are still valid are reused so
+    # files do not need to be hashed again.
+    def _saveDefinitionCache(self, definition_files, old_manifest):
+        definitions = {}
+        manifest = {}
+        for definition_id, file_path in definition_files.items():
+            definition = self.findDefinitionContainers(id = definition_id)
+            if not definition:
+                continue
+
+            try:
+                entry = old_manifest.get(definition_id)
+                if not self._isDefinitionCacheValid(entry, file_path, definition[0].getInheritedFiles()):
+                    entry = [self._getFileManifest(path) for path in [file_path] + definition[0].getInheritedFiles()]
+            except OSError:
+                continue
+
+            definitions[definition_id] = definition[0]
+            manifest[definition_id] = entry
 
-    # Store a cached version of a DefinitionContainer
-    def _saveCachedDefinition(self, definition):
-        cache_path = Resources.getStoragePath(Resources.Cache, "definitions", definition.id)
+        header = {
+            "version": self.DefinitionCacheVersion,
+            "python": importlib.util.MAGIC_NUMBER,
+            "manifest": manifest,
+            "code": SettingFunction.dumpCompiledCode(self._getSettingFunctions(definitions.values()))
+        }
 
-        # Ensure the cache path exists
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        try:
+            cache_path = Resources.getStoragePath(Resources.Cache, self.DefinitionCacheFileName)
+            os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+            with SaveFile(cache_path, "wb") as f:
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(definitions, f, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            Logger.logException("w", "Could not save definition cache")
+            return
+
+        self._removeOldDefinitionCache()
+
+    # Get the setting functions of DefinitionContainers.
+    #
+    # \param definition_containers The DefinitionContainers to get the functions of.
+    # \return A list of the SettingFunction objects of all settings in the containers.
+    def _getSettingFunctions(self, definition_containers):
+        property_names = SettingDefinition.SettingDefinition.getPropertyNames(SettingDefinition.DefinitionPropertyType.Function)
+        functions = []
+        for definition_container in definition_containers:
+            for definition in definition_container.findDefinitions():
+                for property_name in property_names:
+                    function = getattr(definition, property_name, None)
+                    if isinstance(function, SettingFunction.SettingFunction):
+                        functions.append(function)
+        return functions
+
+    # Remove the separate files of each cached definition that were used before the definition cache was a single file.
+    def _removeOldDefinitionCache(self):
+        try:
+            old_cache_path = Resources.getStoragePath(Resources.Cache, "definitions")
+        except UnsupportedStorageTypeError:
+            return
+
+        if os.path.isdir(old_cache_path):
+            Logger.log("i", "Removing old definition cache %s", old_cache_path)
+            shutil.rmtree(old_cache_path, ignore_errors = True)
 
-        with open(cache_path, "wb") as f:
-            pickle.dump(definition, f)
+    # Check whether the files a cached definition was created from are unchanged.
+    #
+    # Files with an unchanged size and modification time are considered unchanged. If only the modification
+    # time changed, the contents of the file are compared using its hash.
+    #
+    # \param entry The manifest entry of the definition, a list of (path, modification time, size, hash) tuples.
+    # \param file_path The file the definition is loaded from.
+    # \param inherited_files If provided, the files the definition inherits from should match these.
+    def _isDefinitionCacheValid(self, entry, file_path, inherited_files = None):
+        if not entry or entry[0][0] != file_path:
+            return False
+
+        if inherited_files is not None and [item[0] for item in entry[1:]] != inherited_files:
+            return False
+
+        try:
+            for path, modified_time, size, digest in entry:
+                stat = os.stat(path)
+                if stat.st_size != size:
+                    return False
+                if stat.st_mtime != modified_time and self._getFileManifest(path)[3] != digest:
+                    return False
+        except OSError:
+            return False
+
+        return True
+
+    # Get a tuple of path, modification time, size and hash of a file for the definition cache manifest.
+    def _getFileManifest(self, path):
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return (path, stat.st_mtime, stat.st_size, digest)
 
     ##  Get the singleton instance for this class.
     @classmethod
@@ -411,6 +892,28 @@ class ContainerRegistry:
 
     __instance = None
 
+    ##  The name of the file the definition cache is stored in, in the cache resource directory.
+    DefinitionCacheFileName = "definitions.cache"
+
+    ##  The version of the definition cache format. Increase this when the format changes.
+    DefinitionCacheVersion = 2
+
+    ##  The maximum number of compiled wildcard patterns to keep for findContainers().
+    PatternCacheSize = 256
+
+    ##  The name of the file that records a batch of containers that is being saved, in the resources storage directory.
+    SaveJournalFileName = "containers.journal"
+
+    ##  The suffix of the temporary files that containers are written to before they replace the saved files.
+    SaveTempFileSuffix = ".containersave.tmp"
+
+    # The resource type and file suffix used to save each type of container.
+    __save_locations = collections.OrderedDict([
+        (InstanceContainer.InstanceContainer, (Resources.InstanceContainers, ".inst.cfg")),
+        (ContainerStack.ContainerStack, (Resources.ContainerStacks, ".stack.cfg")),
+        (DefinitionContainer.DefinitionContainer, (Resources.DefinitionContainers, ".def.cfg")),
+    ])
+
     __container_types = {
         "definition": DefinitionContainer.DefinitionContainer,
         "instance": InstanceContainer.InstanceContainer,
@@ -63,6 +63,7 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
     def setName(self, name):
         if name != self._name:
             self._name = name
+            self._dirty = True
             self.nameChanged.emit()
 
     ##  \copydoc ContainerInterface::isReadOnly
@@ -80,6 +81,9 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
     def getMetaData(self):
         return self._metadata
 
+    ##  Emitted whenever the metadata of this stack changes.
+    metaDataChanged = Signal()
+
     ##  \copydoc ContainerInterface::getMetaDataEntry
     #
     #   Reimplemented from ContainerInterface
@@ -101,6 +105,7 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
         if key not in self._metadata:
             self._dirty = True
             self._metadata[key] = value
+            self.metaDataChanged.emit()
         else:
             Logger.log("w", "Meta data with key %s was already added.", key)
 
@@ -108,6 +113,7 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
         if key in self._metadata:
             self._dirty = True
             self._metadata[key] = value
+            self.metaDataChanged.emit()
         else:
             Logger.log("w", "Meta data with key %s was not found. Unable to change.", key)
 
@@ -203,15 +209,35 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
     #
     #   TODO: Expand documentation here, include the fact that this should _not_ include all containers
     def deserialize(self, serialized):
+        self.deserializeParsed(self.parseSerialized(serialized))
+
+    ##  Parse the serialized container stack and check its version.
+    #
+    #   This does not depend on any other container, so unlike
+    #   deserializeParsed() it can be called on any thread.
+    #
+    #   \param serialized \type{string} The serialized container stack.
+    #   \return \type{ConfigParser} The parsed data, to pass to deserializeParsed().
+    @classmethod
+    def parseSerialized(cls, serialized):
         parser = configparser.ConfigParser(interpolation=None, empty_lines_in_values=False)
         parser.read_string(serialized)
 
         if not "general" in parser or not "version" in parser["general"] or not "name" in parser["general"] or not "id" in parser["general"]:
             raise InvalidContainerStackError("Missing required section 'general' or 'version' property")
 
-        if parser["general"].getint("version") != self.Version:
+        if parser["general"].getint("version") != cls.Version:
             raise IncorrectVersionError
 
+        return parser
+
+    ##  Deserialize the container stack from data returned by parseSerialized().
+    #
+    #   This looks up the containers in the stack in the registry, so it must
+    #   be called on the main thread.
+    #
+    #   \param parser \type{ConfigParser} The parsed data of the container stack.
+    def deserializeParsed(self, parser):
         self._name = parser["general"].get("name")
         self._id = parser["general"].get("id")
 
@@ -229,6 +255,12 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
                 else:
                     raise Exception("When trying to deserialize, we recieved an unknown ID (%s) for container" % container_id)
 
+        self._dirty = False
+
+        # The name and metadata were replaced, so anything that looks the stack up by them must know.
+        self.nameChanged.emit()
+        self.metaDataChanged.emit()
+
         ## TODO; Deserialize the containers.
 
     ##  Get all keys known to this container stack.
@@ -340,6 +372,7 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
         if container is not self:
             container.propertyChanged.connect(self.propertyChanged)
             self._containers.insert(0, container)
+            self._dirty = True
             self.containersChanged.emit(container)
         else:
             raise Exception("Unable to add stack to itself.")
@@ -360,6 +393,7 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
         self._containers[index].propertyChanged.disconnect(self.propertyChanged)
         container.propertyChanged.connect(self.propertyChanged)
         self._containers[index] = container
+        self._dirty = True
         self.containersChanged.emit(container)
 
     ##  Remove a container from the stack.
@@ -374,6 +408,7 @@ class ContainerStack(ContainerInterface.ContainerInterface, PluginObject):
             container = self._containers[index]
             container.propertyChanged.disconnect(self.propertyChanged)
             del self._containers[index]
+            self._dirty = True
             self.containersChanged.emit(container)
         except TypeError:
             raise IndexError("Can't delete container with index %s" % index)
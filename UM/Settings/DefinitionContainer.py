@@ -4,6 +4,7 @@
 import json
 import collections
 import copy
+import os
 
 from UM.Resources import Resources
 from UM.PluginObject import PluginObject
@@ -75,6 +76,12 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
     def setReadOnly(self, read_only):
         pass
 
+    ##  Check if this container is dirty, that is, if it changed from deserialization.
+    #
+    #   Definitions cannot be changed after they are deserialized, so they never need to be saved.
+    def isDirty(self):
+        return False
+
     ##  \copydoc ContainerInterface::getMetaData
     #
     #   Reimplemented from ContainerInterface
@@ -155,22 +162,36 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
     #
     #   Reimplemented from ContainerInterface
     def deserialize(self, serialized):
-        parsed = json.loads(serialized, object_pairs_hook=collections.OrderedDict)
+        self.deserializeParsed(self.parseSerialized(serialized))
 
+    ##  Parse the JSON of a definition.
+    #
+    #   This does not depend on any other container, so unlike
+    #   deserializeParsed() it can be called on any thread.
+    #
+    #   \param serialized \type{string} The serialized definition.
+    #   \return The parsed data, to pass to deserializeParsed().
+    @classmethod
+    def parseSerialized(cls, serialized):
+        return json.loads(serialized, object_pairs_hook=collections.OrderedDict)
+
+    ##  Deserialize the container from data returned by parseSerialized().
+    #
+    #   This resolves the definitions it inherits from, so it must be called
+    #   on the main thread.
+    #
+    #   \param parsed The parsed data of the definition.
+    def deserializeParsed(self, parsed):
         self._verifyJson(parsed)
 
         # Pre-process the JSON data to include inherited data and overrides
+        inherited_paths = {}
         if "inherits" in parsed:
-            inherited = self._resolveInheritance(parsed["inherits"])
+            inherited, inherited_paths = self._resolveInheritance(parsed["inherits"])
             parsed = self._mergeDicts(inherited, parsed)
 
         if "overrides" in parsed:
-            for key, value in parsed["overrides"].items():
-                setting = self._findInDict(parsed["settings"], key)
-                if setting is None:
-                    Logger.log("w","Unable to override setting %s", key)
-                else:
-                    setting.update(value)
+            self._applyOverrides(parsed, inherited_paths)
 
         # If we do not have metadata or settings the file is invalid
         if not "metadata" in parsed:
@@ -181,7 +202,7 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
 
         # Update properties with the data from the JSON
         self._name = parsed["name"]
-        self._metadata = parsed["metadata"]
+        self._metadata = copy.deepcopy(parsed["metadata"]) # The metadata can be shared with other definitions through the inheritance cache.
 
         for key, value in parsed["settings"].items():
             definition = SettingDefinition.SettingDefinition(key, self, None, self._i18n_catalog)
@@ -209,9 +230,18 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
 
     # protected:
 
+    ##  Clear the cache of resolved parent definitions.
+    #
+    #   This frees the memory used by the cache. It is filled again when
+    #   definitions that inherit from other definitions get deserialized.
+    @classmethod
+    def clearInheritanceCache(cls):
+        cls.__inheritance_cache.clear()
+
     # Load a file from disk, used to handle inheritance and includes
-    def _loadFile(self, file_name):
-        path = Resources.getPath(Resources.DefinitionContainers, file_name + ".def.json")
+    def _loadFile(self, file_name, path = None):
+        if path is None:
+            path = Resources.getPath(Resources.DefinitionContainers, file_name + ".def.json")
         contents = {}
         with open(path, encoding = "utf-8") as f:
             contents = json.load(f, object_pairs_hook=collections.OrderedDict)
@@ -220,17 +250,42 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
         return contents
 
     # Recursively resolve loading inherited files
+    #
+    # Since many definitions inherit from the same parents, the resolved result for each parent is cached
+    # until one of the files it was created from changes. The result is shared between all definitions
+    # inheriting from that parent, so it must never be modified. _mergeDicts() and _applyOverrides() copy
+    # only the parts they change.
+    #
+    # \return A tuple of the resolved JSON data and a dictionary that maps the keys of all settings in it to
+    # their path in the "settings" section.
     def _resolveInheritance(self, file_name):
-        result = {}
+        path = Resources.getPath(Resources.DefinitionContainers, file_name + ".def.json")
 
-        json = self._loadFile(file_name)
+        entry = self.__inheritance_cache.get(path)
+        if entry is not None:
+            json, setting_paths, files = entry
+            try:
+                if all(os.path.getmtime(file_path) == modified_time for file_path, modified_time in files):
+                    self._inherited_files.extend(file_path for file_path, _ in files)
+                    return json, setting_paths
+            except OSError:
+                pass
+
+        first_file = len(self._inherited_files)
+
+        json = self._loadFile(file_name, path)
         self._verifyJson(json)
 
         if "inherits" in json:
-            inherited = self._resolveInheritance(json["inherits"])
+            inherited, _ = self._resolveInheritance(json["inherits"])
             json = self._mergeDicts(inherited, json)
 
-        return json
+        setting_paths = {}
+        self._findSettingPaths(json.get("settings", {}), (), setting_paths)
+
+        files = [(file_path, os.path.getmtime(file_path)) for file_path in self._inherited_files[first_file:]]
+        self.__inheritance_cache[path] = (json, setting_paths, files)
+        return json, setting_paths
 
     # Verify that a loaded json matches our basic expectations.
     def _verifyJson(self, json):
@@ -244,17 +299,61 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
             raise IncorrectDefinitionVersionError("Definition uses version {0} but expected version {1}".format(json["version"], self.Version))
 
     # Recursively find a key in a dictionary
+    #
+    # \return The path of keys leading to the key, or None if it was not found.
     def _findInDict(self, dictionary, key):
-        if key in dictionary: return dictionary[key]
+        if key in dictionary: return (key, )
         for k, v in dictionary.items():
             if isinstance(v, dict):
                 item = self._findInDict(v, key)
                 if item is not None:
-                    return item
+                    return (k, ) + item
+
+    # Recursively collect the paths of all settings in the settings section of a definition.
+    def _findSettingPaths(self, settings, path, result):
+        for key, value in settings.items():
+            if key not in result:
+                result[key] = path + (key, )
+
+        for key, value in settings.items():
+            if isinstance(value, dict) and isinstance(value.get("children"), dict):
+                self._findSettingPaths(value["children"], path + (key, "children"), result)
+
+    # Apply the overrides of a definition to its settings.
+    #
+    # Since the settings can be shared with parent definitions in the inheritance cache, every dictionary on
+    # the way to an overridden setting is copied before it is changed.
+    #
+    # \param parsed The merged JSON data of the definition.
+    # \param setting_paths The paths of the settings in the parent definition.
+    def _applyOverrides(self, parsed, setting_paths):
+        copied = set()
+        def writable(parent, key):
+            child = parent[key]
+            if id(child) not in copied:
+                child = child.copy()
+                parent[key] = child
+                copied.add(id(child))
+            return child
+
+        for key, value in parsed["overrides"].items():
+            path = setting_paths.get(key)
+            if path is None:
+                path = self._findInDict(parsed["settings"], key)
+            if path is None:
+                Logger.log("w","Unable to override setting %s", key)
+                continue
+
+            setting = writable(parsed, "settings")
+            for path_key in path:
+                setting = writable(setting, path_key)
+            setting.update(value)
 
     # Recursively merge two dictionaries, returning a new dictionary
+    #
+    # Values that are not changed by the second dictionary are shared with the first dictionary, not copied.
     def _mergeDicts(self, first, second):
-        result = copy.deepcopy(first)
+        result = first.copy()
         for key, value in second.items():
             if key in result:
                 if isinstance(value, dict):
@@ -296,6 +395,10 @@ class DefinitionContainer(ContainerInterface.ContainerInterface, PluginObject):
             relation = SettingRelation.SettingRelation(other, definition, SettingRelation.RelationType.RequiredByTarget, property)
             other.relations.append(relation)
 
+    # Cache of resolved parent definitions. Maps the path of a definition file to a tuple of its resolved
+    # JSON data, the paths of its settings and the files it was created from with their modification times.
+    __inheritance_cache = {}
+
     def _getDefinition(self, key):
         definition = None
         if key in self._definition_cache:
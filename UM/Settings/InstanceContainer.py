@@ -3,6 +3,7 @@
 
 import configparser
 import io
+import threading
 
 from UM.Signal import Signal, signalemitter
 from UM.PluginObject import PluginObject
@@ -41,6 +42,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
         self._definition = None
         self._metadata = {}
         self._instances = {}
+        self._cached_values = None # Values read by deserialize() for which no SettingInstance has been created yet.
+        self._instantiate_lock = threading.RLock() # Only one thread may create the instances of the cached values.
+        self._instantiating = False
         self._read_only = False
         self._dirty = False
 
@@ -89,6 +93,7 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     def setMetaData(self, metadata):
         if metadata != self._metadata:
             self._metadata = metadata
+            self._dirty = True
             self.metaDataChanged.emit()
 
     ##  \copydoc ContainerInterface::getMetaDataEntry
@@ -101,12 +106,15 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
         if key not in self._metadata:
             self._metadata[key] = value
             self._dirty = True
+            self.metaDataChanged.emit()
         else:
             Logger.log("w", "Meta data with key %s was already added.", key)
 
     def setMetaDataEntry(self, key, value):
         if key in self._metadata:
             self._metadata[key] = value
+            self._dirty = True
+            self.metaDataChanged.emit()
         else:
             Logger.log("w", "Meta data with key %s was not found. Unable to change.", key)
 
@@ -114,10 +122,19 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     def isDirty(self):
         return self._dirty
 
+    ##  Set whether this container is dirty.
+    #
+    #   The ContainerRegistry marks containers as not dirty once they have been saved.
+    def setDirty(self, dirty):
+        self._dirty = dirty
+
     ##  \copydoc ContainerInterface::getProperty
     #
     #   Reimplemented from ContainerInterface
     def getProperty(self, key, property_name):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         if key in self._instances:
             try:
                 return getattr(self._instances[key], property_name)
@@ -130,6 +147,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     #
     #   Reimplemented from ContainerInterface.
     def hasProperty(self, key, property_name):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         return key in self._instances and hasattr(self._instances[key], property_name)
 
     ##  Set the value of a property of a SettingInstance.
@@ -145,6 +165,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     #
     #   \note If no definition container is set for this container, new instances cannot be created and this method will do nothing.
     def setProperty(self, key, property_name, property_value, container = None):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         if key not in self._instances:
             if not self._definition:
                 Logger.log("w", "Tried to set value of setting %s that has no instance in container %s and unable to create a new instance", key, repr(self))
@@ -168,6 +191,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
 
     ##  Remove all instances from this container.
     def clear(self):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         all_keys = self._instances.copy()
         for key in all_keys:
             self.removeInstance(key)
@@ -175,6 +201,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     ##  Get all the keys of the instances of this container
     #   \returns list of keys
     def getAllKeys(self):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         return [key for key in self._instances]
 
     ##  \copydoc ContainerInterface::serialize
@@ -187,6 +216,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
             Logger.log("e", "Tried to serialize an instance container without definition, this is not supported")
             return ""
 
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         parser["general"] = {}
         parser["general"]["version"] = str(self.Version)
         parser["general"]["name"] = str(self._name)
@@ -211,15 +243,35 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     #
     #   Reimplemented from ContainerInterface
     def deserialize(self, serialized):
+        self.deserializeParsed(self.parseSerialized(serialized))
+
+    ##  Parse the serialized instance container and check its version.
+    #
+    #   This does not depend on any other container, so unlike
+    #   deserializeParsed() it can be called on any thread.
+    #
+    #   \param serialized \type{string} The serialized instance container.
+    #   \return \type{ConfigParser} The parsed data, to pass to deserializeParsed().
+    @classmethod
+    def parseSerialized(cls, serialized):
         parser = configparser.ConfigParser(interpolation = None, empty_lines_in_values = False)
         parser.read_string(serialized)
 
         if not "general" in parser or not "version" in parser["general"] or not "definition" in parser["general"]:
             raise InvalidInstanceError("Missing required section 'general' or 'version' property")
 
-        if parser["general"].getint("version") != self.Version:
-            raise IncorrectInstanceVersionError("Reported version {0} but expected version {1}".format(parser["general"].getint("version"), self.Version))
+        if parser["general"].getint("version") != cls.Version:
+            raise IncorrectInstanceVersionError("Reported version {0} but expected version {1}".format(parser["general"].getint("version"), cls.Version))
+
+        return parser
 
+    ##  Deserialize the container from data returned by parseSerialized().
+    #
+    #   This looks up the definition of the container in the registry, so it
+    #   must be called on the main thread.
+    #
+    #   \param parser \type{ConfigParser} The parsed data of the instance container.
+    def deserializeParsed(self, parser):
         self._name = parser["general"].get("name", self._id)
 
         definition_id = parser["general"]["definition"]
@@ -231,16 +283,24 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
         if "metadata" in parser:
             self._metadata = dict(parser["metadata"])
 
+        self._cached_values = None
         if "values" in parser:
-            for key, value in parser["values"].items():
-                self.setProperty(key, "value", value, self._definition)
+            # Creating the instances is postponed until they are needed, see _instantiateCachedValues().
+            self._cached_values = dict(parser["values"])
 
         self._dirty = False
 
+        # The name, definition and metadata were replaced, so anything that looks the container up by them must know.
+        self.nameChanged.emit()
+        self.metaDataChanged.emit()
+
     ##  Find instances matching certain criteria.
     #
     #   \param kwargs \type{dict} A dictionary of keyword arguments with key-value pairs that should match properties of the instances.
     def findInstances(self, **kwargs):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         result = []
         for setting_key, instance in self._instances.items():
             for key, value in kwargs.items():
@@ -254,6 +314,9 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     ##  Get an instance by key
     #
     def getInstance(self, key):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         if key in self._instances:
             return self._instances[key]
 
@@ -261,15 +324,22 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
 
     ##  Add a new instance to this container.
     def addInstance(self, instance):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         key = instance.definition.key
         if key in self._instances:
             return
 
         instance.propertyChanged.connect(self.propertyChanged)
         self._instances[key] = instance
+        self._dirty = True
 
     ##  Remove an instance from this container.
     def removeInstance(self, key):
+        if self._cached_values:
+            self._instantiateCachedValues()
+
         if key not in self._instances:
             return
 
@@ -296,7 +366,49 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
     #   Since SettingInstance needs a SettingDefinition to work properly, we need some
     #   way of figuring out what SettingDefinition to use when creating a new SettingInstance.
     def setDefinition(self, definition):
-        self._definition = definition
+        if definition != self._definition:
+            self._definition = definition
+            self._dirty = True
+            self.metaDataChanged.emit()
+
+    ##  Create SettingInstance objects for the values that were read by deserialize().
+    #
+    #   Most containers that get loaded at startup are never used, so parsing their values is postponed
+    #   until something actually needs the instances of this container.
+    def _instantiateCachedValues(self):
+        with self._instantiate_lock:
+            values = self._cached_values
+            if not values or self._instantiating:
+                return # Another thread created the instances already, or this thread is creating them and a signal led back here.
+
+            # The cached values are only cleared when all instances exist, so other threads wait for them above.
+            self._instantiating = True
+            try:
+                instances = dict(self._instances)
+                existing_values = {}
+                for key, value in values.items():
+                    if key in instances:
+                        existing_values[key] = value
+                        continue
+
+                    setting_definition = self._definition.findDefinitions(key = key)
+                    if not setting_definition:
+                        Logger.log("w", "Tried to set value of setting %s that has no instance in container %s and unable to create a new instance", key, repr(self))
+                        continue
+
+                    instance = SettingInstance.SettingInstance(setting_definition[0], self)
+                    instance.setProperty("value", value, self._definition)
+                    instance.propertyChanged.connect(self.propertyChanged)
+                    instances[instance.definition.key] = instance
+
+                self._instances = instances
+                self._cached_values = None
+            finally:
+                self._instantiating = False
+
+        # Changing the existing instances notifies the listeners of this container, which may read it again.
+        for key, value in existing_values.items():
+            self._instances[key].setProperty("value", value, self._definition)
 
     def __lt__(self, other):
         own_weight = self.getMetaDataEntry("weight")
@@ -306,3 +418,15 @@ class InstanceContainer(ContainerInterface.ContainerInterface, PluginObject):
             return own_weight < other_weight
 
         return self._name < other.name
+
+    ##  To support Pickle
+    #
+    #   Pickle does not support the lock, so instead remove it from the state.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_instantiate_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._instantiate_lock = threading.RLock()
@@ -65,15 +65,14 @@ class SettingDefinition:
         self.__ancestors = set() # Cached set of keys of ancestors. Used for fast lookups of ancestors.
         self.__descendants = {} # Cached set of key - definition pairs of descendants. Used for fast lookup of descendants by key.
 
-        self.__property_values = {}
-
-    ##  Override __getattr__ to provide access to definition properties.
+    ##  Override __getattr__ to provide access to the default values of definition properties.
+    #
+    #   The values of properties that were set by deserialize() are stored as
+    #   normal attributes of the object, so reading them does not need to go
+    #   through this method.
     def __getattr__(self, name):
         if name in self.__property_definitions:
-            if name in self.__property_values:
-                return self.__property_values[name]
-            else:
-                return self.__property_definitions[name]["default"]
+            return self.__property_definitions[name]["default"]
 
         raise AttributeError("'SettingDefinition' object has no attribute '{0}'".format(name))
 
@@ -146,8 +145,9 @@ class SettingDefinition:
         for child in self.children:
             result["children"][child.key] = child.serialize_to_dict()
 
-        for key, value in self.__property_values.items():
-            result[key] = str(value)
+        for key, value in self.__dict__.items():
+            if key in self.__property_definitions:
+                result[key] = str(value)
 
         return result
 
@@ -442,19 +442,21 @@ class SettingDefinition:
                 if value not in self.__type_definitions:
                     raise ValueError("Type {0} is not a correct setting type".format(value))
 
+            # Property values are stored directly in the object dictionary so reading them is a normal attribute lookup.
+            # This bypasses __setattr__, which does not allow setting properties.
             if self.__property_definitions[key]["type"] == DefinitionPropertyType.Any:
-                self.__property_values[key] = value
+                self.__dict__[key] = value
             elif self.__property_definitions[key]["type"] == DefinitionPropertyType.String:
-                self.__property_values[key] = str(value)
+                self.__dict__[key] = str(value)
             elif self.__property_definitions[key]["type"] == DefinitionPropertyType.TranslatedString:
-                self.__property_values[key] = self._i18n_catalog.i18n(str(value)) if self._i18n_catalog is not None else value
+                self.__dict__[key] = self._i18n_catalog.i18n(str(value)) if self._i18n_catalog is not None else value
             elif self.__property_definitions[key]["type"] == DefinitionPropertyType.Function:
-                self.__property_values[key] = SettingFunction.SettingFunction(str(value))
+                self.__dict__[key] = SettingFunction.SettingFunction(str(value))
             else:
                 Logger.log("w", "Unknown DefinitionPropertyType (%s) for key %s", key, self.__property_definitions[key]["type"])
 
         for key in filter(lambda i: self.__property_definitions[i]["required"], self.__property_definitions):
-            if key not in self.__property_values:
+            if key not in self.__dict__:
                 raise AttributeError("Setting {0} is missing required property {1}".format(self._key, key))
 
         self.__ancestors = self._updateAncestors()
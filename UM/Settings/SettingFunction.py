@@ -2,7 +2,9 @@
 # Uranium is released under the terms of the AGPLv3 or higher.
 
 import ast
+import marshal # For storing compiled code on disk.
 import math # Imported here so it can be used easily by the setting functions.
+import types
 
 from UM.Logger import Logger
 
@@ -19,14 +21,14 @@ class SettingFunction:
         super().__init__(*args, **kwargs)
 
         self._code = code
-        self._settings = set()  # Keys of all settings that are referenced to in this function.
+        self._settings = frozenset()  # Keys of all settings that are referenced to in this function.
         self._compiled = None
+        self._function = None  # The code compiled as a function that takes the referenced settings as positional arguments.
+        self._parameters = ()  # Keys of the referenced settings, in the order in which _function expects them.
         self._valid = False
 
         try:
-            tree = ast.parse(self._code, "eval")
-            self._settings = frozenset(_SettingExpressionVisitor().visit(tree))
-            self._compiled = compile(self._code, repr(self), "eval")
+            self._compiled, self._settings, self._function, self._parameters = _compile(self._code)
             self._valid = True
         except (SyntaxError, TypeError) as e:
             Logger.log("e", "Parse error in function ({1}) for setting: {0}".format(str(e), self._code))
@@ -43,16 +45,28 @@ class SettingFunction:
         if not self._valid:
             return None
 
-        locals = { }
-        for name in self._settings:
-            value = value_provider.getProperty(name, "value")
+        get_property = value_provider.getProperty
+        values = []
+        complete = True
+        for name in self._parameters:
+            value = get_property(name, "value")
             if value is None:
-                Logger.log("e", "%s references unknown setting %s", self, name)
-                continue
-
-            locals[name] = value
+                complete = False
+            values.append(value)
 
         try:
+            if complete:
+                return self._function(*values)
+
+            # Some setting is unknown. Leave it undefined so the expression only fails if it actually uses it.
+            locals = { }
+            for name, value in zip(self._parameters, values):
+                if value is None:
+                    Logger.log("e", "%s references unknown setting %s", self, name)
+                    continue
+
+                locals[name] = value
+
             return eval(self._compiled, globals(), locals)
         except Exception as e:
             Logger.logException("d", "An exception occurred in inherit function %s", self)
@@ -81,15 +95,91 @@ class SettingFunction:
     ##  To support Pickle
     #
     #   Pickle does not support the compiled code, so instead remove it from the state.
-    #   We can re-compile it later on anyway.
+    #   We can get it from the compiled code cache later on anyway.
     def __getstate__(self):
         state = self.__dict__.copy()
         del state["_compiled"]
+        del state["_function"]
+        del state["_parameters"]
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
-        self._compiled = compile(self._code, repr(self), "eval")
+        self._compiled = None
+        self._function = None
+        self._parameters = ()
+        if self._valid:
+            self._compiled, self._settings, self._function, self._parameters = _compile(self._code)
+
+##  Cache of compiled setting functions, shared by all SettingFunction objects.
+#
+#   The same expressions are used by a lot of definitions and instance containers,
+#   so this maps the code of a function to the result of _compile() for that code.
+_compile_cache = {}
+
+##  Parse and compile the code of a setting function.
+#
+#   Results are stored in _compile_cache so each distinct piece of code only
+#   gets parsed and compiled once.
+#
+#   \param code The Python code to compile.
+#   \return A tuple of the code compiled as an expression, a frozenset of the
+#   keys of the settings it references, the code compiled as a function taking
+#   those settings as positional arguments and a tuple of those keys in the
+#   order in which the function expects them.
+#   \exception IllegalMethodError If the code uses a blacklisted name.
+def _compile(code):
+    try:
+        return _compile_cache[code]
+    except KeyError:
+        pass
+
+    tree = ast.parse(code, "eval")
+    settings = frozenset(_SettingExpressionVisitor().visit(tree))
+    filename = "={0}".format(code)
+    compiled = compile(code, filename, "eval")
+
+    # The code is known to be a valid expression at this point, so wrapping it
+    # in a lambda is safe. The newline keeps trailing comments from eating the
+    # closing parenthesis.
+    parameters = tuple(sorted(settings))
+    function = eval(compile("lambda {0}: ({1}\n)".format(", ".join(parameters), code), filename, "eval"), globals())
+
+    result = (compiled, settings, function, parameters)
+    _compile_cache[code] = result
+    return result
+
+##  Get the contents of the compiled code cache in a form that can be stored on disk.
+#
+#   The result can be passed to loadCompiledCode() to fill the cache again without
+#   having to parse and compile all code. Note that the result can only be loaded
+#   by the same version of Python.
+#
+#   \param functions The SettingFunction objects of which to store the compiled
+#   code, or None to store all of the cache.
+#   \return A bytes object with the marshalled contents of the compiled code cache.
+def dumpCompiledCode(functions = None):
+    if functions is None:
+        codes = list(_compile_cache)
+    else:
+        codes = {function._code for function in functions}
+
+    data = {}
+    for code in codes:
+        try:
+            compiled, settings, function, parameters = _compile_cache[code]
+        except KeyError: # The function is not valid, so it was never compiled.
+            continue
+        data[code] = (compiled, tuple(settings), function.__code__, parameters)
+    return marshal.dumps(data)
+
+##  Fill the compiled code cache with data created by dumpCompiledCode().
+#
+#   \param data A bytes object returned by dumpCompiledCode().
+def loadCompiledCode(data):
+    for code, (compiled, settings, function_code, parameters) in marshal.loads(data).items():
+        if code not in _compile_cache:
+            _compile_cache[code] = (compiled, frozenset(settings), types.FunctionType(function_code, globals()), parameters)
 
 # Helper class used to analyze a parsed function
 class _SettingExpressionVisitor(ast.NodeVisitor):
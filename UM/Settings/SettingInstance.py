@@ -60,24 +60,12 @@ class SettingInstance:
 
         self._state = InstanceState.Default
 
-        self.__property_values = {}
-
+    ##  Override __getattr__ to raise a proper error for properties that were not set.
+    #
+    #   Property values are stored as normal attributes of the object by
+    #   setProperty(), so reading a property that was set does not go through
+    #   this method.
     def __getattr__(self, name):
-        if name == "_SettingInstance__property_values":
-            # Prevent infinite recursion when __property_values is not set.
-            # This happens primarily with Pickle
-            raise AttributeError("'SettingInstance' object has no attribute '{0}'".format(name))
-
-        if name in self.__property_values:
-            value = self.__property_values[name]
-            if isinstance(value, str) and name == "value":
-                try:
-                    return SettingDefinition.settingValueFromString(self._definition.type, value)
-                except Exception:
-                    return value
-            else:
-                return value
-
         raise AttributeError("'SettingInstance' object has no attribute '{0}'".format(name))
 
     @call_if_enabled(_traceSetProperty, _isTraceEnabled())
@@ -87,11 +75,18 @@ class SettingInstance:
                 Logger.log("e", "Tried to set property %s which is a read-only property", name)
                 return
 
-            if name not in self.__property_values or value != self.__property_values[name]:
-                if isinstance(value, str) and value.strip().startswith("="):
+            if isinstance(value, str):
+                if value.strip().startswith("="):
                     value = SettingFunction.SettingFunction(value[1:])
-
-                self.__property_values[name] = value
+                elif name == "value":
+                    # Convert the value once here instead of every time it is read.
+                    try:
+                        value = SettingDefinition.settingValueFromString(self._definition.type, value)
+                    except Exception:
+                        pass
+
+            if name not in self.__dict__ or value != self.__dict__[name]:
+                self.__dict__[name] = value
                 if name == "value":
                     if not container:
                         container = self._container
@@ -0,0 +1,238 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+from UM.Signal import Signal, signalemitter
+
+from .SettingFunction import SettingFunction
+from .SettingDefinition import SettingDefinition
+from .DefinitionContainer import DefinitionContainer
+from .Validator import ValidatorState
+
+##  Validates all settings of a container stack in one pass.
+#
+#   Requesting the validation state of every setting from the stack separately
+#   means that each validation resolves the value and four bounds of a setting
+#   through the entire stack, and evaluates any function it finds again. This
+#   class resolves each property only once into a snapshot that is shared by
+#   all validators and by the functions they evaluate. The resulting states are
+#   cached until the value or bounds of a setting, or of a setting it depends
+#   on, change.
+#
+#   The snapshot is kept up to date through the propertyChanged and
+#   containersChanged signals of the stack. Changes to the next stack of the
+#   stack are not signalled, so call invalidate() after changing those.
+@signalemitter
+class StackValidator:
+    ##  The properties that determine the validation state of a setting.
+    ValidatedProperties = ("value", "minimum_value", "maximum_value", "minimum_value_warning", "maximum_value_warning")
+
+    ##  The validation states that are reported as errors.
+    ErrorStates = (ValidatorState.Exception, ValidatorState.MinimumError, ValidatorState.MaximumError)
+
+    ##  The validation states that are reported as warnings.
+    WarningStates = (ValidatorState.MinimumWarning, ValidatorState.MaximumWarning)
+
+    ##  Constructor
+    #
+    #   \param stack \type{ContainerStack} The stack to validate the settings of.
+    def __init__(self, stack, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._stack = stack
+
+        self._values = {} # (key, property name) -> resolved value of that property.
+        self._states = {} # key -> validation state of that setting.
+        self._validators = None # key -> validator, for all settings that can be validated.
+        self._used_keys = {} # key -> keys used by the functions of the validated properties of that setting.
+        self._dependents = None # key -> keys of the settings that use that setting in their functions.
+
+        self._stack.propertyChanged.connect(self._onPropertyChanged)
+        self._stack.containersChanged.connect(self._onContainersChanged)
+
+    ##  Emitted when the cached validation states are invalidated.
+    #
+    #   \param keys \type{set} The keys of the settings that need validation
+    #   again, or None if all settings need validation again.
+    validationStatesChanged = Signal()
+
+    ##  Get the stack that is validated.
+    def getStack(self):
+        return self._stack
+
+    ##  Get the resolved value of a property of a setting.
+    #
+    #   This has the same result as getProperty() of the stack, but the result
+    #   is stored in the snapshot. Since this object is also used as value
+    #   provider for the functions it evaluates, every property is resolved
+    #   only once.
+    #
+    #   \param key \type{str} The key of the setting.
+    #   \param property_name \type{str} The name of the property.
+    def getProperty(self, key, property_name):
+        cache_key = (key, property_name)
+        if cache_key in self._values:
+            return self._values[cache_key]
+
+        value = self._stack.getRawProperty(key, property_name)
+        if isinstance(value, SettingFunction):
+            value = value(self)
+
+        self._values[cache_key] = value
+        return value
+
+    ##  Get the validation state of a setting.
+    #
+    #   \param key \type{str} The key of the setting.
+    #   \return \type{ValidatorState} The validation state of the setting, or
+    #   None if the setting does not exist or cannot be validated.
+    def getValidationState(self, key):
+        try:
+            return self._states[key]
+        except KeyError:
+            pass
+
+        validator = self._getValidators().get(key)
+        if validator is None:
+            return None
+
+        state = validator(self)
+        self._states[key] = state
+        return state
+
+    ##  Get the validation states of all settings that can be validated.
+    #
+    #   Only the settings that changed since the last validation are validated
+    #   again.
+    #
+    #   \return \type{dict} The validation state of each setting, by key.
+    def validate(self):
+        return { key: self.getValidationState(key) for key in self._getValidators() }
+
+    ##  Get the keys of all settings that have a validation error.
+    #
+    #   \return \type{list} A sorted list of setting keys.
+    def getErrors(self):
+        return self._findKeysWithState(self.ErrorStates)
+
+    ##  Get the keys of all settings that have a validation warning.
+    #
+    #   \return \type{list} A sorted list of setting keys.
+    def getWarnings(self):
+        return self._findKeysWithState(self.WarningStates)
+
+    ##  Check whether any setting has a validation error.
+    def hasErrors(self):
+        return any(state in self.ErrorStates for state in self.validate().values())
+
+    ##  Discard the snapshot and all cached validation states.
+    def invalidate(self):
+        self._values.clear()
+        self._states.clear()
+        self._validators = None
+        self._used_keys.clear()
+        self._dependents = None
+
+        self.validationStatesChanged.emit(None)
+
+    # protected:
+
+    def _findKeysWithState(self, states):
+        return sorted(key for key, state in self.validate().items() if state in states)
+
+    # Get the validator of every setting that has a type which can be validated.
+    def _getValidators(self):
+        if self._validators is not None:
+            return self._validators
+
+        self._validators = {}
+        stack = self._stack
+        while stack:
+            for container in stack.getContainers():
+                if not isinstance(container, DefinitionContainer):
+                    continue
+
+                for definition in container.findDefinitions():
+                    if definition.key in self._validators:
+                        continue # Like the stack, the first definition of a key wins.
+
+                    validator_type = SettingDefinition.getValidatorForType(definition.type)
+                    self._validators[definition.key] = validator_type(definition.key) if validator_type else None
+
+            stack = stack.getNextStack()
+
+        self._validators = { key: validator for key, validator in self._validators.items() if validator is not None }
+        return self._validators
+
+    # Get the keys that are used by the functions of the validated properties of a setting.
+    def _getUsedKeys(self, key):
+        try:
+            return self._used_keys[key]
+        except KeyError:
+            pass
+
+        used_keys = set()
+        for property_name in self.ValidatedProperties:
+            value = self._stack.getRawProperty(key, property_name)
+            if isinstance(value, SettingFunction):
+                used_keys |= value.getUsedSettingKeys()
+        used_keys.discard(key)
+
+        self._used_keys[key] = used_keys
+        return used_keys
+
+    # Get the settings that use a setting, built once for all settings that are validated.
+    def _getDependents(self):
+        if self._dependents is not None:
+            return self._dependents
+
+        self._dependents = {}
+        for key in self._getValidators():
+            for used_key in self._getUsedKeys(key):
+                self._dependents.setdefault(used_key, set()).add(key)
+
+        # Settings that cannot be validated can still pass on changes to settings that can.
+        pending = list(self._dependents.keys())
+        while pending:
+            key = pending.pop()
+            if key in self._used_keys:
+                continue
+
+            for used_key in self._getUsedKeys(key):
+                if used_key not in self._dependents:
+                    pending.append(used_key)
+                self._dependents.setdefault(used_key, set()).add(key)
+
+        return self._dependents
+
+    # Remove a setting and every setting that depends on it from the snapshot.
+    def _invalidateSetting(self, key):
+        dependents = self._getDependents()
+
+        # The functions of the setting may have changed, so update what it depends on.
+        for used_key in self._used_keys.pop(key, set()):
+            dependents.get(used_key, set()).discard(key)
+        for used_key in self._getUsedKeys(key):
+            dependents.setdefault(used_key, set()).add(key)
+
+        invalidated = set()
+        pending = [key]
+        while pending:
+            current = pending.pop()
+            if current in invalidated:
+                continue
+            invalidated.add(current)
+
+            for property_name in self.ValidatedProperties:
+                self._values.pop((current, property_name), None)
+            self._states.pop(current, None)
+
+            pending.extend(dependents.get(current, ()))
+
+        self.validationStatesChanged.emit(invalidated)
+
+    def _onPropertyChanged(self, key, property_name):
+        if property_name in self.ValidatedProperties:
+            self._invalidateSetting(key)
+
+    def _onContainersChanged(self, container):
+        self.invalidate()
@@ -13,3 +13,4 @@ from .InstanceContainer import InstanceContainer
 from .ContainerStack import ContainerStack
 
 from .Validator import Validator, ValidatorState
+from .StackValidator import StackValidator
@@ -265,7 +265,7 @@ def signalemitter(cls):
         else:
             sub = old_new(subclass, *args, **kwargs)
 
-        for key, value in inspect.getmembers(cls, lambda i: isinstance(i, Signal)):
+        for key, value in signals:
             setattr(sub, key, Signal(type = value.getType()))
 
         return sub
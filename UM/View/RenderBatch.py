@@ -180,7 +180,7 @@ class RenderBatch():
         if self._state_setup_callback:
             self._state_setup_callback(self._gl)
 
-        self._view_matrix = camera.getWorldTransformation().getInverse()
+        self._view_matrix = camera.getViewMatrix()
         self._projection_matrix = camera.getProjectionMatrix()
         self._view_projection_matrix = camera.getProjectionMatrix().multiply(self._view_matrix)
 
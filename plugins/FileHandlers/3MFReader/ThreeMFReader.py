@@ -0,0 +1,284 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+from UM.Mesh.MeshReader import MeshReader
+from UM.Mesh.MeshData import MeshData
+from UM.Math.Matrix import Matrix
+from UM.Scene.SceneNode import SceneNode
+from UM.Scene.GroupDecorator import GroupDecorator
+from UM.Logger import Logger
+from UM.Job import Job
+
+import os
+import numpy
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+##  Reads the meshes and build items of a 3MF file.
+#
+#   The model is parsed incrementally with iterparse. Elements are removed
+#   from the tree once their attributes are read, and the vertices and
+#   triangles are collected in numpy arrays that grow as needed, so the memory
+#   use is proportional to the meshes rather than to the XML text.
+#
+#   The file has Z pointing up and the scene has Y pointing up. Like the
+#   STLReader, the file (x, y, z) becomes (x, z, -y) in the scene. This is
+#   the inverse of what the ThreeMFWriter does, so a file written by that
+#   writer is read back unchanged.
+class ThreeMFReader(MeshReader):
+    def __init__(self):
+        super().__init__()
+        self._supported_extensions = [".3mf"]
+        self._namespaces = {
+            "3mf": "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+        }
+
+    ##  The number of vertices or triangles to collect before adding them to their array.
+    _chunk_size = 8192
+
+    ##  The rotation from the coordinates of 3MF to those of the scene.
+    _to_scene = numpy.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, -1, 0, 0], [0, 0, 0, 1]], numpy.float64)
+
+    ##  The size of the units of the model, in millimetres.
+    _unit_scales = {
+        "micron": 0.001,
+        "millimeter": 1.0,
+        "centimeter": 10.0,
+        "inch": 25.4,
+        "foot": 304.8,
+        "meter": 1000.0
+    }
+
+    def read(self, file_name):
+        extension = os.path.splitext(file_name)[1]
+        if extension.lower() not in self._supported_extensions:
+            return None
+
+        try:
+            with zipfile.ZipFile(file_name, "r") as archive:
+                with archive.open(self._getModelName(archive)) as model_file:
+                    scale, objects, items = self._parseModel(model_file)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile, ET.ParseError) as e: # A ValueError is raised for numbers that cannot be parsed.
+            Logger.log("e", "Could not read 3MF file %s: %s", file_name, str(e))
+            return None
+
+        nodes = []
+        try:
+            meshes = {}
+            for object_id, (vertices, indices, components) in objects.items():
+                if vertices is not None:
+                    meshes[object_id] = self._createMeshData(vertices, indices, file_name, scale)
+            for object_id, transformation in items:
+                nodes.append(self._createNode(object_id, transformation, objects, meshes, set()))
+        except (KeyError, ValueError) as e:
+            Logger.log("e", "Invalid 3MF file %s: %s", file_name, str(e))
+            return None
+
+        if not nodes:
+            Logger.log("w", "3MF file %s contains nothing to build.", file_name)
+            return None
+        if len(nodes) == 1:
+            return nodes[0]
+
+        group_node = SceneNode()
+        group_node.addDecorator(GroupDecorator())
+        for node in nodes:
+            node.setParent(group_node)
+        return group_node
+
+    # protected:
+
+    # Get the name of the model file in the archive.
+    #
+    # This is the name that the specification recommends, or else the first
+    # file with the extension of a model.
+    def _getModelName(self, archive):
+        names = archive.namelist()
+        if "3D/3dmodel.model" in names:
+            return "3D/3dmodel.model"
+        for name in names:
+            if name.lower().endswith(".model"):
+                return name
+        raise KeyError("There is no model in the archive.")
+
+    # Parse the model file of the archive.
+    #
+    # Only the start of each element is handled, since all data is in the
+    # attributes. The elements are cleared from their parents whenever the
+    # collected numbers are added to their arrays.
+    #
+    # \return A tuple of the size of the unit of the model in millimetres, a
+    # dictionary from the ID of each object to a tuple of its vertices, its
+    # triangles and its components, and a list of the object ID and
+    # transformation of each build item. The vertices and triangles are None
+    # for objects without mesh, and the components are a list of tuples of
+    # object ID and transformation.
+    def _parseModel(self, model_file):
+        namespace = "{" + self._namespaces["3mf"] + "}"
+        model_tag = namespace + "model"
+        object_tag = namespace + "object"
+        vertex_tag = namespace + "vertex"
+        triangle_tag = namespace + "triangle"
+        component_tag = namespace + "component"
+        item_tag = namespace + "item"
+        container_tags = {namespace + "vertices", namespace + "triangles", namespace + "components", namespace + "build"}
+
+        scale = 1.0
+        objects = {}
+        items = []
+        object_id = None
+        vertices = None
+        triangles = None
+        vertex_buffer = []
+        triangle_buffer = []
+        container = None
+        buffer_size = 3 * self._chunk_size
+        for _, element in ET.iterparse(model_file, events = ("start", )):
+            tag = element.tag
+            if tag == vertex_tag:
+                attributes = element.attrib
+                vertex_buffer += (float(attributes["x"]), float(attributes["y"]), float(attributes["z"]))
+                if len(vertex_buffer) >= buffer_size:
+                    vertices.extend(vertex_buffer)
+                    vertex_buffer = []
+                    container.clear()
+                    Job.yieldThread()
+            elif tag == triangle_tag:
+                attributes = element.attrib
+                triangle_buffer += (int(attributes["v1"]), int(attributes["v2"]), int(attributes["v3"]))
+                if len(triangle_buffer) >= buffer_size:
+                    triangles.extend(triangle_buffer)
+                    triangle_buffer = []
+                    container.clear()
+                    Job.yieldThread()
+            elif tag in container_tags:
+                container = element
+            elif tag == object_tag:
+                self._finishObject(objects, object_id, vertices, vertex_buffer, triangles, triangle_buffer)
+                vertex_buffer = []
+                triangle_buffer = []
+                object_id = element.get("id")
+                vertices = _GrowingArray(numpy.float32)
+                triangles = _GrowingArray(numpy.int32)
+                objects[object_id] = (None, None, [])
+            elif tag == component_tag:
+                objects[object_id][2].append((element.get("objectid"), self._parseTransformation(element.get("transform"), scale)))
+                container.clear()
+            elif tag == item_tag:
+                items.append((element.get("objectid"), self._parseTransformation(element.get("transform"), scale)))
+                container.clear()
+            elif tag == model_tag:
+                scale = self._unit_scales.get(element.get("unit", "millimeter"), 1.0)
+
+        self._finishObject(objects, object_id, vertices, vertex_buffer, triangles, triangle_buffer)
+        return scale, objects, items
+
+    # Store the vertices and triangles that were collected for an object.
+    def _finishObject(self, objects, object_id, vertices, vertex_buffer, triangles, triangle_buffer):
+        if object_id is None:
+            return
+        vertices.extend(vertex_buffer)
+        triangles.extend(triangle_buffer)
+        if len(vertices) > 0:
+            objects[object_id] = (vertices.getArray(), triangles.getArray(), objects[object_id][2])
+
+    # Convert a transformation of the 3MF format to a matrix.
+    #
+    # The matrix is converted to the coordinates of the scene, which have Y
+    # pointing up, and to millimetres.
+    #
+    # \param scale The size of the unit of the model in millimetres.
+    # \return The matrix, or None if there is no transformation.
+    def _parseTransformation(self, transformation_string, scale):
+        if not transformation_string:
+            return None
+
+        values = numpy.array(transformation_string.split(), dtype = numpy.float64)
+        if len(values) != 12:
+            raise ValueError("A transformation must have 12 numbers, not {0}.".format(len(values)))
+        values = values.reshape(4, 3)
+        data = numpy.identity(4)
+        data[:3, :3] = values[:3].transpose()
+        data[:3, 3] = values[3] * scale
+        return Matrix(self._to_scene.dot(data).dot(self._to_scene.transpose()))
+
+    # Create the mesh data of an object.
+    def _createMeshData(self, vertices, indices, file_name, scale):
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= len(vertices)):
+            raise ValueError("A triangle refers to a vertex that does not exist.")
+
+        vertices = vertices[:, [0, 2, 1]]
+        vertices[:, 2] *= -1
+        if scale != 1.0:
+            vertices *= scale
+        return MeshData(vertices = vertices, normals = self._calculateNormals(vertices, indices), indices = indices, file_name = file_name)
+
+    # Calculate the normal of each vertex as the average normal of the triangles around it, weighted by their area.
+    def _calculateNormals(self, vertices, indices):
+        first_corners = vertices[indices[:, 0]]
+        face_normals = numpy.cross(vertices[indices[:, 1]] - first_corners, vertices[indices[:, 2]] - first_corners)
+        del first_corners
+
+        vertex_indices = indices.ravel()
+        normals = numpy.empty(vertices.shape, dtype = numpy.float32)
+        for axis in range(3):
+            normals[:, axis] = numpy.bincount(vertex_indices, weights = numpy.repeat(face_normals[:, axis], 3), minlength = len(vertices))
+        normals /= numpy.maximum(numpy.linalg.norm(normals, axis = 1), 1e-12)[:, numpy.newaxis]
+        return normals
+
+    # Create the scene node of an object, along with the nodes of its components.
+    #
+    # \param visiting The IDs of the objects of which the nodes are being
+    # created, to detect objects that contain themselves.
+    def _createNode(self, object_id, transformation, objects, meshes, visiting):
+        if object_id in visiting:
+            raise ValueError("Object {0} contains itself.".format(object_id))
+        _, _, components = objects[object_id]
+
+        node = SceneNode()
+        if object_id in meshes:
+            node.setMeshData(meshes[object_id])
+        if components:
+            visiting.add(object_id)
+            for component_id, component_transformation in components:
+                self._createNode(component_id, component_transformation, objects, meshes, visiting).setParent(node)
+            visiting.remove(object_id)
+            if object_id not in meshes:
+                node.addDecorator(GroupDecorator())
+        if transformation is not None:
+            node.setTransformation(transformation)
+        return node
+
+
+##  An array of rows that grows as rows are added to it.
+#
+#   The capacity of the array doubles whenever it is full, so that adding rows
+#   takes amortised constant time and the array is copied only a few times.
+class _GrowingArray:
+    def __init__(self, dtype, columns = 3, capacity = 4096):
+        self._data = numpy.empty((capacity, columns), dtype = dtype)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    ##  Add rows to the end of the array.
+    #
+    #   \param values A flat list of the values of the rows.
+    def extend(self, values):
+        if not values:
+            return
+
+        rows = numpy.array(values, dtype = self._data.dtype).reshape(-1, self._data.shape[1])
+        end = self._count + len(rows)
+        if end > len(self._data):
+            data = numpy.empty((max(end, 2 * len(self._data)), self._data.shape[1]), dtype = self._data.dtype)
+            data[:self._count] = self._data[:self._count]
+            self._data = data
+        self._data[self._count:end] = rows
+        self._count = end
+
+    ##  Get the rows that were added, without the unused capacity.
+    def getArray(self):
+        return self._data[:self._count].copy()
@@ -0,0 +1,27 @@
+# Copyright (c) 2015 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+from . import ThreeMFReader
+
+from UM.i18n import i18nCatalog
+i18n_catalog = i18nCatalog("uranium")
+
+def getMetaData():
+    return {
+        "plugin": {
+            "name": i18n_catalog.i18nc("@label", "3MF Reader"),
+            "author": "Ultimaker",
+            "version": "1.0",
+            "description": i18n_catalog.i18nc("@info:whatsthis", "Provides support for reading 3MF files."),
+            "api": 3
+        },
+        "mesh_reader": [
+            {
+                "extension": "3mf",
+                "description": i18n_catalog.i18nc("@item:inlistbox", "3MF File")
+            }
+        ]
+    }
+
+def register(app):
+    return { "mesh_reader": ThreeMFReader.ThreeMFReader() }
@@ -2,16 +2,23 @@
 # Uranium is released under the terms of the AGPLv3 or higher.
 
 from UM.Mesh.MeshWriter import MeshWriter
+from UM.Mesh.MeshData import weldVertices
 from UM.Scene.SceneNode import SceneNode
 from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
 from UM.Logger import Logger
-from UM.Math.Matrix import Matrix
 
-import xml.etree.ElementTree as ET
-import zipfile
 import io
+import numpy
+import sys
+import zipfile
 
 
+##  Writes the meshes of a scene to a 3MF file.
+#
+#   The model is written as XML text straight into its entry of the archive,
+#   many vertices or triangles at a time, so the memory use does not depend on
+#   the size of the model. Vertices that are shared by several triangles are
+#   written once.
 class ThreeMFWriter(MeshWriter):
     def __init__(self):
         super().__init__()
@@ -19,21 +26,41 @@ class ThreeMFWriter(MeshWriter):
             "3mf": "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
         }
 
+    ##  Whether the model can be written straight into the archive.
+    #
+    #   ZipFile.open() can only write entries since Python 3.6. Before that,
+    #   the model is written to memory first.
+    _can_stream = sys.version_info >= (3, 6)
+
+    ##  The number of vertices or triangles to format at once.
+    _chunk_size = 8192
+
+    ##  The format of a vertex, for three floats.
+    #
+    #   Nine significant digits write every single precision float exactly.
+    _vertex_format = "<vertex x=\"%.9g\" y=\"%.9g\" z=\"%.9g\" />\n"
+
+    ##  The format of a triangle, for three vertex indices.
+    _triangle_format = "<triangle v1=\"%d\" v2=\"%d\" v3=\"%d\" />\n"
+
+    ##  The rotation from the coordinates of the scene, with Y pointing up, to
+    #   those of 3MF, with Z pointing up. Like STL, the scene (x, y, z) is
+    #   written as (x, -z, y).
+    _to_file = numpy.array([[1, 0, 0, 0], [0, 0, -1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], numpy.float64)
+
+    ##  Convert a transformation to the 3MF format.
+    #
+    #   The transformation is converted to the coordinates of the vertices in
+    #   the file, which have Z pointing up.
+    #
+    #   \param matrix The transformation matrix of a node.
+    #   \return The 12 numbers of the transformation as a string, or None if
+    #   the transformation does nothing.
     def _convertMatrixToString(self, matrix):
-        result = ""
-        result += str(matrix._data[0,0]) + " "
-        result += str(matrix._data[1,0]) + " "
-        result += str(matrix._data[2,0]) + " "
-        result += str(matrix._data[0,1]) + " "
-        result += str(matrix._data[1,1]) + " "
-        result += str(matrix._data[2,1]) + " "
-        result += str(matrix._data[0,2]) + " "
-        result += str(matrix._data[1,2]) + " "
-        result += str(matrix._data[2,2]) + " "
-        result += str(matrix._data[0,3]) + " "
-        result += str(matrix._data[1,3]) + " "
-        result += str(matrix._data[2,3]) + " "
-        return result
+        data = self._to_file.dot(matrix.getData()).dot(self._to_file.transpose())[:3]
+        if numpy.array_equal(data, numpy.identity(4)[:3]):
+            return None
+        return " ".join(str(float(value)) for value in data.transpose().ravel())
 
     def write(self, stream, node, mode = MeshWriter.OutputMode.BinaryMode):
         nodes = []
@@ -47,46 +74,77 @@ class ThreeMFWriter(MeshWriter):
 
         archive = zipfile.ZipFile(stream, "w", compression = zipfile.ZIP_DEFLATED)
         try:
-            model_file = zipfile.ZipInfo("3D/3dmodel.model")
-            content_types_file = zipfile.ZipInfo("[Content_Types].xml")
-            model = ET.Element('model', unit = "millimeter", xmlns = self._namespaces["3mf"])
-            resources = ET.SubElement(model, "resources")
-            build = ET.SubElement(model, "build")
-            for index, n in enumerate(nodes):
-                object = ET.SubElement(resources, "object", id = str(index+1), type = "model")
-                mesh = ET.SubElement(object, "mesh")
-
-                mesh_data = n.getMeshData()
-                vertices = ET.SubElement(mesh, "vertices")
-                verts = mesh_data.getVertices()
-                if mesh_data.hasIndices():
-                    for face in mesh_data.getIndices():
-                        v1 = verts[face[0]]
-                        v2 = verts[face[1]]
-                        v3 = verts[face[2]]
-                        xml_vertex1 = ET.SubElement(vertices, "vertex", x = str(v1[0]), y = str(v1[2]), z = str(v1[1]))
-                        xml_vertex2 = ET.SubElement(vertices, "vertex", x = str(v2[0]), y = str(v2[2]), z = str(v2[1]))
-                        xml_vertex3 = ET.SubElement(vertices, "vertex", x = str(v3[0]), y = str(v3[2]), z = str(v3[1]))
-
-                    triangles = ET.SubElement(mesh, "triangles")
-                    for face in mesh_data.getIndices():
-                        triangle = ET.SubElement(triangles, "triangle", v1 = str(face[0]) , v2 = str(face[1]), v3 = str(face[2]))
-                else:
-                    for vert in verts:
-                        xml_vertex = ET.SubElement(vertices, "vertex", x = str(vert[0]), y = str(vert[0]), z = str(vert[0]))
-
-                transformation_string = self._convertMatrixToString(node.getWorldTransformation())
-                if transformation_string != self._convertMatrixToString(Matrix()):
-                    item = ET.SubElement(build, "item", objectid = str(index+1), transform = transformation_string)
-                else:
-                    item = ET.SubElement(build, "item", objectid = str(index+1)) #, transform = transformation_string)
-
-            archive.writestr(model_file, b'<?xml version="1.0" encoding="UTF-8"?> \n' + ET.tostring(model))
-            archive.writestr(content_types_file, "")
+            if self._can_stream:
+                # The size of the entry must be known beforehand if it may not fit in a normal zip file.
+                expected_size = sum(self._getMaximumMeshSize(n.getMeshData()) for n in nodes)
+                with archive.open("3D/3dmodel.model", "w", force_zip64 = expected_size > zipfile.ZIP64_LIMIT) as model_file:
+                    self._writeModel(model_file, nodes)
+            else:
+                model_file = io.BytesIO()
+                self._writeModel(model_file, nodes)
+                archive.writestr("3D/3dmodel.model", model_file.getvalue())
+            archive.writestr(zipfile.ZipInfo("[Content_Types].xml"), "")
         except Exception as e:
-            print("Error writing zip file", e)
+            Logger.log("e", "Error writing zip file: %s", str(e))
             return False
         finally:
             archive.close()
 
-        return True
\ No newline at end of file
+        return True
+
+    ##  Write the model file of the archive.
+    #
+    #   \param model_file The binary stream to write the model to.
+    #   \param nodes The scene nodes with the meshes to write.
+    def _writeModel(self, model_file, nodes):
+        model_file.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<model unit=\"millimeter\" xmlns=\"{0}\">\n<resources>\n".format(self._namespaces["3mf"]).encode())
+
+        items = []
+        for index, n in enumerate(nodes):
+            model_file.write("<object id=\"{0}\" type=\"model\">\n<mesh>\n".format(index + 1).encode())
+            self._writeMesh(model_file, n.getMeshData())
+            model_file.write(b"</mesh>\n</object>\n")
+
+            transformation_string = self._convertMatrixToString(n.getWorldTransformation())
+            if transformation_string is not None:
+                items.append("<item objectid=\"{0}\" transform=\"{1}\" />\n".format(index + 1, transformation_string))
+            else:
+                items.append("<item objectid=\"{0}\" />\n".format(index + 1))
+
+        model_file.write("</resources>\n<build>\n{0}</build>\n</model>\n".format("".join(items)).encode())
+
+    ##  Get an upper bound of the length of the text of a mesh.
+    #
+    #   \param mesh_data The mesh to write.
+    #   \return The maximum number of bytes that _writeMesh writes for it.
+    def _getMaximumMeshSize(self, mesh_data):
+        vertex_count = mesh_data.getVertexCount()
+        face_count = mesh_data.getFaceCount() if mesh_data.hasIndices() else vertex_count // 3
+        # Each vertex is at most three numbers of 15 characters, and each index at most 20 digits.
+        vertex_size = len(self._vertex_format % (0, 0, 0)) - 3 + 3 * 15
+        triangle_size = len(self._triangle_format % (0, 0, 0)) - 3 + 3 * 20
+        return vertex_count * vertex_size + face_count * triangle_size + 100
+
+    ##  Write the vertices and triangles of a mesh to the model file.
+    #
+    #   \param model_file The stream of the model file in the archive.
+    #   \param mesh_data The mesh to write, in its own coordinates.
+    def _writeMesh(self, model_file, mesh_data):
+        vertices = mesh_data.getVertices()
+        if mesh_data.hasIndices():
+            indices = mesh_data.getIndices()
+        else: # Every three vertices form a triangle.
+            indices = numpy.arange(len(vertices) // 3 * 3).reshape(-1, 3)
+        vertices, indices = weldVertices(vertices, indices)
+
+        model_file.write(b"<vertices>\n")
+        vertices = vertices[:, [0, 2, 1]]
+        vertices[:, 1] *= -1
+        for start in range(0, len(vertices), self._chunk_size):
+            chunk = vertices[start:start + self._chunk_size]
+            model_file.write(((self._vertex_format * len(chunk)) % tuple(chunk.ravel().tolist())).encode())
+        model_file.write(b"</vertices>\n<triangles>\n")
+        for start in range(0, len(indices), self._chunk_size):
+            chunk = indices[start:start + self._chunk_size]
+            model_file.write(((self._triangle_format * len(chunk)) % tuple(chunk.ravel().tolist())).encode())
+        model_file.write(b"</triangles>\n")
@@ -3,13 +3,29 @@
 # Uranium is released under the terms of the AGPLv3 or higher.
 
 from UM.Mesh.MeshWriter import MeshWriter
+from UM.Mesh.MeshData import transformVertices, weldVertices
 from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
 from UM.Scene.SceneNode import SceneNode
 
 import time
-import struct
 
+##  Writes the meshes of a scene to a Wavefront OBJ file.
+#
+#   Vertices that are shared by several faces are written once. The lines are
+#   formatted many at a time, so writing is not held up by a loop over the
+#   faces.
 class OBJWriter(MeshWriter):
+    ##  The number of vertices or faces to format at once.
+    _chunk_size = 8192
+
+    ##  The format of a vertex, for three floats.
+    #
+    #   Nine significant digits write every single precision float exactly.
+    _vertex_format = "v %.9g %.9g %.9g\n"
+
+    ##  The format of a face, for three vertex numbers.
+    _face_format = "f %d %d %d\n"
+
     def write(self, stream, node, mode = MeshWriter.OutputMode.TextMode):
         if mode != MeshWriter.OutputMode.TextMode:
             return False
@@ -26,27 +42,33 @@ class OBJWriter(MeshWriter):
 
         stream.write("# URANIUM OBJ EXPORT {0}\n".format(time.strftime("%a %d %b %Y %H:%M:%S")))
 
-        face_offset = 1
+        vertex_offset = 1 # Vertices are numbered from 1.
         for node in nodes:
-            mesh_data = node.getMeshData().getTransformed(node.getWorldTransformation())
+            mesh_data = node.getMeshData()
             if not mesh_data.hasIndices():
                 continue
 
-            stream.write("# {0}\n# Vertices\n".format(node.getName()))
+            vertices = transformVertices(mesh_data.getVertices(), node.getWorldTransformation())
+            vertices, indices = weldVertices(vertices, mesh_data.getIndices())
 
-            verts = mesh_data.getVertices()
-            for face in mesh_data.getIndices():
-                v1 = verts[face[0]]
-                v2 = verts[face[1]]
-                v3 = verts[face[2]]
-                stream.write("v {0} {1} {2}\n".format(v1[0], -v1[2], v1[1]))
-                stream.write("v {0} {1} {2}\n".format(v2[0], -v2[2], v2[1]))
-                stream.write("v {0} {1} {2}\n".format(v3[0], -v3[2], v3[1]))
+            stream.write("# {0}\n# Vertices\n".format(node.getName()))
+            vertices = vertices[:, [0, 2, 1]]
+            vertices[:, 1] *= -1
+            self._writeLines(stream, self._vertex_format, vertices)
 
             stream.write("# Faces\n")
-            for face in mesh_data.getIndices():
-                stream.write("f {0} {1} {2}\n".format(face[0] + face_offset, face[1] + face_offset, face[2] + face_offset))
+            self._writeLines(stream, self._face_format, indices + vertex_offset)
 
-            face_offset += mesh_data.getVertexCount()
+            vertex_offset += len(vertices)
 
         return True
+
+    ##  Write a line for each row of an array, a chunk of rows at a time.
+    #
+    #   \param stream The text stream to write to.
+    #   \param line_format The format of a line, for the values of one row.
+    #   \param rows The array of rows to write.
+    def _writeLines(self, stream, line_format, rows):
+        for start in range(0, len(rows), self._chunk_size):
+            chunk = rows[start:start + self._chunk_size]
+            stream.write((line_format * len(chunk)) % tuple(chunk.ravel().tolist()))
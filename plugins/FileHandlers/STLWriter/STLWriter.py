@@ -2,11 +2,13 @@
 # Copyright (c) 2013 David Braam
 # Uranium is released under the terms of the AGPLv3 or higher.
 
+from UM.Mesh.MeshData import transformVertices
 from UM.Mesh.MeshWriter import MeshWriter
 from UM.Scene.SceneNode import SceneNode
 from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
 from UM.Logger import Logger
 
+import numpy
 import time
 import struct
 import os
@@ -42,23 +44,15 @@ class STLWriter(MeshWriter):
         stream.write("solid {0}\n".format(name))
 
         for node in nodes:
-            mesh_data = node.getMeshData().getTransformed(node.getWorldTransformation())
-
-            if mesh_data.hasIndices():
-                verts = mesh_data.getVertices()
-                for face in mesh_data.getIndices():
-                    stream.write("facet normal 0.0 0.0 0.0\n")
-                    stream.write("  outer loop\n")
-
-                    v1 = verts[face[0]]
-                    v2 = verts[face[1]]
-                    v3 = verts[face[2]]
-                    stream.write("    vertex {0} {1} {2}\n".format(v1[0], -v1[2], v1[1]))
-                    stream.write("    vertex {0} {1} {2}\n".format(v2[0], -v2[2], v2[1]))
-                    stream.write("    vertex {0} {1} {2}\n".format(v3[0], -v3[2], v3[1]))
+            faces = self._getFaces(node)
+            if faces is None:
+                continue
 
-                    stream.write("  endloop\n")
-                    stream.write("endfacet\n")
+            # Format many facets with a single string operation, since formatting each value separately is slow.
+            normals = self._getNormals(faces)
+            for start in range(0, len(faces), self._ascii_chunk_size):
+                data = numpy.concatenate((normals[start:start + self._ascii_chunk_size], faces[start:start + self._ascii_chunk_size].reshape(-1, 9)), axis = 1)
+                stream.write((self._ascii_facet * len(data)) % tuple(data.ravel().tolist()))
 
         stream.write("endsolid {0}\n".format(name))
 
@@ -72,16 +66,48 @@ class STLWriter(MeshWriter):
         stream.write(struct.pack("<I", int(face_count))) #Write number of faces to STL
 
         for node in nodes:
-            mesh_data = node.getMeshData().getTransformed(node.getWorldTransformation())
-
-            if mesh_data.hasIndices():
-                verts = mesh_data.getVertices()
-                for face in mesh_data.getIndices():
-                    v1 = verts[face[0]]
-                    v2 = verts[face[1]]
-                    v3 = verts[face[2]]
-                    stream.write(struct.pack("<fff", 0.0, 0.0, 0.0))
-                    stream.write(struct.pack("<fff", v1[0], -v1[2], v1[1]))
-                    stream.write(struct.pack("<fff", v2[0], -v2[2], v2[1]))
-                    stream.write(struct.pack("<fff", v3[0], -v3[2], v3[1]))
-                    stream.write(struct.pack("<H", 0))
+            faces = self._getFaces(node)
+            if faces is None:
+                continue
+
+            records = numpy.zeros(len(faces), dtype = self._binary_facet)
+            records["normal"] = self._getNormals(faces)
+            records["vertices"] = faces
+            stream.write(records.tobytes())
+
+    ##  The format of a facet in an ASCII STL file, for three floats of the
+    #   normal and nine floats of the vertices.
+    #
+    #   Nine significant digits write every single precision float exactly.
+    _ascii_facet = "facet normal %.9g %.9g %.9g\n  outer loop\n" + "    vertex %.9g %.9g %.9g\n" * 3 + "  endloop\nendfacet\n"
+
+    ##  The number of facets to format at once when writing an ASCII file.
+    _ascii_chunk_size = 4096
+
+    ##  The layout of a 50-byte facet in a binary STL file.
+    _binary_facet = numpy.dtype([("normal", "<f4", (3, )), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+    ##  Get the faces of the mesh of a node, in the coordinates of the STL file.
+    #
+    #   \param node The scene node to get the faces of.
+    #   \return An array of three vertices for each face, or None if the mesh
+    #   has no indices.
+    def _getFaces(self, node):
+        mesh_data = node.getMeshData()
+        if not mesh_data.hasIndices():
+            return None
+
+        vertices = transformVertices(mesh_data.getVertices(), node.getWorldTransformation())
+        vertices = numpy.stack((vertices[:, 0], -vertices[:, 2], vertices[:, 1]), axis = 1).astype(numpy.float32) # STL has Z pointing up.
+        return vertices[mesh_data.getIndices()]
+
+    ##  Compute the unit normals of faces from the order of their vertices.
+    #
+    #   \param faces An array of three vertices for each face.
+    #   \return An array with the normal of each face. Faces without area get
+    #   a zero normal.
+    def _getNormals(self, faces):
+        normals = numpy.cross(faces[:, 1] - faces[:, 0], faces[:, 2] - faces[:, 0])
+        lengths = numpy.linalg.norm(normals, axis = 1)
+        lengths[lengths == 0] = 1
+        return normals / lengths[:, numpy.newaxis]
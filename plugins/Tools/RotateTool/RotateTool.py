@@ -201,18 +201,11 @@ class RotateTool(Tool):
         self._progress_message = Message("Laying object flat on buildplate...", lifetime = 0, dismissable = False)
         self._progress_message.setProgress(0)
 
-        self._iterations = 0
-        self._total_iterations = 0
-        for selected_object in Selection.getAllSelectedObjects():
-            if not selected_object.callDecoration("isGroup"):
-                self._total_iterations += len(selected_object.getMeshDataTransformed().getVertices()) * 2
-            else:
-                for child in selected_object.getChildren():
-                    self._total_iterations += len(child.getMeshDataTransformed().getVertices()) * 2
-
         self._progress_message.show()
 
         operations = Selection.applyOperation(LayFlatOperation)
+        self._iterations = 0
+        self._total_iterations = len(operations) #Each operation reports one iteration when it is done.
         for op in operations:
             op.progress.connect(self._layFlatProgress)
 
@@ -222,8 +215,7 @@ class RotateTool(Tool):
 
     ##  Called while performing the LayFlatOperation so progress can be shown
     #
-    #   Note that the LayFlatOperation rate-limits these callbacks to prevent the UI from being flooded with property change notifications,
-    #   \param iterations type(int) number of iterations performed since the last callback
+    #   \param iterations type(int) number of operations finished since the last callback
     def _layFlatProgress(self, iterations):
         self._iterations += iterations
         self._progress_message.setProgress(100 * self._iterations / self._total_iterations)
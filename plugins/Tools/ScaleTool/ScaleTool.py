@@ -259,7 +259,7 @@ class ScaleTool(Tool):
         if obj:
             width = float(width)
             obj_width = obj.getBoundingBox().width
-            if not Float.fuzzyCompare(obj_width, width, DIMENSION_TOLERANCE):
+            if obj_width != 0 and not Float.fuzzyCompare(obj_width, width, DIMENSION_TOLERANCE): #A flat object can't be scaled to a width.
                 scale_factor = width / obj_width
                 if self._non_uniform_scale:
                     scale_vector = Vector(scale_factor, 1, 1)
@@ -275,7 +275,7 @@ class ScaleTool(Tool):
         if obj:
             height = float(height)
             obj_height = obj.getBoundingBox().height
-            if not Float.fuzzyCompare(obj_height, height, DIMENSION_TOLERANCE):
+            if obj_height != 0 and not Float.fuzzyCompare(obj_height, height, DIMENSION_TOLERANCE): #A flat object can't be scaled to a height.
                 scale_factor = height / obj_height
                 if self._non_uniform_scale:
                     scale_vector = Vector(1, scale_factor, 1)
@@ -291,7 +291,7 @@ class ScaleTool(Tool):
         if obj:
             depth = float(depth)
             obj_depth = obj.getBoundingBox().depth
-            if not Float.fuzzyCompare(obj_depth, depth, DIMENSION_TOLERANCE):
+            if obj_depth != 0 and not Float.fuzzyCompare(obj_depth, depth, DIMENSION_TOLERANCE): #A flat object can't be scaled to a depth.
                 scale_factor = depth / obj_depth
                 if self._non_uniform_scale:
                     scale_vector = Vector(1, 1, scale_factor)
@@ -306,7 +306,7 @@ class ScaleTool(Tool):
         obj = Selection.getSelectedObject(0)
         if obj:
             obj_scale = self._getScaleInWorldCoordinates(obj)
-            if round(float(obj_scale.x), 4) != scale:
+            if obj_scale.x != 0 and round(float(obj_scale.x), 4) != scale:
                 scale_factor = abs(scale / obj_scale.x)
                 if self._non_uniform_scale:
                     scale_vector = Vector(scale_factor, 1, 1)
@@ -321,7 +321,7 @@ class ScaleTool(Tool):
         obj = Selection.getSelectedObject(0)
         if obj:
             obj_scale = self._getScaleInWorldCoordinates(obj)
-            if round(float(obj_scale.y), 4) != scale:
+            if obj_scale.y != 0 and round(float(obj_scale.y), 4) != scale:
                 scale_factor = abs(scale / obj_scale.y)
                 if self._non_uniform_scale:
                     scale_vector = Vector(1, scale_factor, 1)
@@ -336,7 +336,7 @@ class ScaleTool(Tool):
         obj = Selection.getSelectedObject(0)
         if obj:
             obj_scale = self._getScaleInWorldCoordinates(obj)
-            if round(float(obj_scale.z), 4) != scale:
+            if obj_scale.z != 0 and round(float(obj_scale.z), 4) != scale:
                 scale_factor = abs(scale / obj_scale.z)
                 if self._non_uniform_scale:
                     scale_vector = Vector(1, 1, scale_factor)
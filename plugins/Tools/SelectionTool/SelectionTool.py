@@ -6,10 +6,13 @@ from UM.Tool import Tool
 from UM.Application import Application
 from UM.Scene.Selection import Selection
 from UM.Scene.Iterator.BreadthFirstIterator import BreadthFirstIterator
+from UM.Math.AxisAlignedBox import AxisAlignedBox
 
 from PyQt5.QtGui import qAlpha, qRed, qGreen, qBlue
 from PyQt5 import QtCore, QtWidgets
 
+import numpy
+
 ##  Provides the tool to select meshes and groups
 #
 #   Note that the tool has two implementations for different modes of selection:
@@ -73,21 +76,10 @@ class SelectionTool(Tool):
     #
     #   \param event type(Event) passed from self.event()
     def _boundingBoxSelection(self, event):
-        root = self._scene.getRoot()
-
         ray = self._scene.getActiveCamera().getRay(event.x, event.y)
+        node = self._findNodeOnRay(self._scene.getRoot(), ray)
 
-        intersections = []
-        for node in BreadthFirstIterator(root):
-            if node.isEnabled() and not node.isLocked():
-                intersection = node.getBoundingBox().intersectsRay(ray)
-                if intersection:
-                    intersections.append((node, intersection[0], intersection[1]))
-
-        if intersections:
-            intersections.sort(key=lambda k: k[1])
-
-            node = intersections[0][0]
+        if node:
             if not Selection.isSelected(node):
                 if not self._shift_is_active:
                     Selection.clear()
@@ -95,6 +87,34 @@ class SelectionTool(Tool):
         else:
             Selection.clear()
 
+    ##  Find the selectable node of which the bounding box is hit first by a ray.
+    #
+    #   \param root type(SceneNode) The root of the scene to search.
+    #   \param ray type(Ray) The ray to intersect the bounding boxes with.
+    #   \return type(SceneNode) The node that was hit, or None if no node was hit.
+    def _findNodeOnRay(self, root, ray):
+        nodes = []
+        bounds = []
+        for node in BreadthFirstIterator(root):
+            # The bounding box of the root encloses all other nodes, so it would always be hit first.
+            if node is root or not node.isSelectable():
+                continue
+
+            bounding_box = node.getBoundingBox()
+            if bounding_box:
+                nodes.append(node)
+                bounds.append(bounding_box.getBounds())
+
+        if not nodes:
+            return None
+
+        # Intersect the ray with the bounding boxes of all nodes at once.
+        hits, distances, _ = AxisAlignedBox.intersectRays(ray.origin.getData(), ray.direction.getData(), numpy.array(bounds))
+        hits = numpy.flatnonzero(hits)
+        if not len(hits):
+            return None
+        return nodes[hits[numpy.argmin(distances[hits])]]
+
     ##  Handle mouse and keyboard events for pixel selection
     #
     #   \param event type(Event) passed from self.event()
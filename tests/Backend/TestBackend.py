@@ -0,0 +1,42 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+
+pytest.importorskip("Arcus")
+
+from UM.Backend.Backend import Backend
+
+##  A backend without socket or engine process, which is all that converting data needs.
+@pytest.fixture()
+def backend():
+    return Backend.__new__(Backend)
+
+def test_convertBytesToVerticeList(backend):
+    vertices = numpy.arange(12, dtype = numpy.float32).reshape(4, 3)
+
+    result = backend.convertBytesToVerticeList(vertices.tobytes())
+    assert result.shape == (4, 3)
+    numpy.testing.assert_array_equal(result, vertices)
+    assert not result.flags.writeable
+
+def test_convertBytesToVerticeWithNormalsList(backend):
+    data = numpy.arange(24, dtype = numpy.float32).reshape(4, 6)
+
+    positions, normals = backend.convertBytesToVerticeWithNormalsList(bytearray(data.tobytes()))
+    assert positions.shape == (4, 3)
+    assert normals.shape == (4, 3)
+    numpy.testing.assert_array_equal(positions, data[:, :3])
+    numpy.testing.assert_array_equal(normals, data[:, 3:])
+    # Read-only even though a bytearray can be changed, so MeshData does not need to copy them.
+    assert not positions.flags.writeable
+    assert not normals.flags.writeable
+
+@pytest.mark.parametrize("data", [None, b"\x00" * 7, b"\x00" * 16])
+def test_convertBytesIncorrectLength(backend, data):
+    assert backend.convertBytesToVerticeList(data) is None
+    assert backend.convertBytesToVerticeWithNormalsList(data) is None
+
+def test_convertBytesEmpty(backend):
+    assert backend.convertBytesToVerticeList(b"").shape == (0, 3)
@@ -0,0 +1,67 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import os
+import threading
+
+from UM.Backend.BackendLog import BackendLog
+
+def test_maxLines():
+    log = BackendLog(max_lines = 3)
+    for index in range(5):
+        log.append(bytes("line {0}\n".format(index), "utf-8"))
+
+    assert log.getLines() == [b"line 2\n", b"line 3\n", b"line 4\n"]
+    assert log.getLineCount() == 3
+    assert log.getByteCount() == 21
+
+def test_maxBytes():
+    log = BackendLog(max_bytes = 10)
+    log.append(b"1234\n")
+    log.append(b"5678\n")
+    log.append(b"9\n")
+    assert log.getLines() == [b"5678\n", b"9\n"]
+
+    log.append(b"a line that is too long\n")
+    assert log.getLines() == [b"a line tha"]
+    assert log.getByteCount() == 10
+
+def test_clear():
+    log = BackendLog()
+    log.append(b"line\n")
+    log.clear()
+
+    assert log.getLines() == []
+    assert log.getByteCount() == 0
+
+def test_spill(tmpdir):
+    file_name = os.path.join(str(tmpdir), "backend.log")
+    log = BackendLog(max_lines = 2, spill_file_name = file_name, spill_file_size = 20, spill_file_count = 2)
+    for index in range(10):
+        log.append(bytes("line {0}\n".format(index), "utf-8"))
+    log.close()
+
+    # Each file is rotated once it holds 3 lines, and only two rotated files are kept.
+    assert log.getLines() == [b"line 8\n", b"line 9\n"]
+    with open(file_name, "rb") as f:
+        assert f.read() == b"line 6\nline 7\n"
+    with open(file_name + ".1", "rb") as f:
+        assert f.read() == b"line 3\nline 4\nline 5\n"
+    with open(file_name + ".2", "rb") as f:
+        assert f.read() == b"line 0\nline 1\nline 2\n"
+    assert not os.path.exists(file_name + ".3")
+
+def test_lineAdded():
+    log = BackendLog(max_lines = 1)
+    received = []
+    def onLineAdded(line):
+        received.append((line, threading.current_thread()))
+    log.lineAdded.connect(onLineAdded)
+
+    log.append(b"first\n")
+    thread = threading.Thread(target = log.append, args = (b"second\n", ))
+    thread.start()
+    thread.join()
+
+    # Lines are delivered right away, on the thread that added them.
+    assert received == [(b"first\n", threading.current_thread()), (b"second\n", thread)]
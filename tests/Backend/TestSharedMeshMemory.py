@@ -0,0 +1,112 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy
+import pytest
+
+import UM
+from UM.Backend.SharedMeshMemory import SharedMeshMemory, attachSharedArray
+from UM.Mesh.MeshData import MeshData
+
+pytestmark = pytest.mark.skipif(not SharedMeshMemory.isAvailable(), reason = "Shared memory is not supported.")
+
+##  A stand-in for a backend on the same machine.
+#
+#   It reads the handles of a mesh from its input, maps the segments, and
+#   answers with the bounding box of the mesh and the handle of a segment
+#   that it creates with the centres of the faces, as layer data would be.
+_engine_script = """
+import json, sys
+import numpy
+from multiprocessing import resource_tracker, shared_memory
+from UM.Backend.SharedMeshMemory import attachSharedArray
+
+handles = json.load(sys.stdin)
+vertices, vertex_segment = attachSharedArray(handles["vertices"])
+indices, index_segment = attachSharedArray(handles["indices"])
+centres = vertices[indices].mean(axis = 1).astype(numpy.float32)
+
+result = shared_memory.SharedMemory(create = True, size = centres.nbytes)
+resource_tracker.unregister(result._name, "shared_memory") # The frontend owns it now.
+numpy.ndarray(centres.shape, dtype = centres.dtype, buffer = result.buf)[...] = centres
+json.dump({
+    "minimum": vertices.min(axis = 0).tolist(),
+    "maximum": vertices.max(axis = 0).tolist(),
+    "face_count": len(indices),
+    "centres": {"name": result.name, "dtype": centres.dtype.str, "shape": list(centres.shape)}
+}, sys.stdout)
+"""
+
+def runEngine(handles):
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(UM.__file__)))
+    process = subprocess.run([sys.executable, "-c", _engine_script], input = json.dumps(handles), stdout = subprocess.PIPE, universal_newlines = True, env = environment, check = True)
+    return json.loads(process.stdout)
+
+# The segments of the tests belong to this process already.
+def attachOwnSegment(handle):
+    return attachSharedArray(handle, take_ownership = True)
+
+def isSegmentAlive(handle):
+    try:
+        array, segment = attachOwnSegment(handle)
+    except FileNotFoundError:
+        return False
+    del array
+    segment.close()
+    return True
+
+def test_shareArray():
+    memory = SharedMeshMemory()
+    array = numpy.arange(12, dtype = numpy.int32).reshape(4, 3)
+    handle = memory.shareArray(1, array)
+
+    shared, segment = attachOwnSegment(handle)
+    numpy.testing.assert_array_equal(shared, array)
+    assert shared.dtype == numpy.int32
+    del shared
+    segment.close()
+
+    memory.releaseRequest(1)
+    assert not isSegmentAlive(handle)
+    assert memory.getRequestIds() == []
+
+def test_releaseRequest():
+    memory = SharedMeshMemory()
+    first = memory.shareArray(1, numpy.zeros((2, 3), numpy.float32))
+    second = memory.shareArray(2, numpy.zeros((0, 3), numpy.float32))
+    assert sorted(memory.getRequestIds()) == [1, 2]
+
+    memory.releaseRequest(1)
+    assert not isSegmentAlive(first)
+    assert isSegmentAlive(second)
+
+    memory.releaseAll()
+    assert not isSegmentAlive(second)
+
+def test_engine():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (1000, 3)).astype(numpy.float32)
+    indices = numpy.random.RandomState(38).randint(0, 1000, (2000, 3)).astype(numpy.int32)
+    memory = SharedMeshMemory()
+    handles = memory.shareMeshData(7, MeshData(vertices = vertices, indices = indices))
+    assert handles["vertex_count"] == 1000
+    assert handles["face_count"] == 2000
+
+    result = runEngine(handles)
+    numpy.testing.assert_allclose(result["minimum"], vertices.min(axis = 0))
+    numpy.testing.assert_allclose(result["maximum"], vertices.max(axis = 0))
+    assert result["face_count"] == 2000
+
+    # The segment that the engine created is released along with the request.
+    centres = memory.attachArray(7, result["centres"])
+    numpy.testing.assert_allclose(centres, vertices[indices].mean(axis = 1), rtol = 1e-5)
+    del centres
+    memory.releaseRequest(7)
+    assert not isSegmentAlive(handles["vertices"])
+    assert not isSegmentAlive(handles["indices"])
+    assert not isSegmentAlive(result["centres"])
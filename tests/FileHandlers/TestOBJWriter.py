@@ -0,0 +1,70 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import io
+
+import numpy
+
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData
+from UM.Mesh.MeshWriter import MeshWriter
+from UM.Scene.SceneNode import SceneNode
+
+##  A scene with two nodes: a square of two triangles that repeat their shared
+#   corners, and a translated single triangle.
+def createScene():
+    root = SceneNode()
+
+    square = SceneNode(root)
+    square.setName("square")
+    corners = numpy.array([[0, 0, 0], [10, 0, 0], [10, 0, 10], [0, 0, 10]], numpy.float32)
+    square.setMeshData(MeshData(vertices = corners[[0, 2, 1, 0, 3, 2]], indices = numpy.array([[0, 1, 2], [3, 4, 5]], numpy.int32)))
+
+    triangle = SceneNode(root)
+    triangle.setName("triangle")
+    triangle.setMeshData(MeshData(vertices = numpy.array([[0, 0, 0], [1, 2, 3], [4, 5, 6]], numpy.float32), indices = numpy.array([[0, 1, 2]], numpy.int32)))
+    triangle.translate(Vector(100, 0, 0))
+    return root
+
+##  Parse the vertices and faces of an OBJ file.
+#
+#   \return The vertices in the coordinates of the scene, and the faces as
+#   indices of the vertices counting from 0.
+def readModel(text):
+    lines = [line.split() for line in text.splitlines() if line and not line.startswith("#")]
+    vertices = numpy.array([line[1:] for line in lines if line[0] == "v"], numpy.float64)
+    faces = numpy.array([line[1:] for line in lines if line[0] == "f"], numpy.int64)
+    return vertices[:, [0, 2, 1]] * [1, 1, -1], faces - 1 # OBJ has Z pointing up, and numbers vertices from 1.
+
+def test_write(obj_writer):
+    stream = io.StringIO()
+    assert obj_writer.write(stream, createScene(), MeshWriter.OutputMode.TextMode)
+    text = stream.getvalue()
+    assert "# square\n" in text
+    assert "# triangle\n" in text
+
+    vertices, faces = readModel(text)
+    # The square has 4 distinct corners after welding, and the triangle 3.
+    assert len(vertices) == 4 + 3
+    assert len(faces) == 3
+    # The faces of the second node refer to the vertices after those of the first.
+    assert faces[:2].max() == 3
+    assert sorted(faces[2].tolist()) == [4, 5, 6]
+
+    square = vertices[faces[:2]]
+    numpy.testing.assert_array_equal(square, numpy.array([[[0, 0, 0], [10, 0, 10], [10, 0, 0]], [[0, 0, 0], [0, 0, 10], [10, 0, 10]]]))
+    numpy.testing.assert_array_equal(vertices[faces[2]], [[100, 0, 0], [101, 2, 3], [104, 5, 6]])
+
+def test_writeOrientation(obj_writer):
+    stream = io.StringIO()
+    assert obj_writer.write(stream, createScene(), MeshWriter.OutputMode.TextMode)
+
+    # The triangle (100, 0, 0), (101, 2, 3), (104, 5, 6) of the scene, with Z pointing up and rotated rather than mirrored.
+    lines = [line.split() for line in stream.getvalue().splitlines() if line.startswith("v ")]
+    assert [list(map(float, line[1:])) for line in lines[4:]] == [[100, 0, 0], [101, -3, 2], [104, -6, 5]]
+
+def test_writeUnsupportedMode(obj_writer):
+    assert not obj_writer.write(io.BytesIO(), createScene(), MeshWriter.OutputMode.BinaryMode)
+
+def test_writeEmptyScene(obj_writer):
+    assert not obj_writer.write(io.StringIO(), SceneNode(), MeshWriter.OutputMode.TextMode)
@@ -0,0 +1,60 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import io
+import struct
+
+import numpy
+
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData
+from UM.Mesh.MeshWriter import MeshWriter
+from UM.Scene.SceneNode import SceneNode
+
+##  A scene with a translated mesh of a square in the horizontal plane and a face without area.
+def createScene():
+    root = SceneNode()
+    node = SceneNode(root)
+    vertices = numpy.array([[0, 0, 0], [10, 0, 0], [10, 0, 10], [0, 0, 10]], numpy.float32)
+    node.setMeshData(MeshData(vertices = vertices, indices = numpy.array([[0, 2, 1], [0, 3, 2], [0, 1, 1]], numpy.int32)))
+    node.translate(Vector(1, 2, 3))
+    return root
+
+# The corners of the faces in the coordinates of STL, which have Z pointing up instead of Y.
+_expected_faces = numpy.array([
+    [[1, -3, 2], [11, -13, 2], [11, -3, 2]],
+    [[1, -3, 2], [1, -13, 2], [11, -13, 2]],
+    [[1, -3, 2], [11, -3, 2], [11, -3, 2]]
+], numpy.float32)
+
+# The faces turn clockwise seen from above in the scene, so counterclockwise seen from above in STL.
+_expected_normals = numpy.array([[0, 0, 1], [0, 0, 1], [0, 0, 0]], numpy.float32)
+
+def test_writeBinary(stl_writer):
+    stream = io.BytesIO()
+    assert stl_writer.write(stream, createScene(), MeshWriter.OutputMode.BinaryMode)
+
+    data = stream.getvalue()
+    assert len(data) == 80 + 4 + 50 * 3
+    assert struct.unpack("<I", data[80:84])[0] == 3
+    for index in range(3):
+        record = struct.unpack("<12fH", data[84 + 50 * index:84 + 50 * (index + 1)])
+        numpy.testing.assert_allclose(record[0:3], _expected_normals[index], atol = 1e-6)
+        # The vertices are written exactly as single precision floats.
+        assert record[3:12] == tuple(_expected_faces[index].ravel().tolist())
+        assert record[12] == 0
+
+def test_writeAscii(stl_writer):
+    stream = io.StringIO()
+    assert stl_writer.write(stream, createScene(), MeshWriter.OutputMode.TextMode)
+
+    lines = [line.split() for line in stream.getvalue().splitlines()]
+    assert lines[0][0] == "solid"
+    assert lines[-1][0] == "endsolid"
+    normals = numpy.array([line[2:] for line in lines if line[0] == "facet"], numpy.float32)
+    vertices = numpy.array([line[1:] for line in lines if line[0] == "vertex"], numpy.float32)
+    numpy.testing.assert_allclose(normals, _expected_normals, atol = 1e-6)
+    numpy.testing.assert_array_equal(vertices, _expected_faces.reshape(-1, 3))
+
+def test_writeUnsupportedMode(stl_writer):
+    assert not stl_writer.write(io.BytesIO(), createScene(), -1)
@@ -0,0 +1,136 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import os
+import zipfile
+
+import numpy
+import pytest
+
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData, transformVertices
+from UM.Scene.SceneNode import SceneNode
+
+_tetrahedron = """<object id="{0}" type="model"><mesh>
+<vertices><vertex x="0" y="0" z="0" /><vertex x="1" y="0" z="0" /><vertex x="0" y="1" z="0" /><vertex x="0" y="0" z="1" /></vertices>
+<triangles><triangle v1="0" v2="2" v3="1" /><triangle v1="0" v2="1" v3="3" /><triangle v1="0" v2="3" v3="2" /><triangle v1="1" v2="2" v3="{1}" /></triangles>
+</mesh></object>"""
+
+def writeModel(tmpdir, resources, build, unit = "millimeter"):
+    file_name = os.path.join(str(tmpdir), "model.3mf")
+    with zipfile.ZipFile(file_name, "w") as archive:
+        archive.writestr("3D/3dmodel.model", """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="{0}" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">
+<resources>{1}</resources><build>{2}</build></model>""".format(unit, resources, build))
+    return file_name
+
+def getWorldTriangles(node):
+    triangles = []
+    for descendant in [node] + node.getAllChildren():
+        mesh_data = descendant.getMeshData()
+        if mesh_data is None:
+            continue
+        vertices = transformVertices(mesh_data.getVertices(), descendant.getWorldTransformation())
+        indices = mesh_data.getIndices() if mesh_data.hasIndices() else numpy.arange(len(vertices)).reshape(-1, 3)
+        triangles.append(vertices[indices])
+    triangles = numpy.round(numpy.concatenate(triangles), 3).reshape(-1, 9)
+    return triangles[numpy.lexsort(triangles.transpose()[::-1])]
+
+def test_roundTrip(tmpdir, three_mf_reader, three_mf_writer):
+    root = SceneNode()
+    # A grid with more vertices than the reader collects at once.
+    size = 100
+    grid = numpy.stack(numpy.meshgrid(numpy.arange(size), numpy.arange(size), indexing = "ij"), axis = -1).reshape(-1, 2)
+    vertices = numpy.stack((grid[:, 0], numpy.sin(grid[:, 0] * 0.3) + grid[:, 1] * 0.01, grid[:, 1]), axis = 1).astype(numpy.float32)
+    corners = (numpy.arange(size - 1)[:, numpy.newaxis] * size + numpy.arange(size - 1)).ravel()
+    indices = numpy.concatenate((numpy.stack((corners, corners + 1, corners + size), axis = 1), numpy.stack((corners + 1, corners + size + 1, corners + size), axis = 1))).astype(numpy.int32)
+    assert len(vertices) > three_mf_reader._chunk_size
+    for offset in (-60, 60):
+        node = SceneNode(root)
+        node.setMeshData(MeshData(vertices = vertices, indices = indices))
+        node.translate(Vector(offset, 1, 2))
+
+    file_name = os.path.join(str(tmpdir), "round_trip.3mf")
+    with open(file_name, "wb") as stream:
+        assert three_mf_writer.write(stream, root)
+    result = three_mf_reader.read(file_name)
+
+    assert result.callDecoration("isGroup")
+    assert len(result.getChildren()) == 2
+    assert len(result.getChildren()[0].getMeshData().getVertices()) == len(vertices)
+    numpy.testing.assert_allclose(getWorldTriangles(result), getWorldTriangles(root))
+
+def test_transformation(tmpdir, three_mf_reader):
+    file_name = writeModel(tmpdir, _tetrahedron.format(1, 3), """<item objectid="1" transform="1 0 0 0 1 0 0 0 1 10 20 30" />""")
+    node = three_mf_reader.read(file_name)
+
+    # The file has Z pointing up, the scene has Y pointing up.
+    assert node.getWorldPosition() == Vector(10, 30, -20)
+    vertices = node.getMeshData().getVertices()
+    numpy.testing.assert_array_equal(vertices, [[0, 0, 0], [1, 0, 0], [0, 0, -1], [0, 1, 0]])
+    normals = node.getMeshData().getNormals()
+    numpy.testing.assert_allclose(numpy.linalg.norm(normals, axis = 1), 1, rtol = 1e-6)
+
+##  Tests reading a model written by another program, with Z pointing up and
+#   the corners of the triangles counterclockwise seen from the outside.
+def test_orientation(tmpdir, three_mf_reader):
+    # The tetrahedron is turned by a quarter around the Z axis of the file.
+    file_name = writeModel(tmpdir, _tetrahedron.format(1, 3), """<item objectid="1" transform="0 1 0 -1 0 0 0 0 1 10 20 30" />""")
+    node = three_mf_reader.read(file_name)
+
+    vertices = transformVertices(node.getMeshData().getVertices(), node.getWorldTransformation())
+    # The X, Y and Z axes of the file are the X, -Z and Y axes of the scene, turned a quarter around the Y axis.
+    numpy.testing.assert_allclose(vertices, [[10, 30, -20], [10, 30, -21], [9, 30, -20], [10, 31, -20]], atol = 1e-6)
+    assert numpy.linalg.det(vertices[1:] - vertices[0]) > 0 # Not mirrored.
+
+    # The triangles and the normals of the vertices point away from the inside.
+    vertices = node.getMeshData().getVertices()
+    indices = node.getMeshData().getIndices()
+    center = vertices.mean(axis = 0)
+    face_normals = numpy.cross(vertices[indices[:, 1]] - vertices[indices[:, 0]], vertices[indices[:, 2]] - vertices[indices[:, 0]])
+    assert ((face_normals * (vertices[indices].mean(axis = 1) - center)).sum(axis = 1) > 0).all()
+    assert ((node.getMeshData().getNormals() * (vertices - center)).sum(axis = 1) > 0).all()
+
+def test_unit(tmpdir, three_mf_reader):
+    file_name = writeModel(tmpdir, _tetrahedron.format(1, 3), """<item objectid="1" transform="1 0 0 0 1 0 0 0 1 1 2 3" />""", unit = "centimeter")
+    node = three_mf_reader.read(file_name)
+
+    assert node.getWorldPosition() == Vector(10, 30, -20)
+    assert node.getMeshData().getVertices().max() == 10
+    assert node.getMeshData().getVertices().min() == -10
+
+def test_components(tmpdir, three_mf_reader):
+    file_name = writeModel(tmpdir, _tetrahedron.format(1, 3) + """<object id="2" type="model"><components>
+<component objectid="1" /><component objectid="1" transform="1 0 0 0 1 0 0 0 1 5 0 0" />
+</components></object>""", """<item objectid="2" transform="1 0 0 0 1 0 0 0 1 0 0 7" />""")
+    node = three_mf_reader.read(file_name)
+
+    assert node.callDecoration("isGroup")
+    assert node.getMeshData() is None
+    assert [child.getWorldPosition() for child in node.getChildren()] == [Vector(0, 7, 0), Vector(5, 7, 0)]
+
+def test_containsItself(tmpdir, three_mf_reader):
+    file_name = writeModel(tmpdir, """<object id="1" type="model"><components><component objectid="2" /></components></object>
+<object id="2" type="model"><components><component objectid="1" /></components></object>""", """<item objectid="1" />""")
+    assert three_mf_reader.read(file_name) is None
+
+def test_invalidIndex(tmpdir, three_mf_reader):
+    file_name = writeModel(tmpdir, _tetrahedron.format(1, 4), """<item objectid="1" />""")
+    assert three_mf_reader.read(file_name) is None
+
+@pytest.mark.parametrize("resources,build", [
+    (_tetrahedron.format(1, 3), """<item objectid="1" transform="1 2 3" />"""), # Too few numbers.
+    (_tetrahedron.format(1, 3), """<item objectid="1" transform="1 0 0 0 1 0 0 0 1 a 0 0" />"""),
+    (_tetrahedron.format(1, 3).replace('x="1"', 'x="a"'), """<item objectid="1" />"""),
+    (_tetrahedron.format(1, "a"), """<item objectid="1" />"""),
+    (_tetrahedron.format(1, 3) + """<object id="2" type="model"><components><component objectid="1" transform="1" /></components></object>""", """<item objectid="2" />""")
+])
+def test_malformed(tmpdir, three_mf_reader, resources, build):
+    file_name = writeModel(tmpdir, resources, build)
+    assert three_mf_reader.read(file_name) is None
+
+def test_notAnArchive(tmpdir, three_mf_reader):
+    file_name = os.path.join(str(tmpdir), "broken.3mf")
+    with open(file_name, "w") as f:
+        f.write("Not a zip file.")
+    assert three_mf_reader.read(file_name) is None
@@ -0,0 +1,129 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import io
+import xml.etree.ElementTree as ET
+import zipfile
+
+import numpy
+
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshBuilder import MeshBuilder
+from UM.Mesh.MeshData import MeshData, transformVertices
+from UM.Scene.SceneNode import SceneNode
+
+_namespaces = {"3mf": "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"}
+
+##  A scene with an indexed cube and, in a group, a strip of triangles that
+#   repeat their shared vertices, as an STL file would.
+def createScene():
+    root = SceneNode()
+
+    builder = MeshBuilder()
+    builder.addCube(10, 20, 30, Vector(1, 2, 3))
+    cube = SceneNode(root)
+    cube.setMeshData(builder.build())
+    cube.rotate(Quaternion.fromAngleAxis(0.3, Vector.Unit_Y))
+    cube.translate(Vector(5, 0, 1))
+
+    group = SceneNode(root)
+    group.translate(Vector(0, 3, 0))
+    strip = SceneNode(group)
+    points = numpy.array([[0, 0, 0], [10, 0, 0], [0, 0, 10], [10, 0, 10], [0, 0, 20], [10, 0, 20]], numpy.float32)
+    strip.setMeshData(MeshData(vertices = points[[0, 2, 1, 1, 2, 3, 2, 4, 3, 3, 4, 5]]))
+    strip.rotate(Quaternion.fromAngleAxis(0.7, Vector.Unit_X))
+    return root, cube, strip
+
+def getWorldTriangles(node):
+    mesh_data = node.getMeshData()
+    vertices = transformVertices(mesh_data.getVertices(), node.getWorldTransformation())
+    if mesh_data.hasIndices():
+        return vertices[mesh_data.getIndices()]
+    return vertices.reshape(-1, 3, 3)
+
+##  Read the triangles of each build item, in the coordinates of the scene.
+def readModel(data):
+    model = ET.fromstring(zipfile.ZipFile(io.BytesIO(data)).read("3D/3dmodel.model"))
+    objects = {}
+    for element in model.find("3mf:resources", _namespaces):
+        vertices = numpy.array([[float(vertex.get(axis)) for axis in "xyz"] for vertex in element.find("3mf:mesh/3mf:vertices", _namespaces)])
+        triangles = numpy.array([[int(triangle.get(corner)) for corner in ("v1", "v2", "v3")] for triangle in element.find("3mf:mesh/3mf:triangles", _namespaces)])
+        objects[element.get("id")] = (vertices, triangles)
+
+    items = []
+    for item in model.find("3mf:build", _namespaces):
+        vertices, triangles = objects[item.get("objectid")]
+        if item.get("transform"):
+            matrix = numpy.array(item.get("transform").split(), numpy.float64).reshape(4, 3)
+            vertices = vertices.dot(matrix[:3]) + matrix[3]
+        items.append((vertices[:, [0, 2, 1]] * [1, 1, -1], triangles)) # The scene has Y pointing up instead of Z.
+    return items
+
+def sortedTriangles(triangles):
+    triangles = numpy.round(triangles, 4).reshape(len(triangles), -1)
+    return triangles[numpy.lexsort(triangles.transpose()[::-1])]
+
+def test_write(three_mf_writer):
+    root, cube, strip = createScene()
+    stream = io.BytesIO()
+    assert three_mf_writer.write(stream, root)
+
+    items = readModel(stream.getvalue())
+    assert len(items) == 2
+    for (vertices, triangles), node in zip(items, (cube, strip)):
+        # Each item has the transformation of its own node.
+        numpy.testing.assert_allclose(sortedTriangles(vertices[triangles]), sortedTriangles(getWorldTriangles(node)), atol = 1e-4)
+
+    # The vertices that the triangles of the strip repeat are written once.
+    assert len(items[1][0]) == 6
+    assert len(items[1][1]) == 4
+
+##  Tests that the model is rotated to have Z pointing up, rather than mirrored.
+def test_writeOrientation(three_mf_writer):
+    root = SceneNode()
+    node = SceneNode(root)
+    # A triangle in the horizontal plane with its normal pointing up, and one with its normal pointing to +X.
+    vertices = numpy.array([[0, 0, 0], [0, 0, 10], [10, 0, 0], [0, 0, 0], [0, 10, 0], [0, 0, 10]], numpy.float32)
+    node.setMeshData(MeshData(vertices = vertices, indices = numpy.array([[0, 1, 2], [3, 4, 5]], numpy.int32)))
+    node.translate(Vector(1, 2, 3))
+    stream = io.BytesIO()
+    assert three_mf_writer.write(stream, root)
+
+    model = ET.fromstring(zipfile.ZipFile(io.BytesIO(stream.getvalue())).read("3D/3dmodel.model"))
+    vertices = numpy.array([[float(vertex.get(axis)) for axis in "xyz"] for vertex in model.iter("{" + _namespaces["3mf"] + "}vertex")])
+    triangles = numpy.array([[int(triangle.get(corner)) for corner in ("v1", "v2", "v3")] for triangle in model.iter("{" + _namespaces["3mf"] + "}triangle")])
+    normals = numpy.cross(vertices[triangles[:, 1]] - vertices[triangles[:, 0]], vertices[triangles[:, 2]] - vertices[triangles[:, 0]])
+    numpy.testing.assert_allclose(normals / numpy.linalg.norm(normals, axis = 1)[:, numpy.newaxis], [[0, 0, 1], [1, 0, 0]], atol = 1e-6)
+
+    transform = model.find("3mf:build/3mf:item", _namespaces).get("transform")
+    numpy.testing.assert_allclose(numpy.array(transform.split(), numpy.float64), [1, 0, 0, 0, 1, 0, 0, 0, 1, 1, -3, 2])
+
+##  Tests writing the model to memory first, for Python versions that cannot
+#   write it into the archive directly.
+def test_writeWithoutStreaming(three_mf_writer, monkeypatch):
+    root, cube, strip = createScene()
+    stream = io.BytesIO()
+    assert three_mf_writer.write(stream, root)
+
+    monkeypatch.setattr(three_mf_writer, "_can_stream", False)
+    buffered_stream = io.BytesIO()
+    assert three_mf_writer.write(buffered_stream, root)
+
+    assert zipfile.ZipFile(buffered_stream).read("3D/3dmodel.model") == zipfile.ZipFile(stream).read("3D/3dmodel.model")
+
+def test_writeEmptyScene(three_mf_writer):
+    assert not three_mf_writer.write(io.BytesIO(), SceneNode())
+
+def test_maximumMeshSize(three_mf_writer):
+    root, cube, strip = createScene()
+    # Numbers that take as many characters as a float can.
+    vertices = numpy.random.RandomState(37).uniform(-1e30, 1e30, (300, 3)).astype(numpy.float32)
+    strip.setMeshData(MeshData(vertices = vertices))
+
+    stream = io.BytesIO()
+    assert three_mf_writer.write(stream, root)
+
+    # The estimate decides whether the model needs a large zip entry, so it may never be too small.
+    model_size = zipfile.ZipFile(io.BytesIO(stream.getvalue())).getinfo("3D/3dmodel.model").file_size
+    assert model_size <= sum(three_mf_writer._getMaximumMeshSize(node.getMeshData()) for node in (cube, strip)) + 1000
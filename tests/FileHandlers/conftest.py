@@ -0,0 +1,39 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import importlib.util
+import os
+
+import pytest
+
+_plugins = {} # The plugin modules that were loaded, by file name.
+
+##  Load a module of a file handler plugin, without the plugin registry.
+#
+#   \param directory The directory of the plugin in plugins/FileHandlers.
+#   \param name The name of the module.
+#   \return The module.
+def loadPlugin(directory, name):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugins", "FileHandlers", directory, name + ".py")
+    if path not in _plugins:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _plugins[path] = module
+    return _plugins[path]
+
+@pytest.fixture()
+def stl_writer():
+    return loadPlugin("STLWriter", "STLWriter").STLWriter()
+
+@pytest.fixture()
+def three_mf_reader():
+    return loadPlugin("3MFReader", "ThreeMFReader").ThreeMFReader()
+
+@pytest.fixture()
+def three_mf_writer():
+    return loadPlugin("3MFWriter", "ThreeMFWriter").ThreeMFWriter()
+
+@pytest.fixture()
+def obj_writer():
+    return loadPlugin("OBJWriter", "OBJWriter").OBJWriter()
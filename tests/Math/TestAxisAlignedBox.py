@@ -6,6 +6,7 @@ from UM.Math.Vector import Vector
 from UM.Math.Ray import Ray
 
 import unittest
+import numpy
 
 class TestAxisAlignedBox(unittest.TestCase):
     def setUp(self):
@@ -142,6 +143,37 @@ class TestAxisAlignedBox(unittest.TestCase):
         self.assertEqual(10.0, result[0])
         self.assertEqual(15.0, result[1])
 
+    def test_intersectRays(self):
+        boxes = [
+            AxisAlignedBox(minimum = Vector(-5.0, -5.0, -5.0), maximum = Vector(5.0, 5.0, 5.0)),
+            AxisAlignedBox(minimum = Vector(5.0, 5.0, 5.0), maximum = Vector(10.0, 10.0, 10.0)),
+            AxisAlignedBox(minimum = Vector(-20.0, 0.0, 0.0), maximum = Vector(-15.0, 1.0, 1.0))
+        ]
+        rays = [
+            Ray(Vector(-10.0, 0.0, 0.0), Vector(1.0, 0.0, 0.0)),
+            Ray(Vector(15.0, 15.0, 15.0), Vector(-1.0, -1.0, -1.0).normalized()),
+            Ray(Vector(15.0, 0.0, 0.0), Vector(0.0, 1.0, 0.0)),
+            Ray(Vector(-30.0, 0.5, 0.5), Vector(1.0, 0.0, 0.0)),
+            Ray(Vector(-5.0, 0.0, 0.0), Vector(0.0, 1.0, 0.0)) # Along a side of the first box.
+        ]
+        bounds = numpy.array([box.getBounds() for box in boxes])
+
+        # The results match those of intersecting each ray with each box.
+        hits, near, far = AxisAlignedBox.intersectRays([ray.origin.getData() for ray in rays], [ray.direction.getData() for ray in rays], bounds)
+        self.assertEqual(hits.shape, (len(rays), len(boxes)))
+        for ray_index, ray in enumerate(rays):
+            for box_index, box in enumerate(boxes):
+                result = box.intersectsRay(ray)
+                self.assertEqual(hits[ray_index, box_index], result is not False)
+                if result:
+                    self.assertAlmostEqual(near[ray_index, box_index], result[0])
+                    self.assertAlmostEqual(far[ray_index, box_index], result[1])
+
+        hits, near, far = AxisAlignedBox.intersectRays(rays[3].origin.getData(), rays[3].direction.getData(), bounds)
+        self.assertEqual(hits.tolist(), [True, False, True])
+        self.assertEqual(near[2], 10.0)
+        self.assertEqual(far[2], 15.0)
+
     def test_intersectsBox(self):
         box1 = AxisAlignedBox(minimum = Vector(5.0, 5.0, 5.0), maximum = Vector(10.0, 10.0, 10.0))
 
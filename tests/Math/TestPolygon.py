@@ -136,4 +136,110 @@ class TestPolygon():
                 isCorrect = True
                 break
             result.setPoints(numpy.roll(result.getPoints(), 1, axis = 0)) #Perform the rotation for the next check.
-        assert isCorrect
\ No newline at end of file
+        assert isCorrect
+
+    ##  More test cases for convex hull intersection, of which the order of the resulting vertices is not checked.
+    test_intersectConvexUnordered_data = [
+        ({ "p1": [[0, 0], [10, 0], [10, 10], [0, 10]], "p2": [[2, 2], [4, 2], [4, 4], [2, 4]], "answer": [[2, 2], [4, 2], [4, 4], [2, 4]], "label": "Contained", "description": "A square inside another square." }),
+        ({ "p1": [[0, 0], [10, 0], [10, 10], [0, 10]], "p2": [[20, 0], [30, 0], [30, 10], [20, 10]], "answer": [], "label": "Disjunct", "description": "Two squares next to each other." }),
+        ({ "p1": [[0, 0], [10, 0], [10, 10], [0, 10]], "p2": [[5, -5], [15, 5], [5, 15], [-5, 5]], "answer": [[0, 0], [10, 0], [10, 10], [0, 10]], "label": "Corners On Edges", "description": "A rotated square of which the edges go through the corners of the other square." }),
+        ({ "p1": [[0, 0], [10, 0], [10, 10], [0, 10]], "p2": [[5, 5], [15, 5], [5, 15]], "answer": [[5, 5], [10, 5], [10, 10], [5, 10]], "label": "Triangle", "description": "A triangle that overlaps a corner of the square." })
+    ]
+
+    ##  Tests the convex hull intersect function on more cases.
+    #
+    #   \param data The data of the test case. Must include two polygons and a
+    #   required result polygon.
+    @pytest.mark.parametrize("data", test_intersectConvexUnordered_data)
+    def test_intersectConvexHullUnordered(self, data):
+        p1 = Polygon(numpy.array(data["p1"], numpy.float32))
+        p2 = Polygon(numpy.array(data["p2"], numpy.float32))
+        for result in [p1.intersectionConvexHulls(p2), p2.intersectionConvexHulls(p1)]:
+            points = result.getPoints() if result.isValid() else numpy.zeros((0, 2))
+            assert sorted(numpy.round(points, 4).tolist()) == sorted(data["answer"])
+
+    ##  The individual test cases for the Minkowski hull tests.
+    test_minkowskiHull_data = [
+        ({ "p1": [[-1, -1], [1, -1], [1, 1], [-1, 1]], "p2": [[-2, -2], [2, -2], [2, 2], [-2, 2]], "answer": [[-3, 3], [3, 3], [3, -3], [-3, -3]], "label": "Squares", "description": "Two squares, of which all edges are parallel." }),
+        ({ "p1": [[-1, -1], [-1, 1], [1, 1], [1, -1]], "p2": [[0, 0], [2, 0], [0, 2]], "answer": [[-1, 3], [1, 3], [3, 1], [3, -1], [-1, -1]], "label": "Square and Triangle", "description": "A clockwise square and a counter-clockwise triangle." }),
+        ({ "p1": [[0, 0], [4, 0], [4, 1], [1, 1], [1, 4], [0, 4]], "p2": [[-1, -1], [1, -1], [1, 1], [-1, 1]], "answer": [[-1, 5], [2, 5], [5, 2], [5, -1], [-1, -1]], "label": "Non-convex", "description": "An L-shape, of which the hull is used." }),
+        ({ "p1": [[0, 0], [2, 0], [2, 0], [2, 2], [1, 2], [0, 2]], "p2": [[5, 5]], "answer": [[5, 7], [7, 7], [7, 5], [5, 5]], "label": "Degenerate", "description": "A square with a duplicate and a collinear point, and a single point." }),
+        ({ "p1": [[0, 0], [1, 0], [1, 1]], "p2": [], "answer": [], "label": "Empty", "description": "A polygon without points." })
+    ]
+
+    ##  Tests the Minkowski hull function.
+    #
+    #   \param data The data of the test case. Must include two polygons and a
+    #   required result polygon, in clockwise order starting at the top left
+    #   vertex.
+    @pytest.mark.parametrize("data", test_minkowskiHull_data)
+    def test_getMinkowskiHull(self, data):
+        p1 = Polygon(numpy.array(data["p1"], numpy.float32))
+        p2 = Polygon(numpy.array(data["p2"], numpy.float32).reshape((-1, 2)))
+        for result in [p1.getMinkowskiHull(p2), p2.getMinkowskiHull(p1)]:
+            points = result.getPoints()
+            assert len(points) == len(data["answer"])
+            if len(points) == 0:
+                continue
+            start = numpy.lexsort((points[:, 0], -points[:, 1]))[0] # The top left vertex.
+            assert numpy.allclose(numpy.roll(points, -start, axis = 0), data["answer"])
+
+    ##  Tests that the Minkowski sum of convex polygons is their outline, and of other polygons contains all sums of points.
+    def test_getMinkowskiSum(self):
+        square = Polygon(numpy.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], numpy.float32))
+        assert len(square.getMinkowskiSum(square).getPoints()) == 4
+
+        shape = Polygon(numpy.array([[0, 0], [4, 0], [4, 1], [1, 1], [1, 4], [0, 4]], numpy.float32))
+        points = shape.getMinkowskiSum(square).getPoints()
+        assert len(points) == 24
+        assert [5, 2] in points.tolist()
+
+    ##  Tests finding all intersecting pairs of polygons at once.
+    #
+    #   Uses all polygons of the intersection tests, and the base square of
+    #   those tests. The results must be the same as checking each pair.
+    def test_findIntersections(self):
+        polygons = [Polygon(numpy.array([[0, 0], [10, 0], [10, 10], [0, 10]], numpy.float32))]
+        for data in self.test_intersect_data:
+            polygons.append(Polygon(numpy.array(data["polygon"], numpy.float32)))
+        polygons.append(Polygon()) # Invalid polygons are ignored.
+
+        result = Polygon.findIntersections(polygons)
+
+        expected = []
+        for index in range(len(polygons) - 1):
+            for other_index in range(index + 1, len(polygons) - 1):
+                intersection = polygons[index].intersectsPolygon(polygons[other_index])
+                if intersection is not None:
+                    expected.append((index, other_index, intersection))
+        assert len(expected) > 6 # Also some of the parametrised polygons intersect with each other.
+        assert [(index, other_index) for index, other_index, _ in result] == [(index, other_index) for index, other_index, _ in expected]
+        for (_, _, vector), (_, _, expected_vector) in zip(result, expected):
+            assert Float.fuzzyCompare(vector[0], expected_vector[0], 1e-4)
+            assert Float.fuzzyCompare(vector[1], expected_vector[1], 1e-4)
+
+    ##  Tests finding intersections between polygons with very different numbers of points.
+    #
+    #   The polygons are tested in batches of pairs with the same number of
+    #   points, and the axes of pairs that are too large for a single batch are
+    #   tested a part at a time. This must give the same results as testing all
+    #   pairs at once.
+    @pytest.mark.parametrize("batch_elements", [2 ** 22, 2 ** 12, 1])
+    def test_findIntersectionsDetailed(self, batch_elements, monkeypatch):
+        angles = numpy.linspace(0, 2 * math.pi, 300, endpoint = False)
+        polygons = [Polygon(numpy.stack((numpy.cos(angles) * 15 + 20, numpy.sin(angles) * 15 + 20), axis = 1))]
+        for x in range(0, 50, 7):
+            for y in range(0, 50, 7):
+                polygons.append(Polygon(numpy.array([[x, y], [x + 8, y], [x + 8, y + 8], [x, y + 8]], numpy.float64)))
+        polygons.append(Polygon(numpy.array([[0, 0], [5, 2], [8, 6], [3, 9], [-1, 4]], numpy.float64)))
+
+        monkeypatch.setattr("UM.Math.Polygon._intersection_batch_elements", 2 ** 40)
+        expected = Polygon.findIntersections(polygons)
+        monkeypatch.setattr("UM.Math.Polygon._intersection_batch_elements", batch_elements)
+        result = Polygon.findIntersections(polygons)
+
+        assert len([item for item in expected if item[0] == 0]) > 10
+        assert [(index, other_index) for index, other_index, _ in result] == [(index, other_index) for index, other_index, _ in expected]
+        for (_, _, vector), (_, _, expected_vector) in zip(result, expected):
+            assert Float.fuzzyCompare(vector[0], expected_vector[0], 1e-9)
+            assert Float.fuzzyCompare(vector[1], expected_vector[1], 1e-9)
@@ -115,6 +115,19 @@ class TestQuaternion(unittest.TestCase):
         self.assertTrue(Float.fuzzyCompare(q1.z, q2.z, 1e-6))
         self.assertTrue(Float.fuzzyCompare(q1.w, q2.w, 1e-6))
 
+    def test_fromMatrixAllAxes(self):
+        # Rotations by half a turn have no trace, so the largest diagonal element of the matrix is used.
+        for axis in [Vector.Unit_X, Vector.Unit_Y, Vector.Unit_Z]:
+            m = Matrix()
+            m.setByRotationAxis(math.pi, axis)
+
+            q1 = Quaternion.fromMatrix(m)
+
+            q2 = Quaternion()
+            q2.setByAngleAxis(math.pi, axis)
+
+            self.assertTrue(q1 == q2 or q1 == -q2)
+
     def test_slerp(self):
         q1 = Quaternion()
         q1.setByAngleAxis(0, Vector.Unit_Z)
@@ -45,5 +45,27 @@ class TestVector(unittest.TestCase):
         self.assertEqual(Vector(0, -1, 0), -v)
         self.assertEqual(Vector(0, 1, 0), v) # - should have no side effects
 
+    def test_arithmetic(self):
+        v = Vector(1, 2, 3)
+
+        self.assertEqual(v + Vector(1, 1, 1), Vector(2, 3, 4))
+        self.assertEqual(v - 1, Vector(0, 1, 2))
+        self.assertEqual(v * 2, Vector(2, 4, 6))
+        self.assertEqual(2 * v, Vector(2, 4, 6))
+        self.assertEqual(v / Vector(1, 2, 3), Vector(1, 1, 1))
+        self.assertEqual(v.dot(Vector(1, 0, 1)), 4)
+        self.assertEqual(v.cross(Vector(0, 0, 1)), Vector(2, -1, 0))
+        self.assertAlmostEqual(Vector(0, 3, 4).length(), 5)
+        self.assertEqual(Vector(0, 3, 4).normalized(), Vector(0, 0.6, 0.8))
+        self.assertEqual(v, Vector(1, 2, 3)) # The operations have no side effects.
+
+    def test_divideByZero(self):
+        # Like numpy, dividing by zero results in infinity instead of an error.
+        inverse = 1.0 / Vector(2, 0, -0.0)
+
+        self.assertEqual(inverse.x, 0.5)
+        self.assertEqual(inverse.y, float("inf"))
+        self.assertEqual(inverse.z, float("-inf"))
+
 if __name__ == "__main__":
     unittest.main()
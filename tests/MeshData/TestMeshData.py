@@ -0,0 +1,136 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+import scipy.spatial
+
+from UM.Math.Matrix import Matrix
+from UM.Math.Polygon import Polygon
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData, approximateConvexHull, convexHull2D, convexHullFaces, removeInteriorVertices, roundVertexArray, transformVertices, uniqueRoundedVertices, uniqueVertices, weldVertices
+
+def createTransformation():
+    transformation = Matrix()
+    transformation.setByRotationAxis(0.5, Vector(1, 2, 3).normalized())
+    scale = Matrix()
+    scale.setByScaleVector(Vector(2, 1, 1))
+    transformation.multiply(scale)
+    transformation.setTranslation(Vector(10, 20, 30))
+    return transformation
+
+def sortedRows(points):
+    return points[numpy.lexsort(numpy.transpose(points)[::-1])]
+
+def test_uniqueRoundedVertices():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (10000, 3)).astype(numpy.float32)
+    vertices = numpy.concatenate((vertices, vertices[:1000] + 0.01)) # Duplicates after rounding.
+
+    result = uniqueRoundedVertices(vertices, 0.5)
+    expected = uniqueVertices(roundVertexArray(vertices, 0.5))
+    numpy.testing.assert_array_equal(sortedRows(result), sortedRows(expected))
+
+def test_weldVertices():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (1000, 3))
+    indices = numpy.random.RandomState(38).randint(0, 1000, (3000, 3))
+    indices = indices[(indices[:, 0] != indices[:, 1]) & (indices[:, 1] != indices[:, 2]) & (indices[:, 2] != indices[:, 0])]
+    triangles = vertices[indices].astype(numpy.float32)
+
+    # Every corner of the triangles as a separate vertex, with a triangle that has no area.
+    split_vertices = numpy.concatenate((triangles.reshape(-1, 3), vertices[[0, 0, 1]]))
+    split_indices = numpy.arange(len(split_vertices)).reshape(-1, 3)
+    welded_vertices, welded_indices = weldVertices(split_vertices, split_indices)
+
+    assert len(welded_vertices) == len(numpy.unique(indices))
+    assert len(welded_indices) == len(indices)
+    numpy.testing.assert_array_equal(welded_vertices[welded_indices], triangles)
+
+def test_removeInteriorVertices():
+    random = numpy.random.RandomState(37)
+    vertices = random.uniform(-50, 50, (10000, 3))
+    hull_vertices = vertices[scipy.spatial.ConvexHull(vertices).vertices]
+
+    result = removeInteriorVertices(vertices)
+    assert len(result) < len(vertices) / 2
+    assert numpy.all([(result == vertex).all(axis = 1).any() for vertex in hull_vertices]) # The vertices of the hull are kept.
+
+def test_approximateConvexHull():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (100000, 3)).astype(numpy.float32)
+
+    hull = approximateConvexHull(vertices, 1024)
+    expected = scipy.spatial.ConvexHull(vertices)
+    numpy.testing.assert_array_equal(sortedRows(hull.points[hull.vertices]), sortedRows(expected.points[expected.vertices]))
+
+    hull = approximateConvexHull(vertices, 16)
+    assert len(hull.vertices) <= 16
+    numpy.testing.assert_array_almost_equal(hull.points.min(axis = 0), vertices.min(axis = 0), decimal = -1) # Still roughly the same extents.
+
+def test_approximateConvexHullFlat():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (100, 3)).astype(numpy.float32)
+    vertices[:, 1] = 0
+    assert approximateConvexHull(vertices, 1024) is None
+
+def test_convexHullFaces():
+    # A box of 10 by 20 by 30, of which each side consists of two triangles of the hull.
+    vertices = numpy.array([[x, y, z] for x in (0, 10) for y in (0, 20) for z in (0, 30)], numpy.float64)
+    face_normals, face_areas = convexHullFaces(scipy.spatial.ConvexHull(vertices))
+
+    assert len(face_areas) == 6
+    order = numpy.lexsort(numpy.transpose(face_normals)[::-1])
+    numpy.testing.assert_array_almost_equal(face_normals[order], [[-1, 0, 0], [0, -1, 0], [0, 0, -1], [0, 0, 1], [0, 1, 0], [1, 0, 0]])
+    numpy.testing.assert_array_almost_equal(face_areas[order], [600, 300, 200, 200, 300, 600])
+
+convexHull2D_data = [
+    ("random", numpy.random.RandomState(37).normal(0, 10, (1000, 2))),
+    ("triangle", numpy.array([[0, 0], [10, 0], [0, 10]])),
+    ("duplicates", numpy.array([[0, 0], [10, 0], [10, 0], [5, 5], [0, 10], [0, 10]])),
+    ("collinear", numpy.array([[0, 0], [5, 5], [10, 10], [0, 10]])),
+    ("line", numpy.array([[0, 0], [5, 5], [10, 10]]))
+]
+
+@pytest.mark.parametrize("name,points", convexHull2D_data)
+def test_convexHull2D(name, points):
+    result = convexHull2D(points)
+    if name == "line":
+        numpy.testing.assert_array_equal(sortedRows(result), [[0, 0], [10, 10]])
+        return
+
+    expected = Polygon(points.astype(numpy.float64)).getConvexHull().getPoints()
+    numpy.testing.assert_array_almost_equal(sortedRows(result), sortedRows(expected))
+    area = numpy.sum(result[:, 0] * numpy.roll(result[:, 1], -1) - result[:, 1] * numpy.roll(result[:, 0], -1))
+    assert area < 0 # Clockwise, like Polygon.getConvexHull().
+
+def test_getExtents():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (1000, 3)).astype(numpy.float32)
+    mesh = MeshData(vertices = vertices)
+    transformation = createTransformation()
+
+    extents = mesh.getExtents()
+    numpy.testing.assert_array_almost_equal(extents.minimum.getData(), vertices.min(axis = 0))
+    numpy.testing.assert_array_almost_equal(extents.maximum.getData(), vertices.max(axis = 0))
+
+    transformed = transformVertices(vertices, transformation)
+    extents = mesh.getExtents(transformation)
+    numpy.testing.assert_array_almost_equal(extents.minimum.getData(), transformed.min(axis = 0), decimal = 4)
+    numpy.testing.assert_array_almost_equal(extents.maximum.getData(), transformed.max(axis = 0), decimal = 4)
+
+def test_getConvexHullFootprint():
+    vertices = numpy.random.RandomState(37).uniform(-50, 50, (1000, 3)).astype(numpy.float32)
+    mesh = MeshData(vertices = vertices)
+    transformation = createTransformation()
+
+    expected = Polygon(transformVertices(vertices, transformation)[:, [0, 2]]).getConvexHull().getPoints()
+    numpy.testing.assert_array_almost_equal(sortedRows(mesh.getConvexHullFootprint(transformation).getPoints()), sortedRows(expected), decimal = 4)
+
+    # Moving the mesh moves the cached footprint.
+    transformation.setTranslation(Vector(-10, 0, 5))
+    expected = Polygon(transformVertices(vertices, transformation)[:, [0, 2]]).getConvexHull().getPoints()
+    numpy.testing.assert_array_almost_equal(sortedRows(mesh.getConvexHullFootprint(transformation).getPoints()), sortedRows(expected), decimal = 4)
+    assert len(mesh._orientation_cache) == 1
+
+def test_getConvexHullFootprintFlat():
+    vertices = numpy.array([[0, 0, 0], [10, 0, 0], [10, 0, 10], [0, 0, 10], [5, 0, 5]], numpy.float32)
+    mesh = MeshData(vertices = vertices)
+
+    assert mesh.getConvexHull() is None
+    numpy.testing.assert_array_almost_equal(sortedRows(mesh.getConvexHullFootprint().getPoints()), [[0, 0], [0, 10], [10, 0], [10, 10]])
@@ -0,0 +1,104 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import math
+
+import numpy
+import pytest
+
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData
+from UM.Operations.LayFlatOperation import LayFlatOperation
+from UM.Scene.GroupDecorator import GroupDecorator
+from UM.Scene.SceneNode import SceneNode
+
+##  Creates a node with a box as mesh, tilted such that it does not rest on a side.
+def createTiltedBox(width, height, depth):
+    vertices = numpy.array([[x, y, z] for x in (-width / 2, width / 2) for y in (-height / 2, height / 2) for z in (-depth / 2, depth / 2)], numpy.float32)
+    node = SceneNode()
+    node.setMeshData(MeshData(vertices = vertices))
+    node.rotate(Quaternion.fromAngleAxis(0.3, Vector.Unit_X))
+    node.rotate(Quaternion.fromAngleAxis(0.4, Vector.Unit_Z))
+    return node
+
+def getTransformedVertices(node):
+    return node.getMeshData().getConvexHullTransformedVertices(node.getWorldTransformation())
+
+##  Checks that four corners of a box are at the lowest height.
+def assertFlat(node):
+    heights = numpy.sort(getTransformedVertices(node)[:, 1])
+    assert heights[3] - heights[0] == pytest.approx(0, abs = 1e-3)
+    assert heights[4] - heights[0] > 1
+
+def test_layOnLowestVertices():
+    node = createTiltedBox(20, 20, 20)
+    old_orientation = node.getOrientation()
+
+    operation = LayFlatOperation(node)
+    operation.process()
+    assertFlat(node)
+
+    operation.undo()
+    assert node.getOrientation() == old_orientation
+    operation.redo()
+    assertFlat(node)
+
+def test_layOnLargestFace():
+    node = createTiltedBox(40, 20, 5)
+    operation = LayFlatOperation(node, method = LayFlatOperation.Method.LargestFace)
+    operation.process()
+
+    assertFlat(node)
+    vertices = getTransformedVertices(node)
+    assert vertices[:, 1].max() - vertices[:, 1].min() == pytest.approx(5, abs = 1e-3) # Resting on one of the largest sides.
+
+def test_layFlatGroup():
+    group = SceneNode()
+    group.addDecorator(GroupDecorator())
+    for offset in (-20, 20):
+        child = SceneNode(group)
+        vertices = numpy.array([[x + offset, y, z] for x in (-5, 5) for y in (0, 10) for z in (-5, 5)], numpy.float32)
+        child.setMeshData(MeshData(vertices = vertices))
+    group.rotate(Quaternion.fromAngleAxis(0.3, Vector.Unit_X))
+
+    LayFlatOperation(group, method = LayFlatOperation.Method.LargestFace).process()
+
+    vertices = numpy.concatenate([getTransformedVertices(child) for child in group.getChildren()])
+    heights = numpy.sort(vertices[:, 1])
+    assert heights[7] - heights[0] == pytest.approx(0, abs = 1e-3) # Both children rest on the plate.
+
+def test_layFlatTooSmall():
+    vertices = numpy.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], numpy.float32)
+    node = SceneNode()
+    node.setMeshData(MeshData(vertices = vertices))
+    node.rotate(Quaternion.fromAngleAxis(0.3, Vector.Unit_X))
+    old_orientation = node.getOrientation()
+
+    LayFlatOperation(node).process() # No vertices are far enough apart to be reliable.
+    assert node.getOrientation() == old_orientation
+
+def test_progress(application):
+    node = createTiltedBox(20, 20, 20)
+    operation = LayFlatOperation(node)
+    progress = []
+    def onProgress(iterations):
+        progress.append(iterations)
+    operation.progress.connect(onProgress)
+    operation.process()
+
+    assert progress == [1]
+
+def test_mergeWith():
+    node = createTiltedBox(40, 20, 5)
+    old_orientation = node.getOrientation()
+    first = LayFlatOperation(node)
+    first.process()
+    second = LayFlatOperation(node, method = LayFlatOperation.Method.LargestFace)
+    second.process()
+
+    merged = second.mergeWith(first)
+    merged.undo()
+    assert node.getOrientation() == old_orientation
+    merged.redo()
+    assert node.getOrientation() == second._new_orientation
@@ -0,0 +1,73 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+
+from UM.Math.Polygon import Polygon
+from UM.Mesh.MeshData import MeshData
+from UM.Scene.ArrangeJob import ArrangeJob
+from UM.Scene.SceneNode import SceneNode
+
+##  Creates a node with a box as mesh, centred around the origin.
+def createBox(width, depth):
+    vertices = numpy.array([[x, y, z] for x in (-width / 2, width / 2) for y in (0, 10) for z in (-depth / 2, depth / 2)], numpy.float32)
+    node = SceneNode()
+    node.setMeshData(MeshData(vertices = vertices))
+    return node
+
+def getFootprint(node):
+    vertices = node.getMeshData().getConvexHullTransformedVertices(node.getWorldTransformation())
+    return Polygon(vertices[:, [0, 2]]).getConvexHull()
+
+build_plate = Polygon(numpy.array([[-50, -50], [-50, 50], [50, 50], [50, -50]], numpy.float32))
+
+def test_arrange():
+    nodes = [createBox(20, 20) for i in range(9)] + [createBox(40, 12)]
+    job = ArrangeJob(nodes, build_plate, spacing = 2)
+    job.run()
+    job.getResult().redo() # There is no operation stack to push to.
+
+    assert job.getUnplacedNodes() == []
+    footprints = [getFootprint(node) for node in nodes]
+    for footprint in footprints:
+        points = footprint.getPoints()
+        assert points.min() >= -50 and points.max() <= 50
+    margin = Polygon(numpy.array([[-1.9, -1.9], [-1.9, 1.9], [1.9, 1.9], [1.9, -1.9]], numpy.float32))
+    for index, footprint in enumerate(footprints):
+        for other in footprints[index + 1:]:
+            assert footprint.intersectsPolygon(other.getMinkowskiHull(margin)) is None # The spacing between the nodes is kept.
+
+    # The nodes are centred on the build plate.
+    points = numpy.concatenate([footprint.getPoints() for footprint in footprints])
+    assert numpy.all(numpy.abs(points.min(axis = 0) + points.max(axis = 0)) <= 2)
+
+def test_arrangeTooMany():
+    nodes = [createBox(40, 40) for i in range(5)]
+    job = ArrangeJob(nodes, build_plate, spacing = 2)
+    job.run()
+
+    assert job.getUnplacedNodes() == [nodes[-1]]
+
+def test_arrangeFixed():
+    node = createBox(20, 20)
+    fixed = Polygon(numpy.array([[-40, -40], [-40, 40], [40, 40], [40, -40]], numpy.float32))
+    job = ArrangeJob([node], build_plate, fixed_polygons = [fixed], spacing = 0)
+    job.run()
+
+    assert job.getUnplacedNodes() == [node]
+
+    fixed = Polygon(numpy.array([[-50, -50], [-50, 50], [20, 50], [20, -50]], numpy.float32))
+    job = ArrangeJob([node], build_plate, fixed_polygons = [fixed], spacing = 0)
+    job.run()
+    job.getResult().redo()
+
+    assert job.getUnplacedNodes() == []
+    assert getFootprint(node).getPoints()[:, 0].min() >= 20
+
+def test_cancel():
+    job = ArrangeJob([createBox(20, 20)], build_plate)
+    job.cancel()
+    job.run()
+
+    assert job.isCancelled()
+    assert job.getResult() is None
@@ -0,0 +1,99 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import math
+
+import numpy
+import pytest
+
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshBuilder import MeshBuilder
+from UM.Scene.AutoOrientJob import AutoOrientJob
+from UM.Scene.SceneNode import SceneNode
+
+def createNode(builder, parent = None):
+    node = SceneNode(parent)
+    node.setMeshData(builder.build())
+    return node
+
+def getTransformedVertices(node):
+    return node.getMeshData().getConvexHullTransformedVertices(node.getWorldTransformation())
+
+def test_orientPyramid():
+    builder = MeshBuilder()
+    builder.addPyramid(20, 20, 20)
+    node = createNode(builder)
+    node.rotate(Quaternion.fromAngleAxis(math.pi, Vector.Unit_X)) # Standing on its tip.
+    old_orientation = node.getOrientation()
+
+    job = AutoOrientJob(node)
+    job.run()
+    job.getResult().redo() # There is no operation stack to push to.
+
+    # The pyramid stands on its base, with the tip up.
+    heights = numpy.sort(getTransformedVertices(node)[:, 1])
+    assert heights[3] - heights[0] == pytest.approx(0, abs = 1e-3)
+    assert heights[4] - heights[0] == pytest.approx(20, abs = 1e-3)
+
+    job.getResult().undo()
+    assert node.getOrientation() == old_orientation
+
+def test_orientPlate():
+    builder = MeshBuilder()
+    builder.addCube(40, 30, 4)
+    node = createNode(builder)
+    node.rotate(Quaternion.fromAngleAxis(0.3, Vector.Unit_Y))
+
+    job = AutoOrientJob(node)
+    job.run()
+    job.getResult().redo()
+
+    heights = getTransformedVertices(node)[:, 1]
+    assert heights.max() - heights.min() == pytest.approx(4, abs = 1e-3) # Lying on one of its largest sides.
+
+def test_orientChild():
+    parent = SceneNode()
+    parent.rotate(Quaternion.fromAngleAxis(0.5, Vector.Unit_Z))
+    builder = MeshBuilder()
+    builder.addPyramid(20, 20, 20)
+    node = createNode(builder, parent)
+
+    job = AutoOrientJob(node)
+    job.run()
+    job.getResult().redo()
+
+    heights = numpy.sort(getTransformedVertices(node)[:, 1])
+    assert heights[3] - heights[0] == pytest.approx(0, abs = 1e-3) # The base is flat in world coordinates.
+    assert heights[4] - heights[0] == pytest.approx(20, abs = 1e-3)
+
+def test_scores():
+    builder = MeshBuilder()
+    builder.addPyramid(20, 20, 20)
+    node = createNode(builder)
+
+    job = AutoOrientJob(node, sample_count = 10)
+    job.run()
+
+    downs, scores = job.getScores()
+    assert len(downs) == len(scores)
+    assert len(downs) >= 10
+    numpy.testing.assert_array_almost_equal(numpy.linalg.norm(downs, axis = 1), numpy.ones(len(downs)))
+    numpy.testing.assert_array_almost_equal(downs[numpy.argmin(scores)], [0, -1, 0]) # Already standing on its base.
+
+def test_noFaces():
+    job = AutoOrientJob(SceneNode())
+    job.run()
+
+    assert job.getResult() is None
+    assert job.getScores() is None
+
+def test_cancel():
+    builder = MeshBuilder()
+    builder.addCube(10, 10, 10)
+    job = AutoOrientJob(createNode(builder))
+    job.cancel()
+    job.run()
+
+    assert job.isCancelled()
+    assert job.getResult() is None
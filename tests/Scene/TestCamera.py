@@ -0,0 +1,74 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import math
+
+from UM.Math.Matrix import Matrix
+from UM.Math.Vector import Vector
+from UM.Scene.Camera import Camera
+from UM.Scene.SceneNode import SceneNode
+
+def createCamera(transformation = None):
+    camera = Camera("test")
+    camera.setWindowSize(100, 100)
+    camera.setViewportSize(100, 100)
+    if transformation:
+        camera.setTransformation(transformation)
+    return camera
+
+##  Checks that the rays of a camera are the same as those of a new camera, which has nothing cached yet.
+def assertSameRays(camera):
+    new_camera = createCamera(camera.getWorldTransformation())
+    new_camera.setProjectionMatrix(camera.getProjectionMatrix())
+    for x, y in [(0, 0), (0.5, -0.5), (-0.2, 0.9)]:
+        ray = camera.getRay(x, y)
+        expected = new_camera.getRay(x, y)
+        assert ray.origin == expected.origin
+        assert ray.direction == expected.direction
+
+def test_getRay():
+    camera = createCamera()
+    assertSameRays(camera)
+
+    # The cached matrices are invalidated when the camera moves.
+    camera.translate(Vector(0, 0, 10))
+    camera.lookAt(Vector(10, 0, 0))
+    assert camera.getRay(0, 0).origin == Vector(0, 0, 10)
+    assertSameRays(camera)
+
+    # Or when its parent moves.
+    parent = SceneNode()
+    parent.addChild(camera)
+    parent.translate(Vector(0, 5, 0))
+    assert camera.getRay(0, 0).origin == Vector(0, 5, 10)
+    assertSameRays(camera)
+
+def test_setProjectionMatrix():
+    camera = createCamera()
+    camera.getRay(0.5, 0.5)
+
+    projection = Matrix()
+    projection.setPerspective(30, 1, 1, 500)
+    camera.setProjectionMatrix(projection)
+
+    ray = camera.getRay(0.5, 0.5)
+    assert ray.direction.x > 0 and ray.direction.y < 0 and ray.direction.z < 0
+    assertSameRays(camera)
+
+def test_getViewMatrix():
+    camera = createCamera()
+    camera.translate(Vector(1, 2, 3))
+
+    assert camera.getViewMatrix().getTranslation() == Vector(-1, -2, -3)
+    camera.translate(Vector(1, 0, 0))
+    assert camera.getViewMatrix().getTranslation() == Vector(-2, -2, -3)
+
+def test_project():
+    camera = createCamera()
+    camera.setProjectionMatrix(Matrix()) # Divides by the depth only.
+    assert camera.project(Vector(2, 4, -2)) == (-0.5, -1)
+
+    # A position in the plane of the camera can not be projected onto the view plane.
+    x, y = camera.project(Vector(2, 0, 0))
+    assert x == math.inf
+    assert math.isnan(y)
@@ -0,0 +1,115 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import math
+
+import numpy
+import pytest
+
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Scene.SceneNode import SceneNode
+from UM.Scene.TransformStore import TransformStore
+
+##  Creates a root with two children, of which the first has a child of its own.
+def createTree():
+    root = SceneNode()
+    first = SceneNode(root)
+    second = SceneNode(root)
+    grandchild = SceneNode(first)
+
+    first.translate(Vector(10, 0, 0))
+    first.rotate(Quaternion.fromAngleAxis(math.pi / 3, Vector.Unit_Y))
+    second.scale(Vector(2, 2, 2))
+    grandchild.translate(Vector(0, 5, 0))
+    return root
+
+##  Checks that the transformations of the nodes of two trees are the same.
+def assertSameTransformations(expected, result):
+    for expected_node, result_node in zip([expected] + expected.getAllChildren(), [result] + result.getAllChildren()):
+        numpy.testing.assert_array_almost_equal(expected_node.getLocalTransformation().getData(), result_node.getLocalTransformation().getData(), decimal = 4)
+        numpy.testing.assert_array_almost_equal(expected_node.getWorldTransformation().getData(), result_node.getWorldTransformation().getData(), decimal = 4)
+        assert expected_node.getPosition().equals(result_node.getPosition(), 1e-4)
+        assert expected_node.getScale().equals(result_node.getScale(), 1e-4)
+        assert expected_node.getWorldPosition().equals(result_node.getWorldPosition(), 1e-4)
+        assert expected_node.getWorldScale().equals(result_node.getWorldScale(), 1e-4)
+        assert expected_node.getOrientation() == result_node.getOrientation()
+        assert expected_node.getWorldOrientation() == result_node.getWorldOrientation()
+
+transform_spaces = [SceneNode.TransformSpace.Local, SceneNode.TransformSpace.Parent, SceneNode.TransformSpace.World]
+
+@pytest.mark.parametrize("transform_space", transform_spaces)
+def test_translate(transform_space):
+    expected = createTree()
+    for node in expected.getChildren():
+        node.translate(Vector(1, 2, 3), transform_space)
+
+    result = createTree()
+    store = TransformStore(result)
+    store.translate(result.getChildren(), Vector(1, 2, 3), transform_space)
+    store.apply()
+
+    assertSameTransformations(expected, result)
+
+@pytest.mark.parametrize("transform_space", transform_spaces)
+def test_rotate(transform_space):
+    rotations = [Quaternion.fromAngleAxis(0.5, Vector.Unit_Z), Quaternion.fromAngleAxis(math.pi, Vector.Unit_X)]
+    expected = createTree()
+    for node, rotation in zip(expected.getChildren(), rotations):
+        node.rotate(rotation, transform_space)
+
+    result = createTree()
+    store = TransformStore(result)
+    store.rotate(result.getChildren(), [[rotation.x, rotation.y, rotation.z, rotation.w] for rotation in rotations], transform_space)
+    store.apply()
+
+    assertSameTransformations(expected, result)
+
+@pytest.mark.parametrize("transform_space", transform_spaces)
+def test_scale(transform_space):
+    expected = createTree()
+    children = expected.getAllChildren()
+    for node in children:
+        node.scale(Vector(1, 0.5, -2), transform_space)
+
+    result = createTree()
+    store = TransformStore(result)
+    store.scale(result.getAllChildren(), numpy.tile([1, 0.5, -2], (len(children), 1)), transform_space)
+    store.apply()
+
+    assertSameTransformations(expected, result)
+
+def test_update(application):
+    root = createTree()
+    first = root.getChildren()[0]
+    grandchild = first.getChildren()[0]
+    store = TransformStore(root)
+
+    changed = []
+    def onTransformationChanged(node):
+        changed.append(node)
+    grandchild.transformationChanged.connect(onTransformationChanged)
+
+    store.translate([first], Vector(0, 0, 7), SceneNode.TransformSpace.Parent)
+    world = store.getWorldTransformations()[store.indexOf(grandchild)]
+    assert grandchild.getWorldPosition() == Vector(10, 5, 0) # Not applied yet.
+    numpy.testing.assert_array_almost_equal(world[:3, 3], [10, 5, 7])
+
+    store.apply()
+    assert grandchild.getWorldPosition() == Vector(10, 5, 7)
+    assert changed == [grandchild]
+
+    store.apply() # Nothing changed since the last time.
+    assert changed == [grandchild]
+
+def test_disabled():
+    root = createTree()
+    first, second = root.getChildren()
+    second.setEnabled(False)
+
+    store = TransformStore(root)
+    store.translate([first, second], numpy.array([[1, 0, 0], [0, 1, 0]]), SceneNode.TransformSpace.Parent)
+    store.apply()
+
+    assert first.getPosition() == Vector(11, 0, 0)
+    assert second.getPosition() == Vector(0, 0, 0)
@@ -1,8 +1,11 @@
 # Copyright (c) 2016 Ultimaker B.V.
 # Uranium is released under the terms of the AGPLv3 or higher.
 
+import json
+import marshal
 import pytest
 import os.path
+import pickle
 
 import UM.Settings
 import UM.PluginObject
@@ -12,6 +15,7 @@ import UM.Settings.InstanceContainer
 import UM.Settings.ContainerStack
 
 from UM.Resources import Resources
+from UM.Settings.InstanceContainer import IncorrectInstanceVersionError
 from UM.MimeTypeDatabase import MimeType, MimeTypeDatabase
 
 ##  Fake container class to add to the container registry.
@@ -313,6 +317,115 @@ def test_findContainerStacks(container_registry, data):
 
     _verifyMetaDataMatches(results, data["result"])
 
+##  Tests whether searches still find containers after they changed.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_findContainersAfterChange(container_registry, application):
+    instance_container = UM.Settings.InstanceContainer("a")
+    instance_container.addMetaDataEntry("material", "pla")
+    container_registry.addContainer(instance_container)
+    container_stack = UM.Settings.ContainerStack("b")
+    container_registry.addContainer(container_stack)
+
+    assert container_registry.findInstanceContainers(material = "pla") == [instance_container]
+    assert container_registry.findContainers(name = "a") == [instance_container]
+    assert container_registry.findContainerStacks(material = "pla") == []
+
+    instance_container.setMetaDataEntry("material", "abs")
+    assert container_registry.findInstanceContainers(material = "pla") == []
+    assert container_registry.findInstanceContainers(material = "abs") == [instance_container]
+
+    instance_container.setName("c")
+    assert container_registry.findContainers(name = "a") == []
+    assert container_registry.findContainers(name = "c") == [instance_container]
+
+    container_stack.addContainer(instance_container) # Stacks get the metadata of their containers.
+    assert container_registry.findContainerStacks(material = "abs") == [container_stack]
+    instance_container.setMetaDataEntry("material", "pla")
+    assert container_registry.findContainerStacks(material = "abs") == []
+    assert container_registry.findContainerStacks(material = "pla") == [container_stack]
+
+    container_registry.removeContainer("a")
+    assert container_registry.findInstanceContainers(material = "abs") == []
+    assert container_registry.findContainers(id = "a") == []
+
+##  Tests that a container that changed is moved in the caches without rebuilding them.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_findContainersAfterChangeOrder(container_registry, application):
+    containers = []
+    for container_id, material in [("a", "pla"), ("b", "abs"), ("c", "pla")]:
+        instance_container = UM.Settings.InstanceContainer(container_id)
+        instance_container.addMetaDataEntry("material", material)
+        container_registry.addContainer(instance_container)
+        containers.append(instance_container)
+    assert container_registry.findInstanceContainers(material = "pla") == [containers[0], containers[2]]
+    cache = container_registry._getPropertyCache("material")
+
+    containers[1].setMetaDataEntry("material", "pla")
+    assert container_registry._getPropertyCache("material") is cache
+    assert container_registry.findInstanceContainers(material = "pla") == containers # Still in the order in which they were added.
+    assert container_registry.findInstanceContainers(material = "abs") == []
+
+    container_registry.removeContainer("b")
+    assert container_registry.findInstanceContainers(material = "pla") == [containers[0], containers[2]]
+    containers[1].setMetaDataEntry("material", "abs") # Not in the registry anymore.
+    assert container_registry.findInstanceContainers(material = "abs") == []
+
+##  Tests that only a limited number of wildcard patterns is kept.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_getFilterPattern(container_registry):
+    pattern = container_registry._getFilterPattern("a*")
+    for i in range(container_registry.PatternCacheSize - 1):
+        container_registry._getFilterPattern("b{0}*".format(i))
+    assert container_registry._getFilterPattern("a*") is pattern # Used most recently now.
+
+    container_registry._getFilterPattern("c*")
+    assert len(container_registry._pattern_cache) == container_registry.PatternCacheSize
+    assert "a*" in container_registry._pattern_cache
+    assert "b0*" not in container_registry._pattern_cache
+    assert container_registry._getFilterPattern("a*").match("abc")
+
+##  Tests finding containers by the properties they got from deserializing after they were added.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_findContainersAfterDeserialize(container_registry, application):
+    container_registry.load()
+    instance_container = UM.Settings.InstanceContainer("a")
+    container_registry.addContainer(instance_container)
+    container_stack = UM.Settings.ContainerStack("b")
+    container_registry.addContainer(container_stack)
+    assert container_registry.findInstanceContainers(name = "a") == [instance_container]
+    assert container_registry.findInstanceContainers(material = "pla") == []
+    assert container_registry.findInstanceContainers(definition = "single_setting") == []
+    assert container_registry.findContainerStacks(name = "b") == [container_stack]
+
+    instance_container.deserialize("[general]\nversion = 2\nname = A\ndefinition = single_setting\n\n[metadata]\nmaterial = pla\n")
+    assert container_registry.findInstanceContainers(name = "a") == []
+    assert container_registry.findInstanceContainers(name = "A") == [instance_container]
+    assert container_registry.findInstanceContainers(material = "pla") == [instance_container]
+    assert container_registry.findInstanceContainers(definition = "single_setting") == [instance_container]
+
+    container_stack.deserialize("[general]\nversion = 2\nname = B\nid = b\n\n[metadata]\nmachine = test\n")
+    assert container_registry.findContainerStacks(name = "b") == []
+    assert container_registry.findContainerStacks(name = "B") == [container_stack]
+    assert container_registry.findContainerStacks(machine = "test") == [container_stack]
+
+##  Tests searching for containers of different types that share an ID.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_findContainersSameId(container_registry):
+    definition_container = UM.Settings.DefinitionContainer("a")
+    container_registry.addContainer(definition_container)
+    instance_container = UM.Settings.InstanceContainer("a")
+    container_registry.addContainer(instance_container)
+
+    assert container_registry.findContainers(id = "a") == [definition_container, instance_container]
+    assert container_registry.findDefinitionContainers(id = "a") == [definition_container]
+    assert container_registry.findInstanceContainers(id = "a") == [instance_container]
+    assert container_registry.findInstanceContainers(id = "a*") == [instance_container]
+
 ##  Tests the loading of containers into the registry.
 #
 #   \param container_registry A new container registry from a fixture.
@@ -336,6 +449,185 @@ def test_load(container_registry):
     assert "single_setting" in ids_found
     assert "inherits" in ids_found
 
+##  Tests loading definitions from the definition cache.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_loadDefinitionCache(container_registry):
+    container_registry.load() # Makes sure the cache is up to date.
+
+    definitions, manifest = container_registry._loadDefinitionCache()
+    assert "single_setting" in definitions
+    assert "inherits" in definitions
+    assert manifest["inherits"][0][0].endswith("inherits.def.json")
+    assert len(manifest["inherits"]) == 2 # The definition itself and its parent.
+
+    UM.Settings.ContainerRegistry._ContainerRegistry__instance = None
+    cached_registry = UM.Settings.ContainerRegistry.getInstance()
+    cached_registry.load()
+
+    for definition in container_registry.findDefinitionContainers():
+        cached_definition = cached_registry.findDefinitionContainers(id = definition.getId())[0]
+        assert cached_definition.getMetaData() == definition.getMetaData()
+        assert cached_definition.getAllKeys() == definition.getAllKeys()
+        for key in definition.getAllKeys():
+            assert cached_definition.getProperty(key, "value") == definition.getProperty(key, "value")
+
+##  Tests which types of containers are parsed on the threads that read their files.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_canDeserializeParsed(container_registry):
+    class CustomInstanceContainer(UM.Settings.InstanceContainer):
+        def deserialize(self, serialized):
+            super().deserialize(serialized)
+
+    class CustomContainerStack(UM.Settings.ContainerStack):
+        pass
+
+    assert container_registry._canDeserializeParsed(UM.Settings.DefinitionContainer)
+    assert container_registry._canDeserializeParsed(UM.Settings.InstanceContainer)
+    assert container_registry._canDeserializeParsed(UM.Settings.ContainerStack)
+    assert container_registry._canDeserializeParsed(CustomContainerStack)
+    assert not container_registry._canDeserializeParsed(CustomInstanceContainer) # Its deserialize() must not be skipped.
+    assert not container_registry._canDeserializeParsed(MockContainer)
+
+##  Tests reading and parsing a container file, like the threads of load() do.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_readContainerFile(container_registry, tmpdir):
+    container_registry.load()
+    instance_file = tmpdir.join("a.inst.cfg")
+    instance_file.write("[general]\nversion = 2\nname = A\ndefinition = single_setting\n\n[metadata]\nmaterial = pla\n")
+
+    definition, parser = container_registry._readContainerFile("a", str(instance_file), UM.Settings.InstanceContainer, {}, {})
+    assert definition is None
+    assert parser["general"]["name"] == "A"
+
+    instance_container = UM.Settings.InstanceContainer("a")
+    instance_container.deserializeParsed(parser)
+    assert instance_container.getName() == "A"
+    assert instance_container.getDefinition().getId() == "single_setting"
+    assert instance_container.getMetaDataEntry("material") == "pla"
+
+    instance_file.write("[general]\nversion = 1\nname = A\ndefinition = single_setting\n")
+    with pytest.raises(IncorrectInstanceVersionError):
+        container_registry._readContainerFile("a", str(instance_file), UM.Settings.InstanceContainer, {}, {})
+
+##  Tests that loading again keeps the definitions that were loaded before in the definition cache.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_loadDefinitionCacheTwice(container_registry, tmpdir, monkeypatch):
+    _storeCacheIn(tmpdir, monkeypatch)
+    cache_path = tmpdir.join(container_registry.DefinitionCacheFileName)
+
+    container_registry.load()
+    assert cache_path.exists()
+    definitions, _ = container_registry._loadDefinitionCache()
+    modified_time = cache_path.mtime()
+
+    container_registry.load() # Everything was loaded already, so nothing needs to be cached again.
+    assert cache_path.mtime() == modified_time
+    assert set(container_registry._loadDefinitionCache()[0]) == set(definitions)
+
+    UM.Settings.ContainerRegistry._ContainerRegistry__instance = None
+    cached_registry = UM.Settings.ContainerRegistry.getInstance()
+    cached_registry.load()
+    cached_registry.load()
+    assert set(cached_registry._loadDefinitionCache()[0]) == set(definitions)
+
+##  Tests that the definition cache only stores the compiled code of the functions of the definitions.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_saveDefinitionCacheCode(container_registry, tmpdir, monkeypatch):
+    _storeCacheIn(tmpdir, monkeypatch)
+    UM.Settings.SettingFunction("unrelated_setting + 1") # Compiled, but not used by any definition.
+
+    container_registry.load()
+    with open(str(tmpdir.join(container_registry.DefinitionCacheFileName)), "rb") as f:
+        code = marshal.loads(pickle.load(f)["code"])
+    assert "test_setting_0 * 10" in code
+    assert "unrelated_setting + 1" not in code
+
+##  Tests removing the separate files of the definition cache of older versions.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_removeOldDefinitionCache(container_registry, tmpdir, monkeypatch):
+    _storeCacheIn(tmpdir, monkeypatch)
+    tmpdir.mkdir("definitions").join("single_setting").write("old")
+
+    container_registry.load()
+
+    assert tmpdir.join(container_registry.DefinitionCacheFileName).exists()
+    assert not tmpdir.join("definitions").exists()
+
+##  Tests saving only the containers that changed.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_saveAll(container_registry, tmpdir, monkeypatch):
+    monkeypatch.setattr(Resources, "getStoragePathForType", lambda resource_type: str(tmpdir))
+
+    definition_container = UM.Settings.DefinitionContainer("d")
+    container_registry.addContainer(definition_container)
+    instance_container = UM.Settings.InstanceContainer("a")
+    instance_container.setDefinition(definition_container)
+    instance_container.addMetaDataEntry("material", "pla")
+    container_registry.addContainer(instance_container)
+    unchanged_container = UM.Settings.InstanceContainer("b")
+    container_registry.addContainer(unchanged_container)
+    container_stack = UM.Settings.ContainerStack("c")
+    container_stack.addContainer(instance_container)
+    container_registry.addContainer(container_stack)
+
+    statistics = container_registry.saveAll()
+    assert statistics == container_registry.getSaveStatistics()
+    assert statistics["saved"] == 2
+    assert statistics["failed"] == 0
+    assert statistics["unchanged"] == 3 # Including the empty container.
+    assert statistics["bytes"] == os.path.getsize(str(tmpdir.join("a.inst.cfg"))) + os.path.getsize(str(tmpdir.join("c.stack.cfg")))
+    assert sorted(os.listdir(str(tmpdir))) == ["a.inst.cfg", "c.stack.cfg"] # No temporary files or journal are left behind.
+    assert not instance_container.isDirty()
+    assert not container_stack.isDirty()
+
+    assert container_registry.saveAll()["saved"] == 0
+
+    instance_container.setMetaDataEntry("material", "abs")
+    assert container_registry.saveAll()["saved"] == 1
+    saved_container = UM.Settings.InstanceContainer("a")
+    saved_container.deserialize(tmpdir.join("a.inst.cfg").read())
+    assert saved_container.getMetaDataEntry("material") == "abs"
+
+    temp_path, _ = container_registry._writeContainerTempFile(instance_container, str(tmpdir.join("a.inst.cfg")))
+    assert os.path.dirname(temp_path) == str(tmpdir)
+    assert os.path.basename(temp_path).startswith("a.inst.cfg.")
+    assert temp_path.endswith(container_registry.SaveTempFileSuffix)
+
+##  Tests finishing a save that was interrupted while replacing files.
+#
+#   \param container_registry A new container registry from a fixture.
+def test_finishSaveBatch(container_registry, tmpdir, monkeypatch):
+    monkeypatch.setattr(Resources, "getStoragePathForType", lambda resource_type: str(tmpdir))
+
+    tmpdir.join("a.inst.cfg").write("old")
+    tmpdir.join("b.inst.cfg").write("new")
+    tmpdir.join("a.tmp").write("new")
+    journal = tmpdir.join(container_registry.SaveJournalFileName)
+    journal.write(json.dumps([(str(tmpdir.join("b.tmp")), str(tmpdir.join("b.inst.cfg"))), (str(tmpdir.join("a.tmp")), str(tmpdir.join("a.inst.cfg")))]))
+    stale_file = tmpdir.join("c.inst.cfg.x1y2" + container_registry.SaveTempFileSuffix) # Written before the journal.
+    stale_file.write("new")
+    tmpdir.join("d.tmp").write("other")
+
+    container_registry._finishSaveBatch()
+
+    assert tmpdir.join("a.inst.cfg").read() == "new"
+    assert tmpdir.join("b.inst.cfg").read() == "new" # Already replaced before the save was interrupted.
+    assert not tmpdir.join("a.tmp").exists()
+    assert not journal.exists()
+    assert not stale_file.exists()
+    assert tmpdir.join("d.tmp").exists() # Not a file of ours.
+
+    stale_file.write("new")
+    container_registry._finishSaveBatch() # Without journal.
+    assert not stale_file.exists()
+
 ##  Tests the making of a unique name for containers in the registry.
 #
 #   \param container_registry A new container registry from a fixture.
@@ -389,3 +681,11 @@ def _verifyMetaDataMatches(answer, ground_truth):
                 matches += 1
                 break # We have a valid match.
     assert matches == len(ground_truth)
+
+##  Makes the cache resources be stored in a temporary directory.
+#
+#   \param tmpdir The directory to store the cache in.
+#   \param monkeypatch The monkeypatch fixture of the test.
+def _storeCacheIn(tmpdir, monkeypatch):
+    get_storage_path = Resources.getStoragePathForType
+    monkeypatch.setattr(Resources, "getStoragePathForType", lambda resource_type: str(tmpdir) if resource_type == Resources.Cache else get_storage_path(resource_type))
@@ -71,6 +71,30 @@ def test_deserialize(file, expected, definition_container):
         for property, property_value in value.items():
             assert getattr(setting, property) == property_value
 
+##  Tests whether definitions inheriting from the same parent do not influence
+#   each other through the cache of resolved parents.
+def test_deserialize_inheritanceCache():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "definitions", "inherits.def.json")) as data:
+        json = data.read()
+
+    UM.Settings.DefinitionContainer.clearInheritanceCache()
+    first = UM.Settings.DefinitionContainer("first")
+    first.deserialize(json)
+    second = UM.Settings.DefinitionContainer("second")
+    second.deserialize(json) # Gets its parent from the cache.
+    assert first.getInheritedFiles() == second.getInheritedFiles()
+    assert second.getProperty("test_setting", "default_value") == 11
+
+    without_overrides = UM.Settings.DefinitionContainer("without_overrides")
+    without_overrides.deserialize("""{
+    "version": 2,
+    "name": "Test",
+    "inherits": "single_setting",
+    "metadata": {},
+    "settings": {}
+}""")
+    assert without_overrides.getProperty("test_setting", "default_value") == 10 # The overrides of the other definitions should not leak into the parent.
+
 ##  Tests deserialising bad definition container JSONs.
 #
 #   \param definition_container A definition container from a fixture.
@@ -336,9 +360,9 @@ def test_setting_function():
 def _createSettingDefinition(properties):
     result = SettingDefinition(properties["key"]) # Key MUST be present.
     if "default_value" in properties:
-        result._SettingDefinition__property_values["default_value"] = properties["default_value"] # Nota bene: Setting a private value depends on implementation, but changing a property is not currently exposed.
-    result._SettingDefinition__property_values["description"] = "Test setting definition"
-    result._SettingDefinition__property_values["type"] = "str"
+        result.__dict__["default_value"] = properties["default_value"] # Nota bene: Setting a private value depends on implementation, but changing a property is not currently exposed.
+    result.__dict__["description"] = "Test setting definition"
+    result.__dict__["type"] = "str"
     if "children" in properties:
         for child in properties["children"]:
             result.children.append(_createSettingDefinition(child))
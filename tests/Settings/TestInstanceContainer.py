@@ -3,10 +3,13 @@
 
 import pytest
 import os
+import threading
+import time
 
 import UM.Settings
 
 from UM.Resources import Resources
+from UM.Signal import Signal
 Resources.addSearchPath(os.path.dirname(os.path.abspath(__file__)))
 
 @pytest.fixture
@@ -116,3 +119,43 @@ def test_deserialize(filename, expected, container_registry):
         for key, value in value.items():
             assert instance_container.getProperty(key, "value") == value
 
+
+##  Test whether values read by deserialize are only turned into instances when needed.
+def test_deserializeLazyValues(container_registry):
+    instance_container = UM.Settings.InstanceContainer("setting_values")
+
+    path = Resources.getPath(Resources.InstanceContainers, "setting_values.inst.cfg")
+    with open(path) as data:
+        instance_container.deserialize(data.read())
+
+    assert instance_container._instances == {} # Nothing should have been created yet.
+
+    assert instance_container.getProperty("test_setting_0", "value") == 20
+    assert len(instance_container.getAllKeys()) == 5
+    assert not instance_container.isDirty() # Creating the instances is not a change to the container.
+
+##  Test whether a thread that reads the container while another thread creates its instances gets all of them.
+def test_deserializeLazyValuesThreaded(container_registry, monkeypatch):
+    instance_container = UM.Settings.InstanceContainer("setting_values")
+
+    path = Resources.getPath(Resources.InstanceContainers, "setting_values.inst.cfg")
+    with open(path) as data:
+        instance_container.deserialize(data.read())
+
+    # Slow down creating the instances, so that the other threads read the container halfway through.
+    definition = instance_container.getDefinition()
+    find_definitions = definition.findDefinitions
+    def slowFindDefinitions(**kwargs):
+        time.sleep(0.01)
+        return find_definitions(**kwargs)
+    monkeypatch.setattr(definition, "findDefinitions", slowFindDefinitions)
+    monkeypatch.setattr(Signal, "_app", None) # Without an application, signals of other threads are not passed on.
+
+    key_counts = []
+    threads = [threading.Thread(target = lambda: key_counts.append(len(instance_container.getAllKeys()))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert key_counts == [5, 5, 5, 5]
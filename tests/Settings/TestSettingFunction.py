@@ -1,6 +1,9 @@
 # Copyright (c) 2016 Ultimaker B.V.
 # Uranium is released under the terms of the AGPLv3 or higher.
 
+import importlib
+import marshal
+import pickle
 import pytest
 
 import UM.Settings.SettingFunction
@@ -148,3 +151,58 @@ def test_str():
     assert str(function) == "=3.14156"
     function = UM.Settings.SettingFunction("") # Also the edge case.
     assert str(function) == "="
+
+##  Tests whether setting functions with the same code share their compiled code.
+def test_compiledCodeShared():
+    function = UM.Settings.SettingFunction("foo * zoo")
+    duplicate = UM.Settings.SettingFunction("foo * zoo")
+    assert function._compiled is duplicate._compiled
+    assert function._function is duplicate._function
+
+##  Tests whether unknown settings only fail when the function actually uses them.
+def test_callUnknownSettingUnused():
+    value_provider = MockValueProvider()
+    function = UM.Settings.SettingFunction("foo if foo > 0 else boo")
+    assert function(value_provider) == 5
+    function = UM.Settings.SettingFunction("boo if foo < 0 else zoo") # Also when the unknown setting sorts before the known ones.
+    assert function(value_provider) == 7
+
+##  Tests whether setting functions can be pickled and still be called afterwards.
+def test_pickle():
+    value_provider = MockValueProvider()
+    function = UM.Settings.SettingFunction("foo * zoo")
+    unpickled = pickle.loads(pickle.dumps(function))
+    assert unpickled == function
+    assert unpickled.isValid()
+    assert unpickled.getUsedSettingKeys() == function.getUsedSettingKeys()
+    assert unpickled(value_provider) == 35
+
+    function = UM.Settings.SettingFunction("(")
+    unpickled = pickle.loads(pickle.dumps(function))
+    assert not unpickled.isValid()
+    assert unpickled(value_provider) is None
+
+##  Tests storing and restoring the compiled code of setting functions.
+def test_dumpCompiledCode():
+    module = importlib.import_module("UM.Settings.SettingFunction") # UM.Settings.SettingFunction refers to the class.
+    value_provider = MockValueProvider()
+    UM.Settings.SettingFunction("foo * zoo + 1")
+    data = module.dumpCompiledCode()
+
+    del module._compile_cache["foo * zoo + 1"]
+    module.loadCompiledCode(data)
+    assert "foo * zoo + 1" in module._compile_cache
+
+    function = UM.Settings.SettingFunction("foo * zoo + 1")
+    assert function.getUsedSettingKeys() == {"foo", "zoo"}
+    assert function(value_provider) == 36
+
+##  Tests storing the compiled code of only some setting functions.
+def test_dumpCompiledCodeOfFunctions():
+    module = importlib.import_module("UM.Settings.SettingFunction")
+    function = UM.Settings.SettingFunction("foo * zoo + 2")
+    UM.Settings.SettingFunction("foo * zoo + 3")
+    invalid_function = UM.Settings.SettingFunction("(")
+
+    data = marshal.loads(module.dumpCompiledCode([function, invalid_function]))
+    assert list(data) == ["foo * zoo + 2"]
@@ -66,6 +66,19 @@ def test_setProperty(setting_definition, instance_container):
     with pytest.raises(AttributeError):
         instance.setProperty("something", 10)
 
+def test_setPropertyString(setting_definition, instance_container):
+    instance = UM.Settings.SettingInstance(setting_definition, instance_container)
+    instance_container.addInstance(instance)
+
+    instance.setProperty("value", "20,5") # Strings are converted according to the type of the setting.
+    assert instance.value == 20.5
+
+    instance.setProperty("value", "=mock_test * 2")
+    assert isinstance(instance.value, UM.Settings.SettingFunction)
+
+    with pytest.raises(AttributeError): # Properties that were not set do not exist.
+        instance.maximum_value
+
 test_validationState_data = [
     {"value": 10.0, "state": UM.Settings.ValidatorState.Valid},
     {"value": 4.0, "state": UM.Settings.ValidatorState.MinimumWarning},
@@ -0,0 +1,124 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import pytest
+
+import UM.Settings
+from UM.Settings.Validator import ValidatorState
+
+test_definition = """{
+    "version": 2,
+    "name": "Validation",
+    "metadata": { },
+    "settings": {
+        "line_width": {
+            "label": "Line Width",
+            "description": "A Test Setting",
+            "type": "float",
+            "default_value": 0.4,
+            "minimum_value": "0",
+            "maximum_value_warning": "2"
+        },
+        "layer_height": {
+            "label": "Layer Height",
+            "description": "A Test Setting",
+            "type": "float",
+            "default_value": 0.1,
+            "minimum_value": "0",
+            "maximum_value": "line_width"
+        },
+        "wall_thickness": {
+            "label": "Wall Thickness",
+            "description": "A Test Setting",
+            "type": "float",
+            "default_value": 0.8,
+            "value": "line_width * 2",
+            "maximum_value": "5"
+        },
+        "machine_name": {
+            "label": "Machine Name",
+            "description": "A Test Setting",
+            "type": "str",
+            "default_value": "Test"
+        }
+    }
+}"""
+
+##  Creates a stack with a user container on top of the test definition.
+@pytest.fixture
+def stack():
+    definition_container = UM.Settings.DefinitionContainer("validation")
+    definition_container.deserialize(test_definition)
+
+    user_container = UM.Settings.InstanceContainer("user")
+    user_container.setDefinition(definition_container)
+
+    stack = UM.Settings.ContainerStack("stack")
+    stack.addContainer(definition_container)
+    stack.addContainer(user_container)
+    return stack
+
+def test_validate(stack):
+    validator = UM.Settings.StackValidator(stack)
+
+    states = validator.validate()
+    assert states == {
+        "line_width": ValidatorState.Valid,
+        "layer_height": ValidatorState.Valid,
+        "wall_thickness": ValidatorState.Valid
+    } # Settings of which the type has no validator are not included.
+    assert validator.getValidationState("machine_name") is None
+    assert validator.getValidationState("unknown") is None
+    assert validator.getErrors() == []
+    assert validator.getWarnings() == []
+    assert not validator.hasErrors()
+
+    # The states match those of validating through the stack.
+    stack.getTop().setProperty("line_width", "value", 0.2)
+    validator.invalidate()
+    for key, state in validator.validate().items():
+        assert state == UM.Settings.Validator(key)(stack)
+
+##  Tests that a change only causes the changed setting and its dependents to be validated again.
+def test_validateAfterChange(stack, application):
+    validator = UM.Settings.StackValidator(stack)
+    validator.validate()
+
+    invalidated = []
+    def onValidationStatesChanged(keys):
+        invalidated.append(keys)
+    validator.validationStatesChanged.connect(onValidationStatesChanged)
+
+    stack.getTop().setProperty("layer_height", "value", 0.5)
+    assert invalidated[-1] == { "layer_height" }
+    assert validator.getErrors() == ["layer_height"] # Above its maximum, the line width.
+
+    stack.getTop().setProperty("line_width", "value", 3.0)
+    assert invalidated[-1] == { "line_width", "layer_height", "wall_thickness" }
+    assert validator.getErrors() == ["wall_thickness"] # The layer height is valid again, but the walls are now too thick.
+    assert validator.getWarnings() == ["line_width"]
+    assert validator.hasErrors()
+
+    # Functions set by the user replace the dependencies of the setting.
+    stack.getTop().setProperty("wall_thickness", "value", "=layer_height * 2")
+    assert validator.getValidationState("wall_thickness") == ValidatorState.Valid
+    stack.getTop().setProperty("layer_height", "value", 4.0)
+    assert invalidated[-1] == { "layer_height", "wall_thickness" }
+    assert validator.getErrors() == ["layer_height", "wall_thickness"]
+
+##  Tests that changes to the next stack are picked up after invalidating.
+def test_invalidate(stack):
+    extruder_stack = UM.Settings.ContainerStack("extruder")
+    extruder_stack.addContainer(UM.Settings.InstanceContainer("extruder_user"))
+    extruder_stack.setNextStack(stack)
+    user_container = stack.getTop()
+
+    validator = UM.Settings.StackValidator(extruder_stack)
+    assert validator.getValidationState("layer_height") == ValidatorState.Valid
+
+    user_container.setProperty("layer_height", "value", -1.0) # Changes to the next stack are not signalled.
+    assert validator.getValidationState("layer_height") == ValidatorState.Valid
+
+    validator.invalidate()
+    assert validator.getValidationState("layer_height") == ValidatorState.MinimumError
+    assert validator.getProperty("layer_height", "value") == -1.0
@@ -0,0 +1,49 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import importlib.util
+import os
+
+from UM.Math.Ray import Ray
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshBuilder import MeshBuilder
+from UM.Scene.SceneNode import SceneNode
+
+def loadSelectionTool():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugins", "Tools", "SelectionTool", "SelectionTool.py")
+    spec = importlib.util.spec_from_file_location("SelectionTool", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SelectionTool.__new__(module.SelectionTool) # Without the application that __init__ needs.
+
+def createCube(parent, position, selectable = True):
+    builder = MeshBuilder()
+    builder.addCube(10, 10, 10, Vector(0, 0, 0))
+    node = SceneNode()
+    node.setMeshData(builder.build())
+    node.setPosition(position)
+    node.setSelectable(selectable)
+    parent.addChild(node) # Only once it has a bounding box, for the parent to include.
+    return node
+
+def test_findNodeOnRay():
+    tool = loadSelectionTool()
+    root = SceneNode()
+    first = createCube(root, Vector(0, 0, 0))
+    second = createCube(root, Vector(30, 0, 0))
+    hidden = createCube(root, Vector(30, 0, 20), selectable = False)
+
+    # The root encloses both cubes and the hidden cube is in front of the second, but neither can be selected.
+    assert tool._findNodeOnRay(root, Ray(Vector(30, 0, 100), Vector(0, 0, -1))) is second
+    assert tool._findNodeOnRay(root, Ray(Vector(0, 0, 100), Vector(0, 0, -1))) is first
+    assert tool._findNodeOnRay(root, Ray(Vector(15, 0, 100), Vector(0, 0, -1))) is None # Between the cubes.
+
+    # The nearest of several cubes on the ray.
+    assert tool._findNodeOnRay(root, Ray(Vector(-100, 0, 0), Vector(1, 0, 0))) is first
+    assert tool._findNodeOnRay(root, Ray(Vector(100, 0, 0), Vector(-1, 0, 0))) is second
+
+    hidden.setSelectable(True)
+    assert tool._findNodeOnRay(root, Ray(Vector(30, 0, 100), Vector(0, 0, -1))) is hidden
+
+def test_findNodeOnRayEmptyScene():
+    assert loadSelectionTool()._findNodeOnRay(SceneNode(), Ray(Vector(0, 0, 100), Vector(0, 0, -1))) is None
@@ -0,0 +1,45 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+
+from UM.Math.AxisAlignedBox import AxisAlignedBox
+from UM.Math.Ray import Ray
+from UM.Math.Vector import Vector
+from UM.Scene.Camera import Camera
+
+##  Creates boxes on a grid, like the bounding boxes of objects on a build plate.
+def _createBoxes(count):
+    boxes = []
+    for i in range(count):
+        minimum = Vector((i % 20) * 12, 0, (i // 20) * 12)
+        boxes.append(AxisAlignedBox(minimum, minimum + Vector(10, 10, 10)))
+    return boxes
+
+def _intersectEach(ray, boxes):
+    return [box.intersectsRay(ray) for box in boxes]
+
+@pytest.mark.parametrize("count", [10, 500])
+def benchmark_intersectsRay(benchmark, count):
+    ray = Ray(Vector(-50, 100, -95), Vector(1, -1, 1).normalized())
+    result = benchmark(_intersectEach, ray, _createBoxes(count))
+    assert any(result)
+
+@pytest.mark.parametrize("count", [10, 500])
+def benchmark_intersectRays(benchmark, count):
+    ray = Ray(Vector(-50, 100, -95), Vector(1, -1, 1).normalized())
+    bounds = numpy.array([box.getBounds() for box in _createBoxes(count)])
+
+    hits, near, far = benchmark(AxisAlignedBox.intersectRays, ray.origin.getData(), ray.direction.getData(), bounds)
+    assert hits.any()
+
+def benchmark_getRay(benchmark):
+    camera = Camera("benchmark")
+    camera.setWindowSize(800, 600)
+    camera.setViewportSize(800, 600)
+    camera.translate(Vector(0, 200, 500))
+    camera.lookAt(Vector(0, 0, 0))
+
+    ray = benchmark(camera.getRay, 0.2, -0.3)
+    assert ray.direction.length() > 0
@@ -0,0 +1,71 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+
+from UM.Math.Polygon import Polygon
+
+def _createCircle(point_count, radius):
+    angles = numpy.linspace(0, 2 * numpy.pi, point_count, endpoint = False)
+    return Polygon(numpy.array([numpy.cos(angles) * radius, numpy.sin(angles) * radius], numpy.float32).transpose())
+
+@pytest.mark.parametrize("point_count", [8, 64, 256])
+def benchmark_getMinkowskiHull(benchmark, point_count):
+    head = _createCircle(point_count, 30)
+    footprint = _createCircle(point_count, 10)
+
+    result = benchmark(footprint.getMinkowskiHull, head)
+    assert point_count <= len(result.getPoints()) <= point_count * 2
+
+def benchmark_getMinkowskiHullNonConvex(benchmark):
+    star = _createCircle(64, 10).getPoints().copy()
+    star[::2] *= 0.5
+    head = _createCircle(64, 30)
+
+    result = benchmark(Polygon(star).getMinkowskiHull, head)
+    assert 64 <= len(result.getPoints()) <= 96 # The hull of the star is formed by its 32 outer points.
+
+##  Creates a crowded build plate of rotated squares, each overlapping a few neighbours.
+def _createPlate(count):
+    polygons = []
+    columns = int(numpy.ceil(numpy.sqrt(count)))
+    for i in range(count):
+        angle = i * 0.1
+        rotation = numpy.array([[numpy.cos(angle), -numpy.sin(angle)], [numpy.sin(angle), numpy.cos(angle)]])
+        square = numpy.array([[-6, -6], [6, -6], [6, 6], [-6, 6]]).dot(rotation.transpose())
+        polygons.append(Polygon((square + [(i % columns) * 15, (i // columns) * 15]).astype(numpy.float32)))
+    return polygons
+
+def _intersectAllPairs(polygons):
+    result = []
+    for index in range(len(polygons)):
+        for other_index in range(index + 1, len(polygons)):
+            intersection = polygons[index].intersectsPolygon(polygons[other_index])
+            if intersection is not None:
+                result.append((index, other_index, intersection))
+    return result
+
+def benchmark_intersectAllPairs(benchmark):
+    polygons = _createPlate(50)
+    result = benchmark(_intersectAllPairs, polygons)
+    assert len(result) == len(Polygon.findIntersections(polygons))
+
+@pytest.mark.parametrize("count", [50, 500])
+def benchmark_findIntersections(benchmark, count):
+    result = benchmark(Polygon.findIntersections, _createPlate(count))
+    assert len(result) > 0
+
+def benchmark_intersectionConvexHulls(benchmark):
+    circle = _createCircle(64, 10)
+    other = Polygon(circle.getPoints() + numpy.array([5, 5], numpy.float32))
+
+    result = benchmark(circle.intersectionConvexHulls, other)
+    assert result.isValid()
+
+def benchmark_intersectionConvexHullsFans(benchmark):
+    head = Polygon(numpy.array([[-42, 12], [-42, -32], [62, 12], [62, -32]], numpy.float32))
+    fans = Polygon(numpy.array([[-42, 12], [-42, -32], [62, 12], [62, -32]], numpy.float32) + numpy.array([30, 10], numpy.float32))
+
+    result = benchmark(head.intersectionConvexHulls, fans)
+    assert result.isValid()
@@ -0,0 +1,63 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import math
+
+from UM.Math.Plane import Plane
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Ray import Ray
+from UM.Math.Vector import Vector
+from UM.Scene.SceneNode import SceneNode
+
+##  The vector math of a tool handle being dragged along a plane, for a number of mouse moves.
+def _dragAlongPlane(moves):
+    plane = Plane(Vector(0, 1, 0), 0)
+    camera_position = Vector(0, 300, 700)
+    drag_start = Vector(0, 0, 0)
+    handle_position = Vector(10, 0, 10)
+
+    result = Vector()
+    for i in range(moves):
+        direction = (Vector(i * 0.01, 0, 0) - camera_position).normalized()
+        ray = Ray(camera_position, direction)
+        distance = plane.intersectsRay(ray)
+        drag_end = ray.getPointAlongRay(distance)
+
+        result += (drag_end - drag_start) * 0.5
+        start_direction = (drag_start - handle_position).normalized()
+        end_direction = (drag_end - handle_position).normalized()
+        if Vector.Unit_Y.dot(start_direction.cross(end_direction)) > 0:
+            result = -result
+    return result
+
+def benchmark_dragAlongPlane(benchmark):
+    result = benchmark(_dragAlongPlane, 1000)
+    assert result.length() > 0
+
+##  The quaternion math of a rotate tool, for a number of mouse moves.
+def _rotate(moves):
+    orientation = Quaternion()
+    point = Vector(10, 20, 30)
+    for i in range(moves):
+        rotation = Quaternion.fromAngleAxis(0.001 * i, Vector.Unit_Y)
+        orientation = rotation * orientation
+        point = rotation.rotate(point)
+    return orientation, point
+
+def benchmark_rotate(benchmark):
+    orientation, point = benchmark(_rotate, 1000)
+    assert point.length() > 0
+    assert math.fabs(orientation.length() - 1) < 1e-4
+
+##  Moves and rotates a scene node, for a number of mouse moves.
+def _transformNode(node, moves):
+    for i in range(moves):
+        node.translate(Vector(0.1, 0, 0.2), SceneNode.TransformSpace.World)
+        node.rotate(Quaternion.fromAngleAxis(0.001, Vector.Unit_Y), SceneNode.TransformSpace.World)
+    return node.getWorldPosition()
+
+def benchmark_transformNode(benchmark):
+    node = SceneNode()
+    SceneNode(node) # The transformation of children is updated too.
+    position = benchmark(_transformNode, node, 100)
+    assert position.length() > 0
@@ -0,0 +1,51 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+
+from UM.Math.Matrix import Matrix
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData, approximateConvexHull
+
+##  Creates the vertices of a mesh that is not convex: a sphere with a lot of vertices inside, like a scan.
+@pytest.fixture
+def vertices():
+    random = numpy.random.RandomState(37)
+    vertices = random.normal(size = (1000000, 3))
+    vertices /= numpy.linalg.norm(vertices, axis = 1)[:, numpy.newaxis]
+    vertices[::2] *= random.uniform(0.2, 1, (500000, 1))
+    return (vertices * 50).astype(numpy.float32)
+
+def benchmark_approximateConvexHull(benchmark, vertices):
+    hull = benchmark(approximateConvexHull, vertices, 1024)
+    assert len(hull.vertices) <= 1024
+
+def _getFootprints(mesh_data, transformations):
+    return [mesh_data.getConvexHullFootprint(transformation) for transformation in transformations]
+
+##  Gets the footprint of a mesh while it is rotated to new orientations.
+def benchmark_getConvexHullFootprint(benchmark, vertices):
+    mesh_data = MeshData(vertices = vertices)
+    mesh_data.getConvexHull() # Computed once when loading.
+    transformations = []
+    for angle in numpy.linspace(0, 1, 100):
+        transformation = Matrix()
+        transformation.setByRotationAxis(angle, Vector.Unit_Y)
+        transformations.append(transformation)
+
+    footprints = benchmark(_getFootprints, mesh_data, transformations)
+    assert len(footprints) == 100
+
+##  Gets the footprint of a mesh while it is moved around, which doesn't change its orientation.
+def benchmark_getConvexHullFootprintCached(benchmark, vertices):
+    mesh_data = MeshData(vertices = vertices)
+    transformations = []
+    for x in range(100):
+        transformation = Matrix()
+        transformation.setByTranslation(Vector(x, 0, 0))
+        transformations.append(transformation)
+    mesh_data.getConvexHullFootprint(transformations[0])
+
+    footprints = benchmark(_getFootprints, mesh_data, transformations)
+    assert len(footprints) == 100
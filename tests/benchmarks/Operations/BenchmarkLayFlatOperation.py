@@ -0,0 +1,32 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Mesh.MeshData import MeshData
+from UM.Operations.LayFlatOperation import LayFlatOperation
+from UM.Scene.SceneNode import SceneNode
+
+##  Creates a node with a dense cloud of vertices as mesh, like a scan.
+@pytest.fixture
+def node():
+    random = numpy.random.RandomState(37)
+    vertices = (random.randn(500000, 3) * (30, 20, 10)).astype(numpy.float32)
+    node = SceneNode()
+    node.setMeshData(MeshData(vertices = vertices))
+    node.getMeshData().getConvexHull() # The convex hull is cached by the mesh, so only laying flat is benchmarked.
+    return node
+
+def _layFlat(node, method):
+    node.setOrientation(Quaternion.fromAngleAxis(0.5, Vector.Unit_X))
+    operation = LayFlatOperation(node, method = method)
+    operation.process()
+    return operation
+
+@pytest.mark.parametrize("method", [LayFlatOperation.Method.LowestVertices, LayFlatOperation.Method.LargestFace])
+def benchmark_layFlat(benchmark, node, method):
+    operation = benchmark(_layFlat, node, method)
+    assert operation._new_orientation != operation._old_orientation
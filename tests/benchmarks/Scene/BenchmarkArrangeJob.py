@@ -0,0 +1,37 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+
+from UM.Math.Polygon import Polygon
+from UM.Mesh.MeshData import MeshData
+from UM.Scene.ArrangeJob import ArrangeJob
+from UM.Scene.SceneNode import SceneNode
+
+##  Creates nodes with cylinders of various sizes as mesh, all at the same position.
+def _createNodes(count):
+    random = numpy.random.RandomState(37)
+    angles = numpy.linspace(0, 2 * numpy.pi, 32, endpoint = False)
+    nodes = []
+    for i in range(count):
+        width, depth = random.uniform(5, 15, 2)
+        outline = numpy.stack((numpy.cos(angles) * width, numpy.sin(angles) * depth), axis = 1)
+        vertices = numpy.concatenate([numpy.insert(outline, 1, height, axis = 1) for height in (0, 10)]).astype(numpy.float32)
+
+        node = SceneNode()
+        node.setMeshData(MeshData(vertices = vertices))
+        node.getMeshData().getConvexHull() # Only the arranging is benchmarked.
+        nodes.append(node)
+    return nodes
+
+def _arrange(nodes, build_plate):
+    job = ArrangeJob(nodes, build_plate)
+    job.run()
+    return job
+
+def benchmark_arrange(benchmark):
+    build_plate = Polygon(numpy.array([[-150, -150], [-150, 150], [150, 150], [150, -150]], numpy.float32))
+    nodes = _createNodes(100)
+
+    job = benchmark(_arrange, nodes, build_plate)
+    assert job.getUnplacedNodes() == []
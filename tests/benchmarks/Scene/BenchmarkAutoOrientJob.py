@@ -0,0 +1,37 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+import pytest
+
+from UM.Mesh.MeshData import MeshData
+from UM.Scene.AutoOrientJob import AutoOrientJob
+from UM.Scene.SceneNode import SceneNode
+
+##  Creates a node with a bumpy ellipsoid of about a million faces as mesh.
+@pytest.fixture
+def node():
+    rings, segments = 500, 1000
+    latitudes, longitudes = numpy.meshgrid(numpy.linspace(0, numpy.pi, rings), numpy.linspace(0, 2 * numpy.pi, segments, endpoint = False), indexing = "ij")
+    radii = 1 + 0.05 * numpy.sin(7 * latitudes) * numpy.cos(5 * longitudes)
+    vertices = numpy.stack((radii * numpy.sin(latitudes) * numpy.cos(longitudes) * 40, radii * numpy.cos(latitudes) * 20, radii * numpy.sin(latitudes) * numpy.sin(longitudes) * 30), axis = -1).reshape(-1, 3)
+
+    # Two triangles for every quad between two rings, wrapping around the segments.
+    first = numpy.arange(rings - 1)[:, numpy.newaxis] * segments + numpy.arange(segments)
+    following = numpy.arange(rings - 1)[:, numpy.newaxis] * segments + (numpy.arange(segments) + 1) % segments
+    indices = numpy.concatenate((numpy.stack((first, following, first + segments), axis = -1), numpy.stack((following, following + segments, first + segments), axis = -1))).reshape(-1, 3)
+
+    node = SceneNode()
+    node.setMeshData(MeshData(vertices = vertices.astype(numpy.float32), indices = indices.astype(numpy.int32)))
+    node.getMeshData().getConvexHull() # The convex hull is cached by the mesh, so only the orienting is benchmarked.
+    return node
+
+def _orient(node):
+    job = AutoOrientJob(node)
+    job.run()
+    return job
+
+def benchmark_orient(benchmark, node):
+    assert node.getMeshData().getFaceCount() >= 990000
+    job = benchmark.pedantic(_orient, args = (node, ), rounds = 3)
+    assert job.getResult() is not None
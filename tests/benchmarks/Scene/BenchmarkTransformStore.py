@@ -0,0 +1,52 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import numpy
+
+from UM.Math.Quaternion import Quaternion
+from UM.Math.Vector import Vector
+from UM.Scene.SceneNode import SceneNode
+from UM.Scene.TransformStore import TransformStore
+
+##  Creates a root with a number of groups of nodes.
+def _createScene(groups, nodes_per_group):
+    root = SceneNode()
+    for i in range(groups):
+        group = SceneNode(root)
+        for j in range(nodes_per_group):
+            SceneNode(group).translate(Vector(j, 0, i))
+    return root
+
+def _transformNodes(nodes):
+    rotation = Quaternion.fromAngleAxis(0.1, Vector.Unit_Y)
+    for node in nodes:
+        node.translate(Vector(1, 0, 0), SceneNode.TransformSpace.World)
+        node.rotate(rotation, SceneNode.TransformSpace.Local)
+
+def benchmark_transformNodes(benchmark):
+    root = _createScene(30, 10)
+    benchmark(_transformNodes, root.getChildren())
+
+def _transformStore(root):
+    store = TransformStore(root)
+    nodes = root.getChildren()
+    store.translate(nodes, Vector(1, 0, 0), SceneNode.TransformSpace.World)
+    store.rotate(nodes, Quaternion.fromAngleAxis(0.1, Vector.Unit_Y), SceneNode.TransformSpace.Local)
+    store.apply()
+
+def benchmark_transformStore(benchmark):
+    root = _createScene(30, 10)
+    benchmark(_transformStore, root)
+
+def benchmark_transformStoreWithoutApply(benchmark):
+    root = _createScene(30, 10)
+    store = TransformStore(root)
+    nodes = root.getChildren()
+
+    def transform():
+        store.translate(nodes, Vector(1, 0, 0), SceneNode.TransformSpace.World)
+        store.rotate(nodes, Quaternion.fromAngleAxis(0.1, Vector.Unit_Y), SceneNode.TransformSpace.Local)
+        return store.getWorldTransformations()
+
+    result = benchmark(transform)
+    assert result.shape == (331, 4, 4)
@@ -0,0 +1,49 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import pytest
+
+import UM.Settings
+from UM.Resources import Resources
+
+@pytest.fixture
+def container_registry():
+    UM.Settings.ContainerRegistry._ContainerRegistry__instance = None # Reset the private instance variable every time
+    registry = UM.Settings.ContainerRegistry.getInstance()
+
+    for i in range(2000):
+        container = UM.Settings.InstanceContainer("container_{0}".format(i))
+        container.addMetaDataEntry("type", "quality" if i % 2 else "material")
+        container.addMetaDataEntry("material", "material_{0}".format(i % 50))
+        registry.addContainer(container)
+
+    return registry
+
+benchmark_find_containers_data = [
+    ({ "id": "container_1000" }, 1),
+    ({ "type": "quality", "material": "material_5" }, 40),
+    ({ "material": "material_1*" }, 440),
+    ({ "type": "nope" }, 0)
+]
+
+@pytest.mark.parametrize("filter,match_count", benchmark_find_containers_data)
+def benchmark_findInstanceContainers(benchmark, container_registry, filter, match_count):
+    result = benchmark(container_registry.findInstanceContainers, **filter)
+    assert len(result) == match_count
+
+def _saveAfterChanging(container_registry, count):
+    for i in range(count):
+        container_registry.findInstanceContainers(id = "container_{0}".format(i))[0].setMetaDataEntry("type", "quality")
+    return container_registry.saveAll()
+
+@pytest.mark.parametrize("count", [0, 10])
+def benchmark_saveAll(benchmark, container_registry, tmpdir, monkeypatch, count):
+    monkeypatch.setattr(Resources, "getStoragePathForType", lambda resource_type: str(tmpdir))
+    definition = UM.Settings.DefinitionContainer("definition")
+    container_registry.addContainer(definition)
+    for container in container_registry.findInstanceContainers():
+        container.setDefinition(definition)
+    container_registry.saveAll()
+
+    statistics = benchmark(_saveAfterChanging, container_registry, count)
+    assert statistics["saved"] == count
@@ -0,0 +1,24 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import os.path
+
+import pytest
+
+import UM.Settings
+from UM.Resources import Resources
+
+Resources.addSearchPath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Settings"))
+
+def _deserializeSiblings(json, count):
+    for i in range(count):
+        definition = UM.Settings.DefinitionContainer("sibling_{0}".format(i))
+        definition.deserialize(json)
+
+@pytest.mark.parametrize("count", [1, 100])
+def benchmark_deserializeInherited(benchmark, count):
+    with open(Resources.getPath(Resources.DefinitionContainers, "inherits.def.json")) as f:
+        json = f.read()
+
+    UM.Settings.DefinitionContainer.clearInheritanceCache()
+    benchmark(_deserializeSiblings, json, count)
@@ -0,0 +1,39 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import pytest
+
+import UM.Settings
+
+class MockValueProvider:
+    def __init__(self):
+        self._values = {
+            "foo": 5,
+            "zoo": 7,
+            "layer_height": 0.1,
+            "line_width": 0.4
+        }
+
+    def getProperty(self, key, property_name):
+        return self._values.get(key)
+
+benchmark_function_data = [
+    "0",
+    "\"x\"",
+    "foo",
+    "math.sqrt(4)",
+    "foo * zoo",
+    "max(layer_height, line_width / 2) if foo > zoo else math.ceil(line_width / layer_height)"
+]
+
+@pytest.mark.parametrize("code", benchmark_function_data)
+def benchmark_init(benchmark, code):
+    function = benchmark(UM.Settings.SettingFunction, code)
+    assert function.isValid()
+
+@pytest.mark.parametrize("code", benchmark_function_data)
+def benchmark_call(benchmark, code):
+    function = UM.Settings.SettingFunction(code)
+    value_provider = MockValueProvider()
+    result = benchmark(function, value_provider)
+    assert result is not None
@@ -0,0 +1,59 @@
+# Copyright (c) 2016 Ultimaker B.V.
+# Uranium is released under the terms of the AGPLv3 or higher.
+
+import json
+
+import pytest
+
+import UM.Settings
+
+##  Creates a stack of which each setting has its bounds calculated from the previous setting.
+@pytest.fixture
+def stack():
+    settings = {}
+    for i in range(500):
+        settings["setting_{0}".format(i)] = {
+            "label": "Setting {0}".format(i),
+            "description": "A Test Setting",
+            "type": "float",
+            "default_value": i,
+            "minimum_value": "setting_{0} - 10".format(i - 1) if i > 0 else "0",
+            "maximum_value": "setting_{0} + 10".format(i - 1) if i > 0 else "10",
+            "minimum_value_warning": "0",
+            "maximum_value_warning": "1000"
+        }
+
+    definition_container = UM.Settings.DefinitionContainer("definition")
+    definition_container.deserialize(json.dumps({ "version": 2, "name": "Test", "metadata": {}, "settings": settings }))
+
+    user_container = UM.Settings.InstanceContainer("user")
+    user_container.setDefinition(definition_container)
+    for i in range(0, 500, 10):
+        user_container.setProperty("setting_{0}".format(i), "value", i + 5)
+
+    stack = UM.Settings.ContainerStack("stack")
+    stack.addContainer(definition_container)
+    stack.addContainer(user_container)
+    return stack
+
+def _validateThroughStack(stack):
+    return { key: UM.Settings.Validator(key)(stack) for key in stack.getAllKeys() }
+
+def benchmark_validateThroughStack(benchmark, stack):
+    result = benchmark(_validateThroughStack, stack)
+    assert len(result) == 500
+
+def _validateAll(stack):
+    validator = UM.Settings.StackValidator(stack)
+    return validator.validate()
+
+def benchmark_validateAll(benchmark, stack):
+    result = benchmark(_validateAll, stack)
+    assert len(result) == 500
+
+def benchmark_validateCached(benchmark, stack):
+    validator = UM.Settings.StackValidator(stack)
+    validator.validate()
+
+    result = benchmark(validator.validate)
+    assert len(result) == 500